@@ -0,0 +1,167 @@
+"""Bearer token authentication: Cognito JWT verification with warm-container caches."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+import jwt
+from jwt.algorithms import RSAAlgorithm
+
+from .config import (
+    AUTH_CLAIMS_CACHE_MAX_ENTRIES,
+    AWS_REGION,
+    COGNITO_USER_POOL_ID,
+    JWKS_REFRESH_INTERVAL,
+)
+
+# Parsed signing keys by kid, verified claims by token (least recently used
+# first) and JWKS refresh state (persist across Lambda invocations in warm containers)
+_KEYS: Dict[str, Any] = {}
+_CLAIMS: OrderedDict[str, Tuple[float, Dict[str, Any]]] = OrderedDict()
+_LAST_REFRESH: float | None = None
+_REFRESH: asyncio.Task | None = None
+_STATS = {"claims_hits": 0, "verifications": 0, "jwks_fetches": 0, "jwks_errors": 0}
+
+
+def _jwks_url() -> str:
+    return f"https://cognito-idp.{AWS_REGION}.amazonaws.com/{COGNITO_USER_POOL_ID}/.well-known/jwks.json"
+
+
+async def _fetch_keys() -> None:
+    """Fetch the pool's JWKS and replace the parsed keys; on failure the old keys stay."""
+    global _KEYS
+    url = _jwks_url()
+    _STATS["jwks_fetches"] += 1
+    try:
+        async with httpx.AsyncClient(timeout=5.0) as client:
+            resp = await client.get(url)
+            resp.raise_for_status()
+        keys = {key["kid"]: RSAAlgorithm.from_jwk(key) for key in resp.json().get("keys", []) if key.get("kid")}
+    except Exception as e:  # noqa: BLE001
+        _STATS["jwks_errors"] += 1
+        print(f"Failed to fetch JWKS from {url}: {e}")
+        return
+    if not keys:
+        _STATS["jwks_errors"] += 1
+        print(f"JWKS from {url} has no keys")
+        return
+    if keys.keys() != _KEYS.keys():
+        # Claims verified with a key that has been rotated out must be checked again
+        _CLAIMS.clear()
+    _KEYS = keys
+
+
+async def _signing_key(kid: str | None) -> Any:
+    """
+    The parsed public key for kid, or None.
+
+    An unknown kid triggers a JWKS refresh, unless one was started less than
+    JWKS_REFRESH_INTERVAL seconds ago; concurrent requests share one fetch.
+    """
+    global _LAST_REFRESH, _REFRESH
+    if kid in _KEYS:
+        return _KEYS[kid]
+    if _REFRESH is None or _REFRESH.done():
+        now = time.monotonic()
+        if _LAST_REFRESH is not None and now - _LAST_REFRESH < JWKS_REFRESH_INTERVAL:
+            return None
+        _LAST_REFRESH = now
+        _REFRESH = asyncio.ensure_future(_fetch_keys())
+    # Shielded so a cancelled request does not abort the fetch others are waiting on
+    await asyncio.shield(_REFRESH)
+    return _KEYS.get(kid)
+
+
+def _remember(token: str, claims: Dict[str, Any]) -> None:
+    expires_at = claims.get("exp")
+    if not isinstance(expires_at, (int, float)):
+        return
+    _CLAIMS[token] = (float(expires_at), claims)
+    _CLAIMS.move_to_end(token)
+    while len(_CLAIMS) > AUTH_CLAIMS_CACHE_MAX_ENTRIES:
+        _CLAIMS.popitem(last=False)
+
+
+async def _verified_claims(token: str) -> Optional[Dict[str, Any]]:
+    """Claims of a token signed by the user pool, or None; only successes are cached."""
+    entry = _CLAIMS.get(token)
+    if entry is not None:
+        if entry[0] > time.time():
+            _STATS["claims_hits"] += 1
+            _CLAIMS.move_to_end(token)
+            return entry[1]
+        del _CLAIMS[token]
+
+    try:
+        kid = jwt.get_unverified_header(token).get("kid")
+        public_key = await _signing_key(kid)
+        if public_key is None:
+            print(f"No matching key found for kid: {kid}")
+            return None
+
+        _STATS["verifications"] += 1
+        claims = jwt.decode(
+            token,
+            public_key,
+            algorithms=["RS256"],
+            options={"verify_aud": False}  # Cognito uses client_id claim, not aud
+        )
+    except jwt.ExpiredSignatureError:
+        print("Token has expired")
+        return None
+    except jwt.InvalidTokenError as e:
+        print(f"Invalid token: {e}")
+        return None
+    except Exception as e:  # noqa: BLE001
+        print(f"Token verification error: {e}")
+        return None
+
+    _remember(token, claims)
+    return claims
+
+
+async def extract_user_id(event: Dict[str, Any]) -> Optional[str]:
+    """
+    Extract user ID from JWT token in Authorization header.
+
+    If COGNITO_USER_POOL_ID is set, performs full signature verification.
+    Otherwise, trusts API Gateway's prior verification (unverified decode).
+    """
+    headers = event.get("headers", {})
+    auth_header = headers.get("Authorization") or headers.get("authorization")
+    if not auth_header or not auth_header.startswith("Bearer "):
+        return None
+
+    token = auth_header[7:]  # Remove "Bearer " prefix
+
+    if COGNITO_USER_POOL_ID:
+        # Full verification mode (for Function URL access)
+        claims = await _verified_claims(token)
+        return claims.get("sub") if claims else None
+
+    # Trust API Gateway's verification (unverified decode)
+    try:
+        payload = jwt.decode(token, options={"verify_signature": False})
+        return payload.get("sub")
+    except jwt.InvalidTokenError:
+        return None
+
+
+def stats() -> Dict[str, Any]:
+    """Cache counters and occupancy for this container."""
+    return {**_STATS, "keys": len(_KEYS), "cached_claims": len(_CLAIMS)}
+
+
+def clear() -> None:
+    """Forget keys, cached claims and refresh state, and reset counters."""
+    global _KEYS, _LAST_REFRESH, _REFRESH
+    _KEYS = {}
+    _CLAIMS.clear()
+    _LAST_REFRESH = None
+    _REFRESH = None
+    for name in _STATS:
+        _STATS[name] = 0
@@ -0,0 +1,191 @@
+"""Two-tier response cache for model calls: in-process LRU plus a shared store."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import (
+    RESPONSE_CACHE_ENABLED,
+    RESPONSE_CACHE_MAX_BYTES,
+    RESPONSE_CACHE_SHARED,
+    RESPONSE_CACHE_TTL,
+)
+
+
+def cache_key(model: str, messages: List[Dict[str, Any]], params: Dict[str, Any] | None = None) -> str:
+    """
+    Stable hash of a model call.
+
+    Messages are reduced to role and content (surrounding whitespace stripped)
+    and keys are sorted, so equivalent requests hash the same.
+    """
+    normalized = [
+        {
+            "role": message.get("role"),
+            "content": message["content"].strip() if isinstance(message.get("content"), str) else message.get("content"),
+        }
+        for message in messages
+    ]
+    payload = json.dumps(
+        {"model": model, "messages": normalized, "params": params or {}},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """In-memory LRU of JSON-serializable values with a TTL and a total size bound in bytes."""
+
+    def __init__(self, max_bytes: int, ttl: float) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bytes = 0
+        self._entries: OrderedDict[str, Tuple[float, int, Dict[str, Any]]] = OrderedDict()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, _, value = entry
+        if expires_at <= time.monotonic():
+            self._discard(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: Dict[str, Any]) -> int:
+        """Store value, returning how many entries were evicted to make room."""
+        size = len(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+        self._discard(key)
+        if size > self.max_bytes:
+            return 0
+        evicted = 0
+        while self.bytes + size > self.max_bytes:
+            self._discard(next(iter(self._entries)))
+            evicted += 1
+        self._entries[key] = (time.monotonic() + self.ttl, size, value)
+        self.bytes += size
+        return evicted
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.bytes = 0
+
+    def _discard(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[1]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class StorageCacheStore:
+    """Shared tier kept by the storage backend (see storage.get_cached_response)."""
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        from . import storage
+
+        return storage.get_cached_response(key)
+
+    def put(self, key: str, value: Dict[str, Any], ttl: float) -> None:
+        from . import storage
+
+        storage.put_cached_response(key, value, ttl)
+
+
+# Cache tiers and counters (persist across Lambda invocations in warm containers)
+_MEMORY = LRUCache(RESPONSE_CACHE_MAX_BYTES, RESPONSE_CACHE_TTL)
+_SHARED: Any = StorageCacheStore() if RESPONSE_CACHE_SHARED else None
+_STATS = {"memory_hits": 0, "shared_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "errors": 0}
+
+# Per-request opt-out (e.g. "Cache-Control: no-cache"), inherited by tasks the request spawns
+_BYPASS: ContextVar[bool] = ContextVar("response_cache_bypass", default=False)
+
+
+def set_shared_store(store: Any) -> None:
+    """
+    Replace the shared tier (None disables it).
+
+    A store needs get(key) -> dict | None and put(key, value, ttl) methods;
+    both are called from a worker thread.
+    """
+    global _SHARED
+    _SHARED = store
+
+
+def set_request_bypass(bypass: bool) -> None:
+    """Skip the cache for the rest of the current request."""
+    _BYPASS.set(bypass)
+
+
+def enabled(use_cache: bool = True) -> bool:
+    return RESPONSE_CACHE_ENABLED and use_cache and not _BYPASS.get()
+
+
+async def lookup(key: str) -> Optional[Dict[str, Any]]:
+    """Return the cached response for key, checking memory then the shared tier."""
+    value = _MEMORY.get(key)
+    if value is not None:
+        _STATS["memory_hits"] += 1
+        return dict(value)
+
+    if _SHARED is not None:
+        from . import storage_async
+
+        try:
+            # On the storage pool, so shared-tier I/O counts against STORAGE_MAX_WORKERS
+            value = await storage_async.run(_SHARED.get, key)
+        except Exception as exc:  # noqa: BLE001
+            _STATS["errors"] += 1
+            print(f"Error reading shared response cache: {exc}")
+            value = None
+        if value is not None:
+            _STATS["shared_hits"] += 1
+            _STATS["evictions"] += _MEMORY.put(key, value)
+            return dict(value)
+
+    _STATS["misses"] += 1
+    return None
+
+
+async def store(key: str, value: Dict[str, Any]) -> None:
+    """Cache a successful response in both tiers."""
+    _STATS["stores"] += 1
+    _STATS["evictions"] += _MEMORY.put(key, value)
+    if _SHARED is not None:
+        from . import storage_async
+
+        try:
+            await storage_async.run(_SHARED.put, key, value, RESPONSE_CACHE_TTL)
+        except Exception as exc:  # noqa: BLE001
+            _STATS["errors"] += 1
+            print(f"Error writing shared response cache: {exc}")
+
+
+def stats() -> Dict[str, Any]:
+    """Hit/miss counters and memory tier occupancy for this container."""
+    lookups = _STATS["memory_hits"] + _STATS["shared_hits"] + _STATS["misses"]
+    hits = lookups - _STATS["misses"]
+    return {
+        **_STATS,
+        "hit_rate": round(hits / lookups, 3) if lookups else None,
+        "memory_entries": len(_MEMORY),
+        "memory_bytes": _MEMORY.bytes,
+        "memory_max_bytes": _MEMORY.max_bytes,
+        "shared_tier": type(_SHARED).__name__ if _SHARED is not None else None,
+    }
+
+
+def clear() -> None:
+    """Empty the memory tier and reset counters (the shared tier expires on its own)."""
+    _MEMORY.clear()
+    for name in _STATS:
+        _STATS[name] = 0
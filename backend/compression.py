@@ -0,0 +1,98 @@
+"""Compressed, versioned encoding of large stage payloads for storage."""
+
+from __future__ import annotations
+
+import gzip
+from typing import Any
+
+from . import serialization
+from .config import STAGE_COMPRESSION, STAGE_COMPRESSION_LEVEL, STAGE_COMPRESSION_MIN_BYTES
+
+# First byte of every encoded blob: which format follows
+CODEC_GZIP = 1
+CODEC_ZSTD = 2
+
+_CODEC_NAMES = {"gzip": CODEC_GZIP, "zstd": CODEC_ZSTD}
+
+
+def _zstd_module() -> Any:
+    """Optional zstd support: the zstandard package (or compression.zstd on Python 3.14+)."""
+    try:
+        import zstandard
+    except ImportError:
+        pass
+    else:
+        return zstandard
+    try:
+        from compression import zstd
+    except ImportError:
+        return None
+    return zstd
+
+
+def zstd_available() -> bool:
+    return _zstd_module() is not None
+
+
+def _compress(data: bytes, codec: int, level: int | None) -> bytes:
+    if codec == CODEC_GZIP:
+        return gzip.compress(data, compresslevel=level or 6, mtime=0)
+    zstd = _zstd_module()
+    if hasattr(zstd, "compress"):
+        return zstd.compress(data, level or 3)
+    return zstd.ZstdCompressor(level=level or 3).compress(data)
+
+
+def _decompress(blob: bytes, codec: int) -> bytes:
+    if codec == CODEC_GZIP:
+        return gzip.decompress(blob)
+    if codec == CODEC_ZSTD:
+        zstd = _zstd_module()
+        if zstd is None:
+            raise RuntimeError("Stored payload is zstd-compressed but no zstd module is installed")
+        if hasattr(zstd, "decompress"):
+            return zstd.decompress(blob)
+        return zstd.ZstdDecompressor().decompress(blob)
+    raise ValueError(f"Unknown payload codec {codec}")
+
+
+def default_codec() -> int | None:
+    """Codec chosen by STAGE_COMPRESSION ("auto" prefers zstd when installed; "none" disables)."""
+    if STAGE_COMPRESSION == "none":
+        return None
+    if STAGE_COMPRESSION == "auto":
+        return CODEC_ZSTD if zstd_available() else CODEC_GZIP
+    return _CODEC_NAMES[STAGE_COMPRESSION]
+
+
+def pack(value: Any, codec: int | None = None, level: int | None = None) -> Any:
+    """
+    Encode value as a versioned compressed blob, or return it unchanged.
+
+    Values whose JSON is smaller than STAGE_COMPRESSION_MIN_BYTES are left
+    as-is, since compression would not pay for itself.
+
+    Args:
+        value: JSON-serializable payload (e.g. a stage1 list)
+        codec: CODEC_GZIP or CODEC_ZSTD (default_codec() if None)
+        level: Compression level (STAGE_COMPRESSION_LEVEL, else the codec's default, if None)
+    """
+    if codec is None:
+        codec = default_codec()
+        if codec is None:
+            return value
+    if level is None:
+        level = STAGE_COMPRESSION_LEVEL
+    data = serialization.dumps_utf8(value).encode("utf-8")
+    if len(data) < STAGE_COMPRESSION_MIN_BYTES:
+        return value
+    return bytes([codec]) + _compress(data, codec, level)
+
+
+def unpack(value: Any) -> Any:
+    """Decode a blob made by pack; any other value (e.g. uncompressed legacy data) passes through."""
+    if hasattr(value, "value") and isinstance(value.value, (bytes, bytearray)):
+        value = value.value  # boto3 Binary
+    if not isinstance(value, (bytes, bytearray)):
+        return value
+    return serialization.loads(_decompress(bytes(value[1:]), value[0]))
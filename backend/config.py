@@ -39,6 +39,32 @@ COUNCIL_MODELS = [
 # Chairman model - synthesizes final response
 CHAIRMAN_MODEL = "google/gemini-3-pro-preview"
 
+# Stage 1 early advance: move on to ranking once STAGE1_QUORUM responses are in,
+# or once STAGE1_SOFT_DEADLINE seconds have passed (0 disables either trigger).
+# With STAGE1_LATE_ENTRIES, responses that land while Stage 2 runs still reach
+# the chairman as unranked "late entries"; otherwise stragglers are cancelled.
+STAGE1_QUORUM = int(os.getenv("STAGE1_QUORUM", "0"))
+STAGE1_SOFT_DEADLINE = float(os.getenv("STAGE1_SOFT_DEADLINE", "0"))
+STAGE1_LATE_ENTRIES = os.getenv("STAGE1_LATE_ENTRIES", "true").lower() == "true"
+
+# Chairman fallback chain - tried in order if the chairman fails
+CHAIRMAN_FALLBACK_MODELS = [
+    "anthropic/claude-sonnet-4.5",
+    "openai/gpt-5.1",
+]
+
+# Hedged requests: if a model hasn't answered by its observed HEDGE_PERCENTILE
+# latency (HEDGE_DEFAULT_DELAY until there is history), send the same prompt to
+# an equivalent model and keep whichever answers first. Models not listed in
+# HEDGE_ALTERNATES are hedged to themselves via OpenRouter's fastest provider.
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "true").lower() == "true"
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", "2"))
+HEDGE_DEFAULT_DELAY = float(os.getenv("HEDGE_DEFAULT_DELAY", "45"))
+HEDGE_ALTERNATES = {
+    # "x-ai/grok-4": "x-ai/grok-4-fast",
+}
+
 # Models/families to hide from UI/model picker
 # Examples:
 # EXCLUDED_MODEL_FAMILIES = ["huggingface", "replicate"]
@@ -51,8 +77,99 @@ EXCLUDED_MODELS = ["mistralai/voxtral-small-24b-2507"]
 # Regex/wildcard patterns to hide models (e.g., r"openai/gpt-.*")
 EXCLUDED_MODEL_PATTERNS = []
 
-# OpenRouter API endpoint
-OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
+# OpenRouter API endpoints (base URL is overridable for local stand-in servers)
+OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1").rstrip("/")
+OPENROUTER_API_URL = f"{OPENROUTER_BASE_URL}/chat/completions"
+OPENROUTER_MODELS_URL = f"{OPENROUTER_BASE_URL}/models"
+
+# Shared HTTP client pool for OpenRouter traffic (kept alive across warm invocations)
+OPENROUTER_HTTP2 = os.getenv("OPENROUTER_HTTP2", "true").lower() == "true"
+OPENROUTER_MAX_CONNECTIONS = int(os.getenv("OPENROUTER_MAX_CONNECTIONS", "20"))
+OPENROUTER_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENROUTER_MAX_KEEPALIVE_CONNECTIONS", "10"))
+OPENROUTER_KEEPALIVE_EXPIRY = float(os.getenv("OPENROUTER_KEEPALIVE_EXPIRY", "60"))
+OPENROUTER_CONNECT_TIMEOUT = float(os.getenv("OPENROUTER_CONNECT_TIMEOUT", "10"))
+
+# Retries for rate limits, 5xx and network errors (exponential backoff with jitter)
+OPENROUTER_MAX_RETRIES = int(os.getenv("OPENROUTER_MAX_RETRIES", "2"))
+OPENROUTER_RETRY_BASE_DELAY = float(os.getenv("OPENROUTER_RETRY_BASE_DELAY", "0.5"))
+OPENROUTER_RETRY_MAX_DELAY = float(os.getenv("OPENROUTER_RETRY_MAX_DELAY", "8"))
+
+# Per-model circuit breaker: skip a model for BREAKER_COOLDOWN seconds after
+# BREAKER_FAILURE_THRESHOLD consecutive failures
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "3"))
+BREAKER_COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", "60"))
+
+# Adaptive timeouts: once a model has LATENCY_MIN_SAMPLES calls of history in a
+# stage, its timeout there becomes the recent ADAPTIVE_TIMEOUT_PERCENTILE latency
+# times ADAPTIVE_TIMEOUT_HEADROOM plus ADAPTIVE_TIMEOUT_PADDING seconds, never
+# below ADAPTIVE_TIMEOUT_MIN nor above the call's fixed timeout (120s, 30s for
+# titles). Histograms with new samples are saved to storage at the end of an
+# invocation at most every LATENCY_SAVE_INTERVAL seconds (waiting up to
+# LATENCY_SAVE_TIMEOUT seconds for the write), and when the container shuts
+# down, so cold containers start with what warm ones learned.
+ADAPTIVE_TIMEOUTS = os.getenv("ADAPTIVE_TIMEOUTS", "true").lower() == "true"
+ADAPTIVE_TIMEOUT_PERCENTILE = float(os.getenv("ADAPTIVE_TIMEOUT_PERCENTILE", "99"))
+ADAPTIVE_TIMEOUT_HEADROOM = float(os.getenv("ADAPTIVE_TIMEOUT_HEADROOM", "1.5"))
+ADAPTIVE_TIMEOUT_PADDING = float(os.getenv("ADAPTIVE_TIMEOUT_PADDING", "5"))
+ADAPTIVE_TIMEOUT_MIN = float(os.getenv("ADAPTIVE_TIMEOUT_MIN", "15"))
+LATENCY_MIN_SAMPLES = int(os.getenv("LATENCY_MIN_SAMPLES", "10"))
+LATENCY_SAVE_INTERVAL = float(os.getenv("LATENCY_SAVE_INTERVAL", "300"))
+LATENCY_SAVE_TIMEOUT = float(os.getenv("LATENCY_SAVE_TIMEOUT", "0.5"))
+
+# Response cache for model calls: an in-process LRU (RESPONSE_CACHE_MAX_BYTES)
+# in front of a shared tier kept by the storage backend, both expiring after
+# RESPONSE_CACHE_TTL seconds. Requests sent with "Cache-Control: no-cache" skip it.
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+RESPONSE_CACHE_SHARED = os.getenv("RESPONSE_CACHE_SHARED", "true").lower() == "true"
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# User settings (council models and debate panel) are cached per warm container
+# for SETTINGS_CACHE_TTL seconds (0 disables), for up to SETTINGS_CACHE_MAX_ENTRIES
+# users. Saving settings clears the entry in the container that handled the save;
+# other containers can serve the previous settings until their entry expires.
+SETTINGS_CACHE_TTL = float(os.getenv("SETTINGS_CACHE_TTL", "30"))
+SETTINGS_CACHE_MAX_ENTRIES = int(os.getenv("SETTINGS_CACHE_MAX_ENTRIES", "1024"))
+
+# Where conversations, settings and caches are kept: "dynamodb" (the deployed
+# stack), "sqlite" (a single-node, self-hosted database file at SQLITE_PATH)
+# or "memory" (process-local, lost on restart; for local runs and benchmarks)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "dynamodb").lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", "llm-council.db")
 
 # DynamoDB table for conversation storage
 CONVERSATIONS_TABLE = os.getenv("CONVERSATIONS_TABLE", "llm-council-conversations")
+# DynamoDB table holding one item per message, keyed by (conversation_id, seq)
+MESSAGES_TABLE = os.getenv("MESSAGES_TABLE", "llm-council-messages")
+# Compression of stored stage 1/2/3 payloads: "gzip", "zstd" (needs the
+# zstandard package), "auto" (zstd if installed, else gzip) or "none".
+# Payloads under STAGE_COMPRESSION_MIN_BYTES of JSON are stored as-is;
+# STAGE_COMPRESSION_LEVEL 0 means the codec's default level.
+STAGE_COMPRESSION = os.getenv("STAGE_COMPRESSION", "gzip").lower()
+STAGE_COMPRESSION_LEVEL = int(os.getenv("STAGE_COMPRESSION_LEVEL", "0"))
+STAGE_COMPRESSION_MIN_BYTES = int(os.getenv("STAGE_COMPRESSION_MIN_BYTES", "512"))
+# Index on (user_id, created_at) used to list a user's conversations newest first
+CONVERSATIONS_USER_INDEX = os.getenv("CONVERSATIONS_USER_INDEX", "user_id-created_at-index")
+# Largest page a conversation listing (or message page) may ask for with ?limit=
+LIST_PAGE_MAX = int(os.getenv("LIST_PAGE_MAX", "200"))
+# Worker threads for DynamoDB calls made from async handlers (backend.storage_async),
+# which bounds how many storage round trips one container has in flight
+STORAGE_MAX_WORKERS = int(os.getenv("STORAGE_MAX_WORKERS", "8"))
+
+# Cognito user pool whose tokens are verified here (Function URL access). When
+# unset, API Gateway has already verified the token and it is only decoded.
+COGNITO_USER_POOL_ID = os.getenv("COGNITO_USER_POOL_ID")
+AWS_REGION = os.getenv("AWS_REGION", "us-west-2")
+# The pool's signing keys are fetched once and again only when a token names an
+# unknown kid, at most once per JWKS_REFRESH_INTERVAL seconds. Verified claims
+# are remembered until the token expires, for up to AUTH_CLAIMS_CACHE_MAX_ENTRIES tokens.
+JWKS_REFRESH_INTERVAL = float(os.getenv("JWKS_REFRESH_INTERVAL", "10"))
+AUTH_CLAIMS_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CLAIMS_CACHE_MAX_ENTRIES", "4096"))
+# Encoder for API responses and stored payloads: "orjson" (needs the orjson
+# package), "json" (standard library) or "auto" (orjson if installed, else json)
+JSON_ENCODER = os.getenv("JSON_ENCODER", "auto").lower()
+# Non-streaming response bodies of at least RESPONSE_COMPRESSION_MIN_BYTES are
+# compressed when the client's Accept-Encoding allows: brotli (needs the brotli
+# package) in preference to gzip. "false" sends every body uncompressed.
+RESPONSE_COMPRESSION = os.getenv("RESPONSE_COMPRESSION", "true").lower() == "true"
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
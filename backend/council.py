@@ -1,8 +1,25 @@
 """3-stage LLM Council orchestration."""
 
-from typing import List, Dict, Any, Tuple
-from .openrouter import query_models_parallel, query_model
-from .config import COUNCIL_MODELS, CHAIRMAN_MODEL
+import asyncio
+import time
+from typing import List, Dict, Any, Tuple, AsyncIterator, Awaitable, Callable
+from .openrouter import (
+    query_model,
+    query_model_hedged,
+    query_models_as_completed,
+    query_models_parallel,
+    stream_model,
+)
+from .resilience import breaker_snapshot
+from .config import (
+    COUNCIL_MODELS,
+    CHAIRMAN_FALLBACK_MODELS,
+    CHAIRMAN_MODEL,
+    HEDGE_ENABLED,
+    STAGE1_LATE_ENTRIES,
+    STAGE1_QUORUM,
+    STAGE1_SOFT_DEADLINE,
+)
 
 
 async def stage1_collect_responses(
@@ -22,35 +39,126 @@ async def stage1_collect_responses(
     models_to_use = models or COUNCIL_MODELS
 
     # Query all models in parallel
-    responses = await query_models_parallel(models_to_use, messages)
+    responses = await query_models_parallel(models_to_use, messages, stage="stage1")
 
-    # Format results
-    stage1_results = []
-    for model, response in responses.items():
-        if response is not None:  # Only include successful responses
-            stage1_results.append({
-                "model": model,
-                "response": response.get('content', '')
-            })
+    # Format results (only successful responses)
+    return _format_stage1(models_to_use, responses)
 
-    return stage1_results
 
-
-async def stage2_collect_rankings(
+async def stage1_collect_early(
     user_query: str,
-    stage1_results: List[Dict[str, Any]],
-    models: List[str] | None = None
-) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+    models: List[str] | None = None,
+    quorum: int | None = None,
+    soft_deadline: float | None = None
+) -> Tuple[List[Dict[str, Any]], Dict[str, asyncio.Task], Dict[str, Any]]:
     """
-    Stage 2: Each model ranks the anonymized responses.
+    Stage 1 with early advance: stop waiting once a quorum or soft deadline is hit.
 
     Args:
-        user_query: The original user query
-        stage1_results: Results from Stage 1
+        user_query: The user's question
+        models: Council models to query
+        quorum: Proceed once this many models have responded (default STAGE1_QUORUM)
+        soft_deadline: Proceed after this many seconds, once at least one model
+            has responded (default STAGE1_SOFT_DEADLINE)
 
     Returns:
-        Tuple of (rankings list, label_to_model mapping)
+        Tuple of (stage1_results, still-running calls by model, cutoff metadata)
+    """
+    messages = [{"role": "user", "content": user_query}]
+    models_to_use = models or COUNCIL_MODELS
+    quorum = STAGE1_QUORUM if quorum is None else quorum
+    soft_deadline = STAGE1_SOFT_DEADLINE if soft_deadline is None else soft_deadline
+
+    started = time.monotonic()
+    responses: Dict[str, Any] = {}
+    pending: Dict[str, asyncio.Task] = {}
+    async for model, response in query_models_as_completed(
+        models_to_use,
+        messages,
+        quorum=quorum,
+        soft_deadline=soft_deadline,
+        pending=pending,
+        stage="stage1",
+    ):
+        responses[model] = response
+
+    stage1_results = _format_stage1(models_to_use, responses)
+    cutoff = _stage1_cutoff(responses, pending, quorum, time.monotonic() - started)
+    return stage1_results, pending, cutoff
+
+
+def _format_stage1(models: List[str], responses: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Shape successful Stage 1 responses in council order."""
+    return [
+        _format_response(model, responses[model])
+        for model in models
+        if responses.get(model) is not None
+    ]
+
+
+def _format_response(model: str, response: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape one model's Stage 1 response, noting if a hedge answered for it."""
+    result = {"model": model, "response": response.get('content', '')}
+    if response.get('served_by'):
+        result["served_by"] = response['served_by']
+    return result
+
+
+def _stage1_cutoff(
+    responses: Dict[str, Any],
+    pending: Dict[str, asyncio.Task],
+    quorum: int,
+    elapsed: float
+) -> Dict[str, Any]:
+    """Record why Stage 1 stopped and which models were left out."""
+    if not pending:
+        trigger = "all_responded"
+    elif quorum and sum(r is not None for r in responses.values()) >= quorum:
+        trigger = "quorum_reached"
+    else:
+        trigger = "soft_deadline"
+
+    cut_models = {model: "failed" for model, response in responses.items() if response is None}
+    cut_models.update({model: trigger for model in pending})
+    return {
+        "trigger": trigger,
+        "elapsed_seconds": round(elapsed, 2),
+        "cut_models": cut_models,
+        "late_entries": [],
+    }
+
+
+def _collect_late_entries(
+    pending: Dict[str, asyncio.Task],
+    cutoff: Dict[str, Any],
+    accept_late: bool
+) -> List[Dict[str, Any]]:
     """
+    Turn Stage 1 stragglers that have finished by now into late entries.
+
+    Calls still running are cancelled and stay in cutoff['cut_models'].
+    """
+    late_results = []
+    for model, task in pending.items():
+        if not task.done() or not accept_late:
+            task.cancel()
+            continue
+        response = task.result()
+        if response is None:
+            cutoff["cut_models"][model] = "failed"
+            continue
+        cutoff["cut_models"].pop(model, None)
+        cutoff["late_entries"].append(model)
+        late_results.append({**_format_response(model, response), "late": True})
+    pending.clear()
+    return late_results
+
+
+def _build_ranking_messages(
+    user_query: str,
+    stage1_results: List[Dict[str, Any]]
+) -> Tuple[List[Dict[str, str]], Dict[str, str]]:
+    """Build the anonymized Stage 2 ranking prompt and its label_to_model mapping."""
     # Create anonymized labels for responses (Response A, Response B, etc.)
     labels = [chr(65 + i) for i in range(len(stage1_results))]  # A, B, C, ...
 
@@ -97,47 +205,61 @@ FINAL RANKING:
 
 Now provide your evaluation and ranking:"""
 
-    messages = [{"role": "user", "content": ranking_prompt}]
-    models_to_use = models or COUNCIL_MODELS
-
-    # Get rankings from all council models in parallel
-    responses = await query_models_parallel(models_to_use, messages)
-
-    # Format results
-    stage2_results = []
-    for model, response in responses.items():
-        if response is not None:
-            full_text = response.get('content', '')
-            parsed = parse_ranking_from_text(full_text)
-            stage2_results.append({
-                "model": model,
-                "ranking": full_text,
-                "parsed_ranking": parsed
-            })
+    return [{"role": "user", "content": ranking_prompt}], label_to_model
 
-    return stage2_results, label_to_model
 
-
-async def stage3_synthesize_final(
+async def stage2_collect_rankings(
     user_query: str,
     stage1_results: List[Dict[str, Any]],
-    stage2_results: List[Dict[str, Any]],
-    chairman_model: str | None = None
-) -> Dict[str, Any]:
+    models: List[str] | None = None
+) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
     """
-    Stage 3: Chairman synthesizes final response.
+    Stage 2: Each model ranks the anonymized responses.
 
     Args:
         user_query: The original user query
-        stage1_results: Individual model responses from Stage 1
-        stage2_results: Rankings from Stage 2
+        stage1_results: Results from Stage 1
 
     Returns:
-        Dict with 'model' and 'response' keys
+        Tuple of (rankings list, label_to_model mapping)
     """
+    messages, label_to_model = _build_ranking_messages(user_query, stage1_results)
+    models_to_use = models or COUNCIL_MODELS
+
+    # Get rankings from all council models in parallel
+    responses = await query_models_parallel(models_to_use, messages, stage="stage2")
+
+    # Format results
+    stage2_results = [
+        _format_ranking(model, response)
+        for model, response in responses.items()
+        if response is not None
+    ]
+
+    return stage2_results, label_to_model
+
+
+def _format_ranking(model: str, response: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape one model's Stage 2 response as a ranking result."""
+    full_text = response.get('content', '')
+    return {
+        "model": model,
+        "ranking": full_text,
+        "parsed_ranking": parse_ranking_from_text(full_text)
+    }
+
+
+def _build_chairman_messages(
+    user_query: str,
+    stage1_results: List[Dict[str, Any]],
+    stage2_results: List[Dict[str, Any]]
+) -> List[Dict[str, str]]:
+    """Build the Stage 3 chairman prompt from the earlier stages."""
     # Build comprehensive context for chairman
     stage1_text = "\n\n".join([
-        f"Model: {result['model']}\nResponse: {result['response']}"
+        f"Model: {result['model']}"
+        f"{' (late entry, not peer-ranked)' if result.get('late') else ''}"
+        f"\nResponse: {result['response']}"
         for result in stage1_results
     ])
 
@@ -163,25 +285,55 @@ Your task as Chairman is to synthesize all of this information into a single, co
 
 Provide a clear, well-reasoned final answer that represents the council's collective wisdom:"""
 
-    messages = [{"role": "user", "content": chairman_prompt}]
+    return [{"role": "user", "content": chairman_prompt}]
 
-    # Query the chairman model
-    chair = chairman_model or CHAIRMAN_MODEL
-    response = await query_model(chair, messages)
 
-    if response is None:
-        # Fallback if chairman fails
-        return {
-            "model": chair,
-            "response": "Error: Unable to generate final synthesis."
+async def stage3_synthesize_final(
+    user_query: str,
+    stage1_results: List[Dict[str, Any]],
+    stage2_results: List[Dict[str, Any]],
+    chairman_model: str | None = None
+) -> Dict[str, Any]:
+    """
+    Stage 3: Chairman synthesizes final response.
+
+    Args:
+        user_query: The original user query
+        stage1_results: Individual model responses from Stage 1
+        stage2_results: Rankings from Stage 2
+
+    Returns:
+        Dict with 'model' and 'response' keys
+    """
+    messages = _build_chairman_messages(user_query, stage1_results, stage2_results)
+
+    # Query the chairman model, falling back along the chain if it fails
+    chair = chairman_model or CHAIRMAN_MODEL
+    query = query_model_hedged if HEDGE_ENABLED else query_model
+    for candidate in _chairman_chain(chair):
+        response = await query(candidate, messages, stage="stage3")
+        if response is None:
+            continue
+        result = {
+            "model": candidate,
+            "response": response.get('content', '')
         }
+        if candidate != chair:
+            result["requested_model"] = chair
+        return result
 
     return {
         "model": chair,
-        "response": response.get('content', '')
+        "response": "Error: Unable to generate final synthesis.",
+        "error": True
     }
 
 
+def _chairman_chain(chair: str) -> List[str]:
+    """The requested chairman followed by CHAIRMAN_FALLBACK_MODELS, deduplicated."""
+    return list(dict.fromkeys([chair, *CHAIRMAN_FALLBACK_MODELS]))
+
+
 def parse_ranking_from_text(ranking_text: str) -> List[str]:
     """
     Parse the FINAL RANKING section from the model's response.
@@ -283,7 +435,7 @@ Title:"""
     messages = [{"role": "user", "content": title_prompt}]
 
     # Use gemini-2.5-flash for title generation (fast and cheap)
-    response = await query_model("google/gemini-2.5-flash", messages, timeout=30.0)
+    response = await query_model("google/gemini-2.5-flash", messages, timeout=30.0, stage="title")
 
     if response is None:
         # Fallback to a generic title
@@ -301,57 +453,359 @@ Title:"""
     return title
 
 
+# Called with a stage name and the results to store once that stage completes
+StageCallback = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
 async def run_full_council(
     user_query: str,
     council_models: List[str] | None = None,
-    chairman_model: str | None = None
+    chairman_model: str | None = None,
+    quorum: int | None = None,
+    soft_deadline: float | None = None,
+    late_entries: bool | None = None,
+    on_stage: StageCallback | None = None
 ) -> Tuple[List, List, Dict, Dict]:
     """
     Run the complete 3-stage council process.
 
     Args:
         user_query: The user's question
+        council_models: Council members (defaults to COUNCIL_MODELS)
+        chairman_model: Chairman (defaults to CHAIRMAN_MODEL)
+        quorum, soft_deadline: Stage 1 early-advance policy (see stage1_collect_early)
+        late_entries: Let Stage 1 stragglers that finish during Stage 2 reach
+            the chairman (default STAGE1_LATE_ENTRIES)
+        on_stage: Checkpoint hook, called as on_stage("stage1", {"stage1": ...})
+            and on_stage("stage2", {"stage2": ..., "label_to_model": ...,
+            "aggregate_rankings": ..., plus "stage1" if late entries
+            joined}). Each call runs alongside the next stage, and the next
+            call waits for it, so checkpoints land in order.
 
     Returns:
         Tuple of (stage1_results, stage2_results, stage3_result, metadata)
     """
-    # Stage 1: Collect individual responses
-    stage1_results = await stage1_collect_responses(user_query, models=council_models)
-
-    # If no models responded successfully, return error
-    if not stage1_results:
-        return [], [], {
-            "model": "error",
-            "response": "All models failed to respond. Please try again."
-        }, {}
-
-    # Stage 2: Collect rankings
-    stage2_results, label_to_model = await stage2_collect_rankings(
+    accept_late = STAGE1_LATE_ENTRIES if late_entries is None else late_entries
+    checkpoint = None
+
+    # Stage 1: Collect individual responses, advancing early per the policy
+    stage1_results, pending, cutoff = await stage1_collect_early(
         user_query,
-        stage1_results,
         models=council_models,
+        quorum=quorum,
+        soft_deadline=soft_deadline,
     )
+    if not accept_late:
+        _collect_late_entries(pending, cutoff, accept_late)
+
+    try:
+        # If no models responded successfully, return error
+        if not stage1_results:
+            return [], [], {
+                "model": "error",
+                "response": "All models failed to respond. Please try again."
+            }, {
+                "stage1_cutoff": cutoff,
+                "circuit_breakers": breaker_snapshot(council_models or COUNCIL_MODELS),
+            }
+
+        if on_stage is not None:
+            checkpoint = asyncio.create_task(on_stage("stage1", {"stage1": stage1_results}))
+
+        # Stage 2: Collect rankings
+        stage2_results, label_to_model = await stage2_collect_rankings(
+            user_query,
+            stage1_results,
+            models=council_models,
+        )
+    except BaseException:
+        # Let the Stage 1 checkpoint land before failing, so a resume can start from it
+        if checkpoint is not None:
+            await asyncio.wait([checkpoint])
+        raise
+    finally:
+        # Stragglers that landed during Stage 2 join as unranked late entries
+        late_results = _collect_late_entries(pending, cutoff, accept_late)
 
     # Calculate aggregate rankings
     aggregate_rankings = calculate_aggregate_rankings(stage2_results, label_to_model)
 
     # Stage 3: Synthesize final answer
+    stage1_results = stage1_results + late_results
+    if checkpoint is not None:
+        await checkpoint
+        fields = {
+            "stage2": stage2_results,
+            "label_to_model": label_to_model,
+            "aggregate_rankings": aggregate_rankings,
+            **({"stage1": stage1_results} if late_results else {}),
+        }
+        checkpoint = asyncio.create_task(on_stage("stage2", fields))
     stage3_result = await stage3_synthesize_final(
         user_query,
         stage1_results,
         stage2_results,
         chairman_model=chairman_model,
     )
+    if checkpoint is not None:
+        await checkpoint
 
     # Prepare metadata
     metadata = {
         "label_to_model": label_to_model,
-        "aggregate_rankings": aggregate_rankings
+        "aggregate_rankings": aggregate_rankings,
+        "stage1_cutoff": cutoff,
+        "circuit_breakers": breaker_snapshot(
+            (council_models or COUNCIL_MODELS) + [stage3_result["model"]]
+        ),
+    }
+
+    return stage1_results, stage2_results, stage3_result, metadata
+
+
+async def resume_council(
+    user_query: str,
+    stage1_results: List[Dict[str, Any]],
+    stage2_results: List[Dict[str, Any]] | None = None,
+    council_models: List[str] | None = None,
+    chairman_model: str | None = None,
+    on_stage: StageCallback | None = None
+) -> Tuple[List, List, Dict, Dict]:
+    """
+    Finish a council run from its stored stages instead of starting over.
+
+    Stage 2 runs only if stage2_results is None; Stage 3 always runs. The
+    anonymized labels are rebuilt from the ranked (non-late) Stage 1 results,
+    in stored order, so they match the ones the rankings were written against.
+
+    Args:
+        user_query: The user's question
+        stage1_results: Stored Stage 1 results (late entries included)
+        stage2_results: Stored Stage 2 results, or None to rank again
+        council_models: Ranking panel (defaults to COUNCIL_MODELS)
+        chairman_model: Chairman (defaults to CHAIRMAN_MODEL)
+        on_stage: Checkpoint hook, called as on_stage("stage2", {"stage2": ...,
+            "label_to_model": ..., "aggregate_rankings": ...}) if Stage 2 runs
+
+    Returns:
+        Tuple of (stage1_results, stage2_results, stage3_result, metadata),
+        as from run_full_council
+    """
+    ranked = [result for result in stage1_results if not result.get("late")]
+    resumed_from = "stage1" if stage2_results is None else "stage2"
+    if stage2_results is None:
+        stage2_results, label_to_model = await stage2_collect_rankings(
+            user_query,
+            ranked,
+            models=council_models,
+        )
+        aggregate_rankings = calculate_aggregate_rankings(stage2_results, label_to_model)
+        if on_stage is not None:
+            await on_stage(
+                "stage2",
+                {"stage2": stage2_results, "label_to_model": label_to_model, "aggregate_rankings": aggregate_rankings},
+            )
+    else:
+        _, label_to_model = _build_ranking_messages(user_query, ranked)
+        aggregate_rankings = calculate_aggregate_rankings(stage2_results, label_to_model)
+
+    stage3_result = await stage3_synthesize_final(
+        user_query,
+        stage1_results,
+        stage2_results,
+        chairman_model=chairman_model,
+    )
+
+    metadata = {
+        "label_to_model": label_to_model,
+        "aggregate_rankings": aggregate_rankings,
+        "resumed_from": resumed_from,
+        "circuit_breakers": breaker_snapshot(
+            (council_models or COUNCIL_MODELS) + [stage3_result["model"]]
+        ),
     }
 
     return stage1_results, stage2_results, stage3_result, metadata
 
 
+async def rerun_stages(
+    user_query: str,
+    stage1_results: List[Dict[str, Any]],
+    stage2_results: List[Dict[str, Any]] | None = None,
+    ranking_models: List[str] | None = None,
+    chairman_model: str | None = None
+) -> Dict[str, Any]:
+    """
+    Re-run Stage 2 with another panel and/or Stage 3 with another chairman over stored results.
+
+    Stage 1 is never repeated, so trying a different chairman costs one
+    model call instead of a whole council run.
+
+    Args:
+        user_query: The user's question
+        stage1_results: Stored Stage 1 results (late entries included)
+        stage2_results: Stored Stage 2 results (needed unless ranking_models is given)
+        ranking_models: Re-rank the Stage 1 responses with this panel
+        chairman_model: Synthesize again with this chairman, from the new
+            rankings if ranking_models is given, else the stored ones
+
+    Returns:
+        Dict with the new 'stage2' (if ranking_models) and/or 'stage3' (if
+        chairman_model), plus 'metadata' with label_to_model and
+        aggregate_rankings for the rankings used
+    """
+    ranked = [result for result in stage1_results if not result.get("late")]
+    result: Dict[str, Any] = {}
+    if ranking_models:
+        stage2_results, label_to_model = await stage2_collect_rankings(user_query, ranked, models=ranking_models)
+        result["stage2"] = stage2_results
+    else:
+        _, label_to_model = _build_ranking_messages(user_query, ranked)
+
+    if chairman_model:
+        result["stage3"] = await stage3_synthesize_final(
+            user_query,
+            stage1_results,
+            stage2_results or [],
+            chairman_model=chairman_model,
+        )
+
+    result["metadata"] = {
+        "label_to_model": label_to_model,
+        "aggregate_rankings": calculate_aggregate_rankings(stage2_results or [], label_to_model),
+    }
+    return result
+
+
+async def run_council_stream(
+    user_query: str,
+    council_models: List[str] | None = None,
+    chairman_model: str | None = None,
+    quorum: int | None = None,
+    soft_deadline: float | None = None,
+    late_entries: bool | None = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run the 3-stage council process, yielding typed events as results land.
+
+    Takes the same arguments as run_full_council.
+
+    Events (each a dict with a 'type' key):
+        stage1_start, stage1_result (one per model, in completion order),
+        stage1_complete (with stage1_cutoff metadata), stage2_start,
+        stage2_result (one per ranking), stage1_result with 'late': True for
+        late entries, stage2_complete (with label_to_model/aggregate_rankings/
+        stage1_cutoff metadata), stage3_start, stage3_delta (chairman token
+        deltas), stage3_complete (with circuit_breakers metadata; its data
+        has 'error' and 'truncated' set if the chairman's stream failed or
+        hit the length limit part-way), or error if no council member
+        responded.
+    """
+    models_to_use = council_models or COUNCIL_MODELS
+    quorum = STAGE1_QUORUM if quorum is None else quorum
+    soft_deadline = STAGE1_SOFT_DEADLINE if soft_deadline is None else soft_deadline
+    accept_late = STAGE1_LATE_ENTRIES if late_entries is None else late_entries
+
+    # Stage 1: emit each response as soon as it arrives
+    yield {"type": "stage1_start"}
+    messages = [{"role": "user", "content": user_query}]
+    started = time.monotonic()
+    responses: Dict[str, Any] = {}
+    pending: Dict[str, asyncio.Task] = {}
+    try:
+        async for model, response in query_models_as_completed(
+            models_to_use,
+            messages,
+            quorum=quorum,
+            soft_deadline=soft_deadline,
+            pending=pending,
+            stage="stage1",
+        ):
+            responses[model] = response
+            if response is not None:
+                yield {"type": "stage1_result", "data": _format_response(model, response)}
+
+        # Keep council order so anonymized labels match the non-streaming path
+        stage1_results = _format_stage1(models_to_use, responses)
+        cutoff = _stage1_cutoff(responses, pending, quorum, time.monotonic() - started)
+        if not accept_late:
+            _collect_late_entries(pending, cutoff, accept_late)
+        yield {"type": "stage1_complete", "data": stage1_results, "metadata": {"stage1_cutoff": cutoff}}
+
+        if not stage1_results:
+            yield {
+                "type": "error",
+                "message": "All models failed to respond. Please try again.",
+                "metadata": {"circuit_breakers": breaker_snapshot(models_to_use)},
+            }
+            return
+
+        # Stage 2: emit each ranking as it arrives
+        yield {"type": "stage2_start"}
+        messages, label_to_model = _build_ranking_messages(user_query, stage1_results)
+        rankings: Dict[str, Dict[str, Any]] = {}
+        async for model, response in query_models_as_completed(models_to_use, messages, stage="stage2"):
+            if response is None:
+                continue
+            rankings[model] = _format_ranking(model, response)
+            yield {"type": "stage2_result", "data": rankings[model]}
+    finally:
+        late_results = _collect_late_entries(pending, cutoff, accept_late) if pending else []
+
+    # Stragglers that landed during Stage 2 join as unranked late entries
+    for result in late_results:
+        yield {"type": "stage1_result", "data": result}
+    stage1_results = stage1_results + late_results
+
+    stage2_results = [rankings[model] for model in models_to_use if model in rankings]
+    metadata = {
+        "label_to_model": label_to_model,
+        "aggregate_rankings": calculate_aggregate_rankings(stage2_results, label_to_model),
+        "stage1_cutoff": cutoff,
+    }
+    yield {"type": "stage2_complete", "data": stage2_results, "metadata": metadata}
+
+    # Stage 3: stream the chairman's synthesis token by token, falling back
+    # along the chain if a chairman fails before producing any text
+    yield {"type": "stage3_start"}
+    chair = chairman_model or CHAIRMAN_MODEL
+    messages = _build_chairman_messages(user_query, stage1_results, stage2_results)
+    parts: List[str] = []
+    terminal: Dict[str, Any] = {}
+    for candidate in _chairman_chain(chair):
+        terminal = {}
+        async for event in stream_model(candidate, messages):
+            if event["type"] == "content":
+                parts.append(event["delta"])
+                yield {"type": "stage3_delta", "model": candidate, "delta": event["delta"]}
+            elif event["type"] in ("done", "error"):
+                terminal = event
+        if parts:
+            break
+
+    stage3_result = {
+        "model": candidate if parts else chair,
+        "response": "".join(parts) or "Error: Unable to generate final synthesis.",
+    }
+    if not parts:
+        stage3_result["error"] = True
+    else:
+        if candidate != chair:
+            stage3_result["requested_model"] = chair
+        # A stream that failed or hit the token limit part-way leaves a cut-off
+        # synthesis: flag it so it is not stored as a complete answer
+        if terminal.get("type") != "done" or terminal.get("finish_reason") == "length":
+            stage3_result["error"] = True
+            stage3_result["truncated"] = True
+            if terminal.get("type") == "error":
+                stage3_result["stream_error"] = terminal.get("error", "")
+    yield {
+        "type": "stage3_complete",
+        "data": stage3_result,
+        "metadata": {"circuit_breakers": breaker_snapshot(models_to_use + [stage3_result["model"]])},
+    }
+
+
 async def run_debate_sequence(
     topic: str,
     panel_models: List[str]
@@ -390,7 +844,7 @@ async def run_debate_sequence(
                 "content": "Previous statements:\n" + "\n".join(previous_statements),
             })
 
-        response = await query_model(model, messages)
+        response = await query_model(model, messages, stage="debate")
         content = response.get("content", "") if response else ""
 
         turns.append({
@@ -445,7 +899,7 @@ async def run_single_debate_turn(
             "content": f"Previous debate transcript:\n{history_text}\n\nPlease provide your perspective, addressing the topic and previous points."
         })
 
-    response = await query_model(target_model, messages)
+    response = await query_model(target_model, messages, stage="debate")
     content = response.get("content", "") if response else "Failed to generate response."
 
     return {
@@ -0,0 +1,116 @@
+"""
+HTTP server for the API router, with real response streaming.
+
+Used for local development and, behind the Lambda Web Adapter, by the
+streaming Function URL (see infra/cdk).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+from http import HTTPStatus
+from typing import Any, Awaitable, Callable, Dict
+from urllib.parse import parse_qsl, urlsplit
+
+from . import runtime
+
+Router = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+# Lambda Function URL / API Gateway add CORS in production; do it here for local dev
+CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "Authorization, Content-Type, Cache-Control",
+    "Access-Control-Allow-Methods": "GET, POST, DELETE, OPTIONS",
+}
+
+
+def _to_event(method: str, target: str, headers: Dict[str, str], body: bytes) -> Dict[str, Any]:
+    """Translate a raw HTTP request into an API Gateway v2 style event."""
+    url = urlsplit(target)
+    return {
+        "rawPath": url.path,
+        "queryStringParameters": dict(parse_qsl(url.query)) or None,
+        "headers": headers,
+        "body": body.decode() if body else None,
+        "isBase64Encoded": False,
+        "requestContext": {"http": {"method": method, "path": url.path}},
+    }
+
+
+async def _write_head(writer: asyncio.StreamWriter, status: int, headers: Dict[str, str]) -> None:
+    lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode())
+    await writer.drain()
+
+
+async def _handle(
+    route: Router,
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    extra_headers: Dict[str, str],
+) -> None:
+    try:
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return
+        method, target, _ = request_line.decode("latin-1").split(" ", 2)
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, value = line.decode("latin-1").split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+        body = await reader.readexactly(int(headers.get("content-length", "0")))
+
+        response = await route(_to_event(method.upper(), target, headers, body))
+        status = response.get("statusCode", 200)
+        response_headers = {**extra_headers, **response.get("headers", {}), "Connection": "close"}
+        stream = response.get("stream")
+
+        if stream is None:
+            payload = (response.get("body") or "").encode()
+            if response.get("isBase64Encoded"):
+                payload = base64.b64decode(payload)
+            await _write_head(writer, status, {**response_headers, "Content-Length": str(len(payload))})
+            writer.write(payload)
+            await writer.drain()
+            return
+
+        # Write each chunk as soon as the handler produces it
+        await _write_head(writer, status, {**response_headers, "Transfer-Encoding": "chunked"})
+        async for chunk in stream:
+            data = chunk.encode()
+            writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            await writer.drain()
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+def serve(route: Router, host: str = "127.0.0.1", port: int = 8001, cors: bool = True) -> None:
+    """
+    Serve the router over HTTP on the shared runtime loop until interrupted.
+
+    Behind the Lambda Web Adapter the Function URL answers CORS itself, so
+    pass cors=False there to avoid sending the headers twice.
+    """
+    extra_headers = CORS_HEADERS if cors else {}
+
+    async def main() -> None:
+        server = await asyncio.start_server(
+            lambda reader, writer: _handle(route, reader, writer, extra_headers), host, port
+        )
+        print(f"LLM Council API listening on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        runtime.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,115 @@
+"""In-process latency tracking for model calls, with adaptive timeouts."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import (
+    ADAPTIVE_TIMEOUT_HEADROOM,
+    ADAPTIVE_TIMEOUT_MIN,
+    ADAPTIVE_TIMEOUT_PADDING,
+    ADAPTIVE_TIMEOUT_PERCENTILE,
+    ADAPTIVE_TIMEOUTS,
+    LATENCY_MIN_SAMPLES,
+)
+
+# Log-spaced bucket upper bounds, 0.25s .. ~30 minutes
+_BUCKET_BOUNDS = [0.25 * 1.25 ** i for i in range(41)]
+
+# Per-observation decay, so recent calls dominate (~100-call effective window)
+_DECAY = 0.99
+
+
+class LatencyHistogram:
+    """Exponentially decayed latency histogram over log-spaced buckets."""
+
+    def __init__(self, counts: List[float] | None = None, samples: int = 0) -> None:
+        self.counts = list(counts) if counts else [0.0] * len(_BUCKET_BOUNDS)
+        self.samples = samples
+
+    def observe(self, seconds: float) -> None:
+        self.counts = [count * _DECAY for count in self.counts]
+        index = min(bisect_left(_BUCKET_BOUNDS, seconds), len(_BUCKET_BOUNDS) - 1)
+        self.counts[index] += 1.0
+        self.samples += 1
+
+    def percentile(self, pct: float) -> float:
+        """Upper bound of the bucket holding the pct-th percentile."""
+        target = pct / 100 * sum(self.counts)
+        running = 0.0
+        for bound, count in zip(_BUCKET_BOUNDS, self.counts):
+            running += count
+            if running >= target:
+                return bound
+        return _BUCKET_BOUNDS[-1]
+
+
+# Histograms per (model, stage), and samples recorded into them by this
+# container (persist across Lambda invocations in warm containers)
+_HISTOGRAMS: Dict[Tuple[str, str], LatencyHistogram] = {}
+_RECORDED = 0
+
+
+def record(model: str, seconds: float, stage: str = "default") -> None:
+    """Record how long a successful call to model took in stage."""
+    global _RECORDED
+    _RECORDED += 1
+    key = (model, stage)
+    histogram = _HISTOGRAMS.get(key)
+    if histogram is None:
+        histogram = _HISTOGRAMS[key] = LatencyHistogram()
+    histogram.observe(seconds)
+
+
+def percentile(model: str, pct: float, stage: str = "default") -> Optional[float]:
+    """Return the pct-th percentile latency for model in stage, or None without enough history."""
+    histogram = _HISTOGRAMS.get((model, stage))
+    if histogram is None or histogram.samples < LATENCY_MIN_SAMPLES:
+        return None
+    return histogram.percentile(pct)
+
+
+def timeout_for(model: str, stage: str, ceiling: float) -> float:
+    """
+    Per-call timeout for model in stage, never above ceiling.
+
+    Derived from the recent ADAPTIVE_TIMEOUT_PERCENTILE latency times
+    ADAPTIVE_TIMEOUT_HEADROOM plus ADAPTIVE_TIMEOUT_PADDING seconds, and at
+    least ADAPTIVE_TIMEOUT_MIN. Falls back to ceiling without enough history.
+    Only successful calls are recorded, so hung requests don't drag the timeout
+    up to the ceiling; the headroom lets it follow a model that slows down.
+    """
+    if not ADAPTIVE_TIMEOUTS:
+        return ceiling
+    observed = percentile(model, ADAPTIVE_TIMEOUT_PERCENTILE, stage)
+    if observed is None:
+        return ceiling
+    adaptive = observed * ADAPTIVE_TIMEOUT_HEADROOM + ADAPTIVE_TIMEOUT_PADDING
+    return min(ceiling, max(adaptive, ADAPTIVE_TIMEOUT_MIN))
+
+
+def recorded() -> int:
+    """Samples recorded by this container so far (to tell whether there is anything new to save)."""
+    return _RECORDED
+
+
+def export_state() -> Dict[str, Any]:
+    """Serializable snapshot of all histograms, for persisting to storage."""
+    return {
+        "buckets": _BUCKET_BOUNDS,
+        "histograms": [
+            {"model": model, "stage": stage, "counts": histogram.counts, "samples": histogram.samples}
+            for (model, stage), histogram in _HISTOGRAMS.items()
+        ],
+    }
+
+
+def load_state(state: Dict[str, Any]) -> None:
+    """Seed histograms from a snapshot made by export_state; existing history wins."""
+    if state.get("buckets") != _BUCKET_BOUNDS:
+        return  # bucket layout changed; stale snapshot
+    for entry in state.get("histograms", []):
+        key = (entry["model"], entry["stage"])
+        if key not in _HISTOGRAMS:
+            _HISTOGRAMS[key] = LatencyHistogram(entry["counts"], int(entry["samples"]))
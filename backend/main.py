@@ -5,33 +5,39 @@ from __future__ import annotations
 import asyncio
 import base64
 import json
+import os
 import re
+import time
 import uuid
-from typing import Any, Dict, Optional, Tuple
-
-import jwt
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
 
-from . import storage
+from . import cache as response_cache
+from . import settings as user_settings
+from . import auth, latency, negotiation, runtime, serialization, storage, storage_async
 from .config import (
     CHAIRMAN_MODEL,
     COUNCIL_MODELS,
     EXCLUDED_MODEL_FAMILIES,
     EXCLUDED_MODEL_PATTERNS,
     EXCLUDED_MODELS,
+    LATENCY_SAVE_INTERVAL,
+    LATENCY_SAVE_TIMEOUT,
+    LIST_PAGE_MAX,
     OPENROUTER_API_KEY,
 )
 # Force redeploy for dependency fix
 from .council import (
-    calculate_aggregate_rankings,
     generate_conversation_title,
+    rerun_stages,
+    resume_council,
+    run_council_stream,
     run_debate_sequence,
     run_full_council,
-    stage1_collect_responses,
-    stage2_collect_rankings,
-    stage3_synthesize_final,
     run_single_debate_turn,
 )
+from .openrouter import close_client, get_client
 from .openrouter import list_models as list_openrouter_models
+from .router import Handler, Request, Route, Router
 
 
 # Note: CORS is handled by Lambda Function URL and API Gateway cors_preflight
@@ -40,28 +46,75 @@ DEFAULT_HEADERS = {
     "Content-Type": "application/json",
 }
 
-
-from decimal import Decimal
-
-class DecimalEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return int(obj) if obj % 1 == 0 else float(obj)
-        return super(DecimalEncoder, self).default(obj)
+SSE_HEADERS = {
+    "Content-Type": "text/event-stream",
+    "Cache-Control": "no-cache",
+}
 
 
-def _response(status_code: int, body: Dict[str, Any] | None = None) -> Dict[str, Any]:
+def _response(
+    status_code: int,
+    body: Dict[str, Any] | None = None,
+    headers: Dict[str, str] | None = None,
+) -> Dict[str, Any]:
     """Build an API Gateway compatible response."""
     response = {
         "statusCode": status_code,
-        "headers": DEFAULT_HEADERS,
+        "headers": {**DEFAULT_HEADERS, **(headers or {})},
     }
     # HTTP 204 No Content must not include a body
     if status_code != 204 and body is not None:
-        response["body"] = json.dumps(body, cls=DecimalEncoder)
+        response["body"] = serialization.dumps(body)
     return response
 
 
+def _page_params(query_params: Dict[str, str]) -> Tuple[Optional[int], Optional[str]]:
+    """Parse ?limit= and ?cursor= for paginated listings (no limit means everything)."""
+    limit = query_params.get("limit")
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValueError("limit must be an integer") from None
+        if limit < 1:
+            raise ValueError("limit must be positive")
+        limit = min(limit, LIST_PAGE_MAX)
+    return limit, query_params.get("cursor") or None
+
+
+def _message_before_param(query_params: Dict[str, str]) -> Optional[int]:
+    """Parse ?before= (a message seq, from a previous page's next_before)."""
+    before = query_params.get("before")
+    if before is None:
+        return None
+    try:
+        return int(before)
+    except ValueError:
+        raise ValueError("before must be an integer") from None
+
+
+def _fields_param(query_params: Dict[str, str]) -> Optional[Tuple[str, ...]]:
+    """
+    Parse ?fields= (or its alias ?include=): which of storage.MESSAGE_FIELDS to
+    return, comma-separated. None (no parameter) means all of them.
+    """
+    value = query_params.get("fields", query_params.get("include"))
+    if value is None:
+        return None
+    fields = tuple(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+    unknown = [name for name in fields if name not in storage.MESSAGE_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)} (expected {', '.join(storage.MESSAGE_FIELDS)})")
+    return fields
+
+
+def _fields_etag(etag: str | None, fields: Sequence[str] | None) -> str | None:
+    """A conversation's ETag scoped to the fields returned, so trimmed and full bodies never match."""
+    if etag is None or fields is None:
+        return etag
+    return f'{etag[:-1]};{",".join(sorted(fields))}"'
+
+
 def _parse_body(event: Dict[str, Any]) -> Dict[str, Any]:
     """Parse JSON request body, handling optional base64 encoding."""
     raw = event.get("body")
@@ -70,100 +123,11 @@ def _parse_body(event: Dict[str, Any]) -> Dict[str, Any]:
     if event.get("isBase64Encoded"):
         raw = base64.b64decode(raw).decode()
     try:
-        return json.loads(raw) if raw else {}
+        return serialization.loads(raw) if raw else {}
     except json.JSONDecodeError:
         return {}
 
 
-import os
-import httpx
-from jwt.algorithms import RSAAlgorithm
-
-# Global cache for JWKS (persists across Lambda invocations in warm containers)
-_JWKS_CACHE: Dict[str, Any] | None = None
-
-
-def _get_cognito_jwks(user_pool_id: str, region: str) -> Dict[str, Any]:
-    """Fetch and cache Cognito JWKS (JSON Web Key Set)."""
-    global _JWKS_CACHE
-    if _JWKS_CACHE is not None:
-        return _JWKS_CACHE
-
-    url = f"https://cognito-idp.{region}.amazonaws.com/{user_pool_id}/.well-known/jwks.json"
-    try:
-        resp = httpx.get(url, timeout=5.0)
-        resp.raise_for_status()
-        _JWKS_CACHE = resp.json()
-        return _JWKS_CACHE
-    except Exception as e:
-        print(f"Failed to fetch JWKS from {url}: {e}")
-        return {"keys": []}
-
-
-def _extract_user_id(event: Dict[str, Any]) -> Optional[str]:
-    """
-    Extract user ID from JWT token in Authorization header.
-    
-    If COGNITO_USER_POOL_ID is set, performs full signature verification.
-    Otherwise, trusts API Gateway's prior verification (unverified decode).
-    """
-    headers = event.get("headers", {})
-    auth_header = headers.get("Authorization") or headers.get("authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return None
-
-    token = auth_header[7:]  # Remove "Bearer " prefix
-
-    # Check if we should verify signatures (Function URL mode)
-    user_pool_id = os.environ.get("COGNITO_USER_POOL_ID")
-    aws_region = os.environ.get("AWS_REGION", "us-west-2")
-
-    if user_pool_id:
-        # Full verification mode (for Function URL access)
-        try:
-            # Get key ID from token header
-            unverified_header = jwt.get_unverified_header(token)
-            kid = unverified_header.get("kid")
-
-            # Fetch JWKS and find matching key
-            jwks = _get_cognito_jwks(user_pool_id, aws_region)
-            public_key = None
-            for key in jwks.get("keys", []):
-                if key.get("kid") == kid:
-                    public_key = RSAAlgorithm.from_jwk(json.dumps(key))
-                    break
-
-            if not public_key:
-                print(f"No matching key found for kid: {kid}")
-                return None
-
-            # Verify signature and decode
-            payload = jwt.decode(
-                token,
-                public_key,
-                algorithms=["RS256"],
-                options={"verify_aud": False}  # Cognito uses client_id claim, not aud
-            )
-            return payload.get("sub")
-
-        except jwt.ExpiredSignatureError:
-            print("Token has expired")
-            return None
-        except jwt.InvalidTokenError as e:
-            print(f"Invalid token: {e}")
-            return None
-        except Exception as e:
-            print(f"Token verification error: {e}")
-            return None
-    else:
-        # Trust API Gateway's verification (unverified decode)
-        try:
-            payload = jwt.decode(token, options={"verify_signature": False})
-            return payload.get("sub")
-        except jwt.InvalidTokenError:
-            return None
-
-
 async def _list_models() -> Dict[str, Any]:
     """List available council models and defaults, honoring exclusions."""
     print(f"OpenRouter key present: {bool(OPENROUTER_API_KEY)}")
@@ -207,13 +171,96 @@ async def _list_models() -> Dict[str, Any]:
     }
 
 
-async def _send_message(conversation_id: str, user_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
-    """Handle message send flow and return council results."""
-    conversation = storage.get_conversation_for_user(conversation_id, user_id)
-    if conversation is None:
-        return _response(404, {"error": "Conversation not found"})
+async def _save_conversation_title(conversation_id: str, content: str, user_id: str) -> str:
+    """Generate a title from the first message and store it; returns the title."""
+    title = await generate_conversation_title(content)
+    await storage_async.update_conversation_title(conversation_id, title, user_id=user_id)
+    return title
+
+
+class _AssistantCheckpoint:
+    """
+    Stores one council run's assistant message stage by stage.
 
-    is_first_message = len(conversation.get("messages", [])) == 0
+    The first save appends the message with Stage 1 and later saves update
+    it in place, so a run
+    that dies part-way can be resumed from its last stored stage. If the
+    chairman fails, finish stores the error but leaves the message resumable.
+    """
+
+    def __init__(
+        self,
+        conversation_id: str,
+        user_id: str,
+        council_models: List[str] | None = None,
+        chairman_model: str | None = None,
+        seq: int | None = None,
+    ):
+        self.conversation_id = conversation_id
+        self.user_id = user_id
+        self.council_models = council_models
+        self.chairman_model = chairman_model
+        self.seq = seq
+
+    async def save(self, stage: str, fields: Dict[str, Any]) -> None:
+        if self.seq is None:
+            self.seq = await storage_async.start_assistant_message(
+                self.conversation_id,
+                fields["stage1"],
+                self.council_models,
+                self.chairman_model,
+                user_id=self.user_id,
+            )
+        else:
+            await storage_async.update_assistant_message(
+                self.conversation_id, self.seq, {**fields, "status": stage}, user_id=self.user_id
+            )
+
+    async def finish(
+        self,
+        stage1_results: List[Dict[str, Any]],
+        stage2_results: List[Dict[str, Any]],
+        stage3_result: Dict[str, Any],
+    ) -> None:
+        if self.seq is None:
+            # Nothing was checkpointed (no council member answered)
+            await storage_async.add_assistant_message(
+                self.conversation_id,
+                stage1_results,
+                stage2_results,
+                stage3_result,
+                user_id=self.user_id,
+            )
+            return
+        fields: Dict[str, Any] = {"stage3": stage3_result}
+        if not stage3_result.get("error"):
+            fields["status"] = "complete"
+        await storage_async.update_assistant_message(self.conversation_id, self.seq, fields, user_id=self.user_id)
+
+
+def _council_response(
+    stage1_results: List[Dict[str, Any]],
+    stage2_results: List[Dict[str, Any]],
+    stage3_result: Dict[str, Any],
+    metadata: Dict[str, Any],
+    fields: Sequence[str] | None = None,
+) -> Dict[str, Any]:
+    body = {
+        "stage1": stage1_results,
+        "stage2": stage2_results,
+        "stage3": stage3_result,
+        "metadata": metadata,
+    }
+    return _response(200, storage.project_message(body, fields))
+
+
+async def _send_message(
+    conversation_id: str,
+    user_id: str,
+    payload: Dict[str, Any],
+    fields: Sequence[str] | None = None,
+) -> Dict[str, Any]:
+    """Handle message send flow and return council results, trimmed to fields if given."""
     content = payload.get("content", "")
     models = payload.get("models")
     chairman_model = payload.get("chairman_model") or payload.get("chairmanModel")
@@ -221,46 +268,161 @@ async def _send_message(conversation_id: str, user_id: str, payload: Dict[str, A
     if not content:
         return _response(400, {"error": "Message content is required"})
 
-    storage.add_user_message(conversation_id, content)
-
-    if is_first_message:
-        title = await generate_conversation_title(content)
-        storage.update_conversation_title(conversation_id, title)
+    # The user message write is also the ownership check, so it has to land
+    # before any paid model call; only the title overlaps the council run
+    try:
+        message_count = await storage_async.add_user_message(conversation_id, content, user_id=user_id)
+    except ValueError:
+        return _response(404, {"error": "Conversation not found"})
 
-    stage1_results, stage2_results, stage3_result, metadata = await run_full_council(
-        content,
-        council_models=models,
-        chairman_model=chairman_model,
+    checkpoint = _AssistantCheckpoint(conversation_id, user_id, models, chairman_model)
+    council_task = asyncio.create_task(
+        run_full_council(
+            content,
+            council_models=models,
+            chairman_model=chairman_model,
+            on_stage=checkpoint.save,
+        )
     )
+    title_task: asyncio.Task | None = None
+    try:
+        if message_count == 1:
+            title_task = asyncio.create_task(_save_conversation_title(conversation_id, content, user_id))
 
-    storage.add_assistant_message(
-        conversation_id,
-        stage1_results,
-        stage2_results,
-        stage3_result,
-    )
+        stage1_results, stage2_results, stage3_result, metadata = await council_task
 
-    return _response(
-        200,
-        {
-            "stage1": stage1_results,
-            "stage2": stage2_results,
-            "stage3": stage3_result,
-            "metadata": metadata,
-        },
-    )
+        writes = [checkpoint.finish(stage1_results, stage2_results, stage3_result)]
+        if title_task is not None:
+            writes.append(title_task)
+        await asyncio.gather(*writes)
+    finally:
+        for task in (council_task, title_task):
+            if task is not None and not task.done():
+                task.cancel()
 
+    return _council_response(stage1_results, stage2_results, stage3_result, metadata, fields)
 
-async def _send_message_stream(conversation_id: str, user_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+
+async def _resume_message(
+    conversation_id: str,
+    user_id: str,
+    payload: Dict[str, Any],
+    fields: Sequence[str] | None = None,
+) -> Dict[str, Any]:
     """
-    Placeholder for streaming; returns staged responses sequentially.
-    This keeps the contract but does not use SSE so it fits HTTP APIs.
+    Finish the conversation's interrupted council run from its last stored stage.
+
+    If the last message is a partial assistant message, only its missing
+    stages run, with the council and chairman it was started with. If the
+    run died before Stage 1 was stored (the last message is the user's), the
+    whole council runs for it, with the payload's models and chairman_model.
+    The response is trimmed to fields like _send_message's.
     """
-    conversation = storage.get_conversation_for_user(conversation_id, user_id)
+    conversation = await storage_async.get_conversation_for_user(conversation_id, user_id, limit=2)
     if conversation is None:
         return _response(404, {"error": "Conversation not found"})
+    messages = conversation["messages"]
+    last = messages[-1] if messages else {}
+    models = payload.get("models")
+    chairman_model = payload.get("chairman_model") or payload.get("chairmanModel")
+
+    if last.get("role") == "user":
+        checkpoint = _AssistantCheckpoint(conversation_id, user_id, models, chairman_model)
+        results = await run_full_council(
+            last["content"],
+            council_models=models,
+            chairman_model=chairman_model,
+            on_stage=checkpoint.save,
+        )
+    elif last.get("status") in ("stage1", "stage2") and len(messages) == 2 and messages[0].get("role") == "user":
+        checkpoint = _AssistantCheckpoint(conversation_id, user_id, seq=last["seq"])
+        results = await resume_council(
+            messages[0]["content"],
+            last["stage1"],
+            last.get("stage2") if last["status"] == "stage2" else None,
+            council_models=last.get("council_models") or models,
+            chairman_model=last.get("chairman_model") or chairman_model,
+            on_stage=checkpoint.save,
+        )
+    else:
+        return _response(409, {"error": "Nothing to resume"})
+
+    await checkpoint.finish(*results[:3])
+    return _council_response(*results, fields)
+
+
+async def _resynthesize_message(
+    conversation_id: str,
+    seq: int,
+    user_id: str,
+    payload: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Re-run Stage 3 (new chairman_model) and/or Stage 2 (new ranking panel in
+    models) of a stored assistant message, storing the result as an alternate.
+    """
+    ranking_models = payload.get("models")
+    chairman_model = payload.get("chairman_model") or payload.get("chairmanModel")
+    if not ranking_models and not chairman_model:
+        return _response(400, {"error": "chairman_model or models is required"})
+    if ranking_models is not None and not isinstance(ranking_models, list):
+        return _response(400, {"error": "models must be a list"})
+
+    # The message and the user question it answers
+    conversation = await storage_async.get_conversation_for_user(conversation_id, user_id, limit=2, before=seq + 1)
+    messages = conversation["messages"] if conversation else []
+    if (
+        len(messages) != 2
+        or messages[1]["seq"] != seq
+        or messages[1].get("role") != "assistant"
+        or messages[0].get("role") != "user"
+        or not messages[1].get("stage1")
+    ):
+        return _response(404, {"error": "Message not found"})
+    message = messages[1]
+    if not ranking_models and message.get("status") == "stage1":
+        return _response(409, {"error": "Message has no Stage 2 results yet; resume it first"})
+
+    result = await rerun_stages(
+        messages[0]["content"],
+        message["stage1"],
+        message.get("stage2"),
+        ranking_models=ranking_models,
+        chairman_model=chairman_model,
+    )
+    alternate = {key: value for key, value in result.items() if key != "metadata"}
+    if ranking_models:
+        alternate["ranking_models"] = ranking_models
+    try:
+        await storage_async.add_message_alternate(conversation_id, seq, alternate, user_id=user_id)
+    except ValueError:
+        return _response(404, {"error": "Message not found"})
+    return _response(201, {**alternate, "metadata": result["metadata"]})
+
+
+def _stream_response(events: AsyncIterator[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build a streaming response that emits events as Server-Sent Events.
+
+    The 'stream' key holds the async iterator of encoded chunks. Streaming-capable
+    servers (backend.devserver, which the streaming Function URL runs behind the
+    Lambda Web Adapter) write each chunk as it is produced; lambda_handler,
+    behind API Gateway, buffers them into a regular body.
+    """
 
-    is_first_message = len(conversation.get("messages", [])) == 0
+    async def encode() -> AsyncIterator[str]:
+        async for event in events:
+            yield f"data: {serialization.dumps(event)}\n\n"
+
+    return {
+        "statusCode": 200,
+        "headers": {**SSE_HEADERS},
+        "stream": encode(),
+    }
+
+
+async def _send_message_stream(conversation_id: str, user_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Handle message send flow, streaming council events as they happen."""
     content = payload.get("content", "")
     models = payload.get("models")
     chairman_model = payload.get("chairman_model") or payload.get("chairmanModel")
@@ -268,47 +430,352 @@ async def _send_message_stream(conversation_id: str, user_id: str, payload: Dict
     if not content:
         return _response(400, {"error": "Message content is required"})
 
-    storage.add_user_message(conversation_id, content)
+    # One conditional write both appends the message and checks ownership;
+    # it has to finish before the stream (and its 200 status) starts
+    try:
+        message_count = await storage_async.add_user_message(conversation_id, content, user_id=user_id)
+    except ValueError:
+        return _response(404, {"error": "Conversation not found"})
+    is_first_message = message_count == 1
+
+    async def events() -> AsyncIterator[Dict[str, Any]]:
+        # Title generation (and its write) runs alongside the council instead of delaying it
+        title_task = (
+            asyncio.create_task(_save_conversation_title(conversation_id, content, user_id))
+            if is_first_message
+            else None
+        )
+        checkpoint = _AssistantCheckpoint(conversation_id, user_id, models, chairman_model)
+        # Each stage is stored while the next one runs; a save waits for the previous one
+        saving: asyncio.Task | None = None
+        results: Dict[str, Any] = {}
+        late_results: List[Dict[str, Any]] = []
+        try:
+            async for event in run_council_stream(
+                content,
+                council_models=models,
+                chairman_model=chairman_model,
+            ):
+                if event["type"] in ("stage1_complete", "stage2_complete", "stage3_complete"):
+                    results[event["type"]] = event["data"]
+                if event["type"] == "stage1_result" and event["data"].get("late"):
+                    late_results.append(event["data"])
+                elif event["type"] == "stage1_complete" and event["data"]:
+                    saving = asyncio.create_task(checkpoint.save("stage1", {"stage1": event["data"]}))
+                elif event["type"] == "stage2_complete" and saving is not None:
+                    await saving
+                    fields = {
+                        "stage2": event["data"],
+                        "label_to_model": event["metadata"]["label_to_model"],
+                        "aggregate_rankings": event["metadata"]["aggregate_rankings"],
+                    }
+                    if late_results:
+                        fields["stage1"] = results["stage1_complete"] + late_results
+                    saving = asyncio.create_task(checkpoint.save("stage2", fields))
+                yield event
+                if event["type"] == "error":
+                    return
+
+            if saving is not None:
+                await saving
+            await checkpoint.finish(
+                results["stage1_complete"] + late_results,
+                results["stage2_complete"],
+                results["stage3_complete"],
+            )
 
-    if is_first_message:
-        title = await generate_conversation_title(content)
-        storage.update_conversation_title(conversation_id, title)
+            if title_task is not None:
+                title = await title_task
+                yield {"type": "title_complete", "data": {"title": title}}
 
-    stage1_results = await stage1_collect_responses(content, models=models)
-    stage2_results, label_to_model = await stage2_collect_rankings(
-        content,
-        stage1_results,
-        models=models,
-    )
-    aggregate_rankings = calculate_aggregate_rankings(stage2_results, label_to_model)
-    stage3_result = await stage3_synthesize_final(
-        content,
-        stage1_results,
-        stage2_results,
-        chairman_model=chairman_model,
-    )
+            yield {"type": "complete"}
+        except Exception as exc:  # noqa: BLE001
+            yield {"type": "error", "message": str(exc)}
+        finally:
+            if title_task is not None and not title_task.done():
+                title_task.cancel()
+            if saving is not None:
+                # A failed run keeps its last stage, so a resume can start from it
+                await asyncio.wait([saving])
 
-    metadata = {
-        "label_to_model": label_to_model,
-        "aggregate_rankings": aggregate_rankings,
-    }
+    return _stream_response(events())
+
+
+# Routes (registered at import, shared by every invocation in the container)
+_ROUTER = Router()
+
+
+async def _authenticated(request: Request, handler: Handler) -> Dict[str, Any]:
+    """Middleware: resolve the caller's user id, or answer 401."""
+    request.user_id = await auth.extract_user_id(request.event)
+    if not request.user_id:
+        return _response(401, {"error": "Authentication required"})
+    return await handler(request)
+
+
+async def _json_body(request: Request, handler: Handler) -> Dict[str, Any]:
+    """Middleware: parse the JSON request body into request.body."""
+    request.body = _parse_body(request.event)
+    return await handler(request)
+
+
+async def _conditional(request: Request, handler: Handler) -> Dict[str, Any]:
+    """
+    Middleware: tag 200 responses with an ETag and answer a matching If-None-Match with 304.
+
+    Handlers that know a cheaper validator (e.g. a conversation's version) set
+    ETag themselves; otherwise it is derived from the serialized body.
+    """
+    response = await handler(request)
+    if response.get("statusCode") != 200 or "body" not in response:
+        return response
+    headers = response["headers"]
+    etag = headers.setdefault("ETag", negotiation.body_etag(response["body"]))
+    # Private: bodies are per user; no-cache: browsers revalidate with If-None-Match every time
+    headers["Cache-Control"] = "private, no-cache"
+    if negotiation.etag_matches(negotiation.request_header(request.headers, "If-None-Match"), etag):
+        return negotiation.not_modified(etag, {"Cache-Control": headers["Cache-Control"]})
+    return response
 
-    storage.add_assistant_message(
-        conversation_id,
-        stage1_results,
-        stage2_results,
-        stage3_result,
+
+def _log_route_timing(route: Route, request: Request, response: Dict[str, Any], seconds: float) -> None:
+    # Streaming responses are timed until their first byte, not their last
+    print(f"Route {route.method} {route.template} -> {response.get('statusCode')} in {seconds * 1000:.1f}ms")
+
+
+_ROUTER.on_timing(_log_route_timing)
+
+
+@_ROUTER.route("GET", "/")
+async def _health(request: Request) -> Dict[str, Any]:
+    return _response(200, {"status": "ok", "service": "LLM Council API"})
+
+
+@_ROUTER.route("GET", "/api/cache/stats")
+async def _cache_stats(request: Request) -> Dict[str, Any]:
+    return _response(200, {**response_cache.stats(), "settings": user_settings.stats(), "auth": auth.stats()})
+
+
+@_ROUTER.route("GET", "/api/models", _conditional)
+async def _get_models(request: Request) -> Dict[str, Any]:
+    models = await _list_models()
+    return _response(200, models)
+
+
+@_ROUTER.route("GET", "/api/conversations", _authenticated, _conditional)
+async def _list_conversations(request: Request) -> Dict[str, Any]:
+    try:
+        limit, cursor = _page_params(request.query)
+        conversations, next_cursor = await storage_async.list_conversations_page(
+            request.user_id, limit=limit, cursor=cursor, conversation_type=request.query.get("type")
+        )
+    except ValueError as exc:
+        return _response(400, {"error": str(exc)})
+    # Body stays a plain list for existing clients; the cursor travels in a header
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return _response(200, conversations, headers)
+
+
+@_ROUTER.route("POST", "/api/conversations", _authenticated)
+async def _create_conversation(request: Request) -> Dict[str, Any]:
+    conversation_id = str(uuid.uuid4())
+    conversation = await storage_async.create_conversation(conversation_id, request.user_id)
+    return _response(201, conversation)
+
+
+@_ROUTER.route("POST", "/api/debate", _authenticated, _json_body)
+async def _start_debate(request: Request) -> Dict[str, Any]:
+    topic = (request.body.get("topic") or "").strip()
+    if not topic:
+        return _response(400, {"error": "Debate topic is required"})
+
+    # Get user's stored debate panel models
+    panel_models = await user_settings.get_user_debate_panel(request.user_id)
+    valid_models = [m for m in panel_models if m]  # Filter out empty strings
+
+    if len(valid_models) < 1:
+        return _response(400, {"error": "No debate panel models configured. Please set up your debate panel first."})
+
+    turns = await run_debate_sequence(topic, valid_models)
+    return _response(200, {"topic": topic, "turns": turns})
+
+
+@_ROUTER.route("POST", "/api/debate/turn", _authenticated, _json_body)
+async def _debate_turn(request: Request) -> Dict[str, Any]:
+    body = request.body
+    topic = body.get("topic")
+    target_model = body.get("target_model")
+    history = body.get("history", [])
+    system_prompt = body.get("system_prompt")
+
+    if not topic or not target_model:
+        return _response(400, {"error": "Topic and target_model are required"})
+
+    result = await run_single_debate_turn(
+        topic=topic,
+        history=history,
+        target_model=target_model,
+        system_prompt=system_prompt
     )
+    return _response(200, result)
+
+
+@_ROUTER.route("POST", "/api/debate/history", _authenticated, _json_body)
+async def _save_debate(request: Request) -> Dict[str, Any]:
+    topic = request.body.get("topic")
+    turns = request.body.get("turns", [])
+
+    if not topic:
+        return _response(400, {"error": "Topic is required"})
+
+    conversation_id = str(uuid.uuid4())
+    saved = await storage_async.save_debate_session(conversation_id, request.user_id, topic, turns)
+    return _response(201, saved)
 
-    return _response(
-        200,
-        {
-            "stage1": stage1_results,
-            "stage2": stage2_results,
-            "stage3": stage3_result,
-            "metadata": metadata,
-        },
+
+@_ROUTER.route("GET", "/api/debate/history", _authenticated, _conditional)
+async def _list_debates(request: Request) -> Dict[str, Any]:
+    try:
+        limit, cursor = _page_params(request.query)
+        debates, next_cursor = await storage_async.list_conversations_page(
+            request.user_id, limit=limit, cursor=cursor, conversation_type="debate"
+        )
+    except ValueError as exc:
+        return _response(400, {"error": str(exc)})
+    return _response(200, {"debates": debates, "next_cursor": next_cursor})
+
+
+@_ROUTER.route("GET", "/api/debate/history/{debate_id}", _authenticated, _conditional)
+async def _get_debate(request: Request) -> Dict[str, Any]:
+    conversation = await storage_async.get_conversation_for_user(request.params["debate_id"], request.user_id)
+    if not conversation:
+        return _response(404, {"error": "Debate not found"})
+    return _response(200, conversation)
+
+
+@_ROUTER.route("GET", "/api/debate/panel", _authenticated, _conditional)
+async def _get_debate_panel(request: Request) -> Dict[str, Any]:
+    panel_models = await user_settings.get_user_debate_panel(request.user_id)
+    return _response(200, {"panel_models": panel_models})
+
+
+@_ROUTER.route("POST", "/api/debate/panel", _authenticated, _json_body)
+async def _save_debate_panel(request: Request) -> Dict[str, Any]:
+    panel_models = request.body.get("panel_models", [])
+    if not isinstance(panel_models, list) or len(panel_models) != 3:
+        return _response(400, {"error": "panel_models must be an array of exactly 3 strings"})
+
+    await user_settings.save_user_debate_panel(request.user_id, panel_models)
+    return _response(200, {"status": "saved", "panel_models": panel_models})
+
+
+@_ROUTER.route("GET", "/api/settings", _authenticated, _conditional)
+async def _get_settings(request: Request) -> Dict[str, Any]:
+    return _response(200, await user_settings.get_user_settings(request.user_id))
+
+
+@_ROUTER.route("GET", "/api/settings/models", _authenticated, _conditional)
+async def _get_council_models(request: Request) -> Dict[str, Any]:
+    models = await user_settings.get_user_council_models(request.user_id)
+    return _response(200, {"models": models})
+
+
+@_ROUTER.route("POST", "/api/settings/models", _authenticated, _json_body)
+async def _save_council_models(request: Request) -> Dict[str, Any]:
+    models = request.body.get("models", [])
+    if not isinstance(models, list):
+        return _response(400, {"error": "models must be a list"})
+    await user_settings.save_user_council_models(request.user_id, models)
+    return _response(200, {"status": "saved", "models": models})
+
+
+@_ROUTER.route("POST", "/api/conversations/{conversation_id}/message/stream", _authenticated, _json_body)
+async def _post_message_stream(request: Request) -> Dict[str, Any]:
+    return await _send_message_stream(request.params["conversation_id"], request.user_id, request.body)
+
+
+@_ROUTER.route("POST", "/api/conversations/{conversation_id}/message", _authenticated, _json_body)
+async def _post_message(request: Request) -> Dict[str, Any]:
+    conversation_id = request.params["conversation_id"]
+    if request.query.get("stream") == "true":
+        return await _send_message_stream(conversation_id, request.user_id, request.body)
+    try:
+        fields = _fields_param(request.query)
+    except ValueError as exc:
+        return _response(400, {"error": str(exc)})
+    return await _send_message(conversation_id, request.user_id, request.body, fields)
+
+
+@_ROUTER.route("POST", "/api/conversations/{conversation_id}/resume", _authenticated, _json_body)
+async def _post_resume(request: Request) -> Dict[str, Any]:
+    try:
+        fields = _fields_param(request.query)
+    except ValueError as exc:
+        return _response(400, {"error": str(exc)})
+    return await _resume_message(request.params["conversation_id"], request.user_id, request.body, fields)
+
+
+@_ROUTER.route(
+    "POST", "/api/conversations/{conversation_id}/messages/{seq:int}/resynthesize", _authenticated, _json_body
+)
+async def _post_resynthesize(request: Request) -> Dict[str, Any]:
+    params = request.params
+    return await _resynthesize_message(params["conversation_id"], params["seq"], request.user_id, request.body)
+
+
+@_ROUTER.route("GET", "/api/conversations/{conversation_id}", _authenticated, _conditional)
+async def _get_conversation(request: Request) -> Dict[str, Any]:
+    # ?limit= returns the latest turns; ?before=<next_before> pages back; ?fields=stage3
+    # leaves out the other stages (fetched per message when expanded, see _get_message)
+    try:
+        limit, _ = _page_params(request.query)
+        before = _message_before_param(request.query)
+        fields = _fields_param(request.query)
+    except ValueError as exc:
+        return _response(400, {"error": str(exc)})
+    conversation_id = request.params["conversation_id"]
+
+    if negotiation.request_header(request.headers, "If-None-Match"):
+        # Revalidation: compare against the header alone before reading any messages
+        current = await storage_async.get_conversation_header(conversation_id, request.user_id)
+        if current is None:
+            return _response(404, {"error": "Conversation not found"})
+        etag = _fields_etag(storage.etag(current), fields)
+        if negotiation.etag_matches(negotiation.request_header(request.headers, "If-None-Match"), etag):
+            return negotiation.not_modified(etag, {"Cache-Control": "private, no-cache"})
+
+    conversation = await storage_async.get_conversation_for_user(
+        conversation_id, request.user_id, limit=limit, before=before, fields=fields
     )
+    if conversation is None:
+        return _response(404, {"error": "Conversation not found"})
+    etag = _fields_etag(storage.etag(conversation, before), fields)
+    return _response(200, conversation, {"ETag": etag} if etag else None)
+
+
+@_ROUTER.route("GET", "/api/conversations/{conversation_id}/messages/{seq:int}", _authenticated, _conditional)
+async def _get_message(request: Request) -> Dict[str, Any]:
+    # One message's stage details, e.g. ?fields=stage1 when its tab is expanded
+    try:
+        fields = _fields_param(request.query)
+    except ValueError as exc:
+        return _response(400, {"error": str(exc)})
+    params = request.params
+    message = await storage_async.get_message(params["conversation_id"], params["seq"], request.user_id, fields)
+    if message is None:
+        return _response(404, {"error": "Message not found"})
+    return _response(200, message)
+
+
+@_ROUTER.route("DELETE", "/api/conversations/{conversation_id}", _authenticated)
+async def _delete_conversation(request: Request) -> Dict[str, Any]:
+    try:
+        deleted = await storage_async.delete_conversation(request.params["conversation_id"], request.user_id)
+        if not deleted:
+            return _response(404, {"error": "Conversation not found"})
+        return _response(204)
+    except Exception as exc:  # noqa: BLE001
+        return _response(500, {"error": f"Failed to delete: {exc}"})
 
 
 async def _route(event: Dict[str, Any]) -> Dict[str, Any]:
@@ -316,201 +783,146 @@ async def _route(event: Dict[str, Any]) -> Dict[str, Any]:
     http = event.get("requestContext", {}).get("http", {})
     method = http.get("method", "").upper()
     path = event.get("rawPath") or http.get("path") or ""
-    query_params = event.get("queryStringParameters") or {}
 
     print(f"DEBUG: Routing request - method: {method}, path: {path}")
 
+    headers = event.get("headers") or {}
+    cache_control = headers.get("Cache-Control") or headers.get("cache-control") or ""
+    response_cache.set_request_bypass("no-cache" in cache_control.lower())
+
     if method == "OPTIONS":
         return _response(200, {"status": "ok"})
 
-    if path == "/" and method == "GET":
-        return _response(200, {"status": "ok", "service": "LLM Council API"})
-
-    if path == "/api/models" and method == "GET":
-        models = await _list_models()
-        return _response(200, models)
-
-    if path == "/api/conversations" and method == "GET":
-        user_id = _extract_user_id(event)
-        if not user_id:
-            return _response(401, {"error": "Authentication required"})
-        return _response(200, storage.list_conversations(user_id))
-
-    if path == "/api/conversations" and method == "POST":
-        user_id = _extract_user_id(event)
-        if not user_id:
-            return _response(401, {"error": "Authentication required"})
-        conversation_id = str(uuid.uuid4())
-        conversation = storage.create_conversation(conversation_id, user_id)
-        return _response(201, conversation)
-
-    if path == "/api/debate" and method == "POST":
-        user_id = _extract_user_id(event)
-        if not user_id:
-            return _response(401, {"error": "Authentication required"})
-
-        body = _parse_body(event)
-        topic = (body.get("topic") or "").strip()
-        if not topic:
-            return _response(400, {"error": "Debate topic is required"})
-
-        # Get user's stored debate panel models
-        panel_models = storage.get_user_debate_panel(user_id)
-        valid_models = [m for m in panel_models if m]  # Filter out empty strings
-
-        if len(valid_models) < 1:
-            return _response(400, {"error": "No debate panel models configured. Please set up your debate panel first."})
-
-        turns = await run_debate_sequence(topic, valid_models)
-        return _response(200, {"topic": topic, "turns": turns})
-
-    if path == "/api/debate/turn" and method == "POST":
-        user_id = _extract_user_id(event)
-        if not user_id:
-            return _response(401, {"error": "Authentication required"})
-
-        body = _parse_body(event)
-        topic = body.get("topic")
-        target_model = body.get("target_model")
-        history = body.get("history", [])
-        system_prompt = body.get("system_prompt")
-
-        if not topic or not target_model:
-            return _response(400, {"error": "Topic and target_model are required"})
-
-        result = await run_single_debate_turn(
-            topic=topic,
-            history=history,
-            target_model=target_model,
-            system_prompt=system_prompt
-        )
-        return _response(200, result)
-
-    if path == "/api/debate/history" and method == "POST":
-        user_id = _extract_user_id(event)
-        if not user_id:
-            return _response(401, {"error": "Authentication required"})
-
-        body = _parse_body(event)
-        topic = body.get("topic")
-        turns = body.get("turns", [])
-        
-        if not topic:
-             return _response(400, {"error": "Topic is required"})
-
-        conversation_id = str(uuid.uuid4())
-        saved = storage.save_debate_session(conversation_id, user_id, topic, turns)
-        return _response(201, saved)
-
-    if path == "/api/debate/history" and method == "GET":
-        user_id = _extract_user_id(event)
-        if not user_id:
-            return _response(401, {"error": "Authentication required"})
-
-        # Get all conversations and filter for type="debate"
-        all_convos = storage.list_conversations(user_id)
-        debates = [c for c in all_convos if c.get("type") == "debate"]
-        return _response(200, {"debates": debates})
-
-    match_debate_history = re.match(r"^/api/debate/history/([^/]+)$", path)
-    if match_debate_history and method == "GET":
-        user_id = _extract_user_id(event)
-        if not user_id:
-            return _response(401, {"error": "Authentication required"})
-        
-        debate_id = match_debate_history.group(1)
-        conversation = storage.get_conversation_for_user(debate_id, user_id)
-        if not conversation:
-            return _response(404, {"error": "Debate not found"})
-        
-        return _response(200, conversation)
-
-    if path == "/api/debate/panel" and method == "GET":
-        user_id = _extract_user_id(event)
-        if not user_id:
-            return _response(401, {"error": "Authentication required"})
-
-        panel_models = storage.get_user_debate_panel(user_id)
-        return _response(200, {"panel_models": panel_models})
-
-    if path == "/api/debate/panel" and method == "POST":
-        user_id = _extract_user_id(event)
-        if not user_id:
-            return _response(401, {"error": "Authentication required"})
-
-        body = _parse_body(event)
-        panel_models = body.get("panel_models", [])
-        if not isinstance(panel_models, list) or len(panel_models) != 3:
-            return _response(400, {"error": "panel_models must be an array of exactly 3 strings"})
-
-        storage.save_user_debate_panel(user_id, panel_models)
-        return _response(200, {"status": "saved", "panel_models": panel_models})
-
-    if path == "/api/settings/models" and method == "GET":
-        user_id = _extract_user_id(event)
-        if not user_id:
-            return _response(401, {"error": "Authentication required"})
-        models = storage.get_user_council_models(user_id)
-        return _response(200, {"models": models})
-
-    if path == "/api/settings/models" and method == "POST":
-        user_id = _extract_user_id(event)
-        if not user_id:
-            return _response(401, {"error": "Authentication required"})
-        body = _parse_body(event)
-        models = body.get("models", [])
-        if not isinstance(models, list):
-            return _response(400, {"error": "models must be a list"})
-        storage.save_user_council_models(user_id, models)
-        return _response(200, {"status": "saved", "models": models})
-
-    match_message_stream = re.match(r"^/api/conversations/([^/]+)/message/stream$", path)
-    match_message = re.match(r"^/api/conversations/([^/]+)/message$", path)
-    match_conversation = re.match(r"^/api/conversations/([^/]+)$", path)
-
-    if match_message_stream and method == "POST":
-        user_id = _extract_user_id(event)
-        if not user_id:
-            return _response(401, {"error": "Authentication required"})
-        body = _parse_body(event)
-        conversation_id = match_message_stream.group(1)
-        return await _send_message_stream(conversation_id, user_id, body)
-
-    if match_message and method == "POST":
-        user_id = _extract_user_id(event)
-        if not user_id:
-            return _response(401, {"error": "Authentication required"})
-        body = _parse_body(event)
-        conversation_id = match_message.group(1)
-        if query_params.get("stream") == "true":
-            return await _send_message_stream(conversation_id, user_id, body)
-        return await _send_message(conversation_id, user_id, body)
-
-    if match_conversation:
-        user_id = _extract_user_id(event)
-        if not user_id:
-            return _response(401, {"error": "Authentication required"})
-        conversation_id = match_conversation.group(1)
-        if method == "GET":
-            conversation = storage.get_conversation_for_user(conversation_id, user_id)
-            if conversation is None:
-                return _response(404, {"error": "Conversation not found"})
-            return _response(200, conversation)
-        if method == "DELETE":
-            try:
-                deleted = storage.delete_conversation(conversation_id, user_id)
-                if not deleted:
-                    return _response(404, {"error": "Conversation not found"})
-                return _response(204)
-            except Exception as exc:  # noqa: BLE001
-                return _response(500, {"error": f"Failed to delete: {exc}"})
+    response = await _ROUTER.dispatch(event, method, path)
+    if response is None:
+        return _response(404, {"error": "Not Found"})
+    return negotiation.compress(response, negotiation.request_header(headers, "Accept-Encoding"))
+
+
+# When this container last saved its latency histograms, how many samples it
+# had recorded then, and a save still running (persist across warm invocations)
+_LATENCY_SAVED_AT = time.monotonic()
+_LATENCY_SAVED_SAMPLES = 0
+_LATENCY_SAVE: asyncio.Task | None = None
+
+
+def _latency_snapshot(force: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    The histograms to save, if samples were recorded since the last save and
+    LATENCY_SAVE_INTERVAL has passed (or force); None if there is nothing to save.
+    """
+    global _LATENCY_SAVED_AT, _LATENCY_SAVED_SAMPLES
+    samples = latency.recorded()
+    if samples == _LATENCY_SAVED_SAMPLES:
+        return None
+    if not force and time.monotonic() - _LATENCY_SAVED_AT < LATENCY_SAVE_INTERVAL:
+        return None
+    _LATENCY_SAVED_AT, _LATENCY_SAVED_SAMPLES = time.monotonic(), samples
+    return latency.export_state()
+
+
+async def _save_latency_state(state: Dict[str, Any]) -> None:
+    try:
+        await storage_async.save_latency_stats(state)
+    except Exception as exc:  # noqa: BLE001
+        print(f"Error saving latency stats: {exc}")
+
+
+async def _persist_latency_stats() -> None:
+    """
+    Save learned model latencies when due, before the invocation returns.
+
+    A frozen or retired container runs nothing after its last invocation,
+    so the write happens inside it; a slow one is only waited on for
+    LATENCY_SAVE_TIMEOUT seconds and carries on during the next invocation.
+    """
+    global _LATENCY_SAVE
+    if _LATENCY_SAVE is not None and not _LATENCY_SAVE.done():
+        return
+    state = _latency_snapshot()
+    if state is None:
+        return
+    _LATENCY_SAVE = asyncio.create_task(_save_latency_state(state))
+    try:
+        await asyncio.wait_for(asyncio.shield(_LATENCY_SAVE), LATENCY_SAVE_TIMEOUT)
+    except asyncio.TimeoutError:
+        print(f"Latency stats save still running after {LATENCY_SAVE_TIMEOUT}s; not waiting for it")
+
+
+async def _save_latency_stats_on_shutdown() -> None:
+    state = _latency_snapshot(force=True)
+    if state is None:
+        return
+    # Runs at interpreter exit, after the storage worker pool has shut down,
+    # so the write is made directly
+    try:
+        storage.save_latency_stats(state)
+    except Exception as exc:  # noqa: BLE001
+        print(f"Error saving latency stats: {exc}")
+
 
-    return _response(404, {"error": "Not Found"})
+async def _init_container() -> None:
+    """Create loop-bound resources once per container, during Lambda init."""
+    get_client()
+    # Seed adaptive timeouts and hedge delays with what earlier containers learned
+    try:
+        latency.load_state(storage.get_latency_stats())
+    except Exception as exc:  # noqa: BLE001
+        print(f"Error loading latency stats: {exc}")
+
+
+runtime.on_shutdown(close_client)
+runtime.on_shutdown(_save_latency_stats_on_shutdown)
+runtime.run(_init_container())
+
+
+async def _buffered(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Route an event, collecting a streaming response into a regular body."""
+    response = await _route(event)
+    stream = response.pop("stream", None)
+    if stream is not None:
+        response["body"] = "".join([chunk async for chunk in stream])
+    return response
+
+
+async def _invoke(event: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        return await _buffered(event)
+    finally:
+        await _persist_latency_stats()
 
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """AWS Lambda entrypoint."""
     try:
-        return asyncio.run(_route(event))
+        return runtime.run(_invoke(event))
     except Exception as exc:  # noqa: BLE001
         return _response(500, {"error": f"Internal server error: {exc}"})
+
+
+async def _served(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Route an event for the HTTP server, saving latency stats once the response is done."""
+    response = await _route(event)
+    stream = response.get("stream")
+    if stream is None:
+        await _persist_latency_stats()
+        return response
+
+    # Behind the Lambda Web Adapter the environment may freeze as soon as the
+    # stream ends, so the save happens before the final chunk is acknowledged
+    async def relay() -> AsyncIterator[str]:
+        try:
+            async for chunk in stream:
+                yield chunk
+        finally:
+            await _persist_latency_stats()
+
+    return {**response, "stream": relay()}
+
+
+if __name__ == "__main__":
+    from .devserver import serve
+
+    # The streaming Function URL runs this server behind the Lambda Web Adapter
+    behind_adapter = "AWS_LWA_INVOKE_MODE" in os.environ
+    serve(_served, port=int(os.environ.get("PORT", "8001")), cors=not behind_adapter)
@@ -0,0 +1,40 @@
+"""
+One-off data migrations for the conversations table.
+
+Usage:
+    python -m backend.migrate summaries
+    python -m backend.migrate messages
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from .storage import dynamodb
+
+MIGRATIONS = {
+    "summaries": (
+        dynamodb.backfill_conversation_summaries,
+        "add message_count/updated_at/preview to conversations that predate them",
+    ),
+    "messages": (
+        dynamodb.migrate_embedded_messages,
+        "move messages embedded in conversation items into the messages table",
+    ),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a conversations table migration.")
+    parser.add_argument(
+        "migration",
+        choices=sorted(MIGRATIONS),
+        help="; ".join(f"{name}: {description}" for name, (_, description) in MIGRATIONS.items()),
+    )
+    args = parser.parse_args()
+    migrate, _ = MIGRATIONS[args.migration]
+    print(f"{args.migration}: {migrate()} items updated")
+
+
+if __name__ == "__main__":
+    main()
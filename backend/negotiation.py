@@ -0,0 +1,106 @@
+"""HTTP conditional requests (ETag / If-None-Match) and response compression."""
+
+from __future__ import annotations
+
+import base64
+import gzip
+import hashlib
+from typing import Any, Dict, List
+
+from .config import RESPONSE_COMPRESSION, RESPONSE_COMPRESSION_MIN_BYTES
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Levels that favour speed, since bodies are compressed on every request: on
+# bench_conditional_get's 1 MB conversation gzip 1 takes ~16 ms for a 2.9x
+# reduction (level 6: ~60 ms for 3.5x) and brotli 4 about the same time for more
+GZIP_LEVEL = 1
+BROTLI_QUALITY = 4
+
+
+def request_header(headers: Dict[str, str], name: str) -> str:
+    """A request header by case-insensitive name ("" if absent)."""
+    value = headers.get(name)
+    if value is None:
+        lowered = name.lower()
+        value = next((v for k, v in headers.items() if k.lower() == lowered), "")
+    return value
+
+
+def body_etag(body: str) -> str:
+    """Weak validator derived from a serialized body."""
+    return f'W/"{hashlib.blake2b(body.encode("utf-8"), digest_size=12).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match header value matches etag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def not_modified(etag: str, headers: Dict[str, str] | None = None) -> Dict[str, Any]:
+    """A 304 response carrying the current validator."""
+    return {"statusCode": 304, "headers": {"ETag": etag, **(headers or {})}}
+
+
+def _accepted(accept_encoding: str) -> List[str]:
+    """Codings the client accepts (q > 0), lowercase."""
+    codings = []
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding and quality > 0:
+            codings.append(coding.strip().lower())
+    return codings
+
+
+def compress(response: Dict[str, Any], accept_encoding: str) -> Dict[str, Any]:
+    """
+    Compress a response body in place when it is large enough and the client accepts it.
+
+    Brotli is preferred when installed and accepted, then gzip. The body is
+    base64-encoded with isBase64Encoded set, as API Gateway and Function URLs
+    expect for binary bodies. Streaming and already-encoded responses are
+    left alone.
+    """
+    body = response.get("body")
+    if not RESPONSE_COMPRESSION or not isinstance(body, str) or response.get("isBase64Encoded"):
+        return response
+    headers = response.setdefault("headers", {})
+    if len(body) < RESPONSE_COMPRESSION_MIN_BYTES or "Content-Encoding" in headers:
+        return response
+    headers["Vary"] = "Accept-Encoding"
+
+    accepted = _accepted(accept_encoding)
+    data = body.encode("utf-8")
+    if brotli is not None and "br" in accepted:
+        encoded, coding = brotli.compress(data, quality=BROTLI_QUALITY), "br"
+    elif "gzip" in accepted or "*" in accepted:
+        encoded, coding = gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0), "gzip"
+    else:
+        return response
+
+    headers["Content-Encoding"] = coding
+    response["body"] = base64.b64encode(encoded).decode("ascii")
+    response["isBase64Encoded"] = True
+    return response
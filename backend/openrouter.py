@@ -1,22 +1,225 @@
 """OpenRouter API client for making LLM requests."""
 
+import asyncio
+import json
+import time
 import httpx
-from typing import List, Dict, Any, Optional
-from .config import OPENROUTER_API_KEY, OPENROUTER_API_URL
+from typing import List, Dict, Any, Optional, AsyncIterator, Callable, Coroutine, Tuple
+from . import cache as response_cache
+from . import latency
+from .config import (
+    HEDGE_ALTERNATES,
+    HEDGE_DEFAULT_DELAY,
+    HEDGE_ENABLED,
+    HEDGE_MIN_DELAY,
+    HEDGE_PERCENTILE,
+    OPENROUTER_API_KEY,
+    OPENROUTER_API_URL,
+    OPENROUTER_CONNECT_TIMEOUT,
+    OPENROUTER_HTTP2,
+    OPENROUTER_KEEPALIVE_EXPIRY,
+    OPENROUTER_MAX_CONNECTIONS,
+    OPENROUTER_MAX_KEEPALIVE_CONNECTIONS,
+    OPENROUTER_MAX_RETRIES,
+    OPENROUTER_MODELS_URL,
+)
+from .resilience import OpenRouterError, classify_error, error_from_status, get_breaker, retry_delay
+
+# Shared pooled client (persists across Lambda invocations in warm containers)
+_CLIENT: httpx.AsyncClient | None = None
+_CLIENT_LOOP: asyncio.AbstractEventLoop | None = None
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package (installed via httpx[http2])."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Return the shared OpenRouter client, creating it on first use.
+
+    Connections are pooled and kept alive, so a council run pays for the TLS
+    handshake once instead of once per model call. The client is bound to the
+    event loop it was created on; if that loop is gone, a new client replaces it.
+    """
+    global _CLIENT, _CLIENT_LOOP
+    loop = asyncio.get_running_loop()
+    if _CLIENT is None or _CLIENT.is_closed or _CLIENT_LOOP is not loop:
+        _CLIENT = httpx.AsyncClient(
+            http2=OPENROUTER_HTTP2 and _http2_available(),
+            limits=httpx.Limits(
+                max_connections=OPENROUTER_MAX_CONNECTIONS,
+                max_keepalive_connections=OPENROUTER_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=OPENROUTER_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(120.0, connect=OPENROUTER_CONNECT_TIMEOUT),
+        )
+        _CLIENT_LOOP = loop
+    return _CLIENT
+
+
+async def close_client() -> None:
+    """Close the shared client and release its pooled connections."""
+    global _CLIENT, _CLIENT_LOOP
+    client, loop = _CLIENT, _CLIENT_LOOP
+    _CLIENT, _CLIENT_LOOP = None, None
+    # A client left behind by a closed loop cannot be closed; just drop it
+    if client is not None and not client.is_closed and loop is asyncio.get_running_loop():
+        await client.aclose()
+
+
+async def _post_completion(
+    model: str,
+    messages: List[Dict[str, str]],
+    timeout: float,
+    params: Dict[str, Any] | None = None
+) -> Dict[str, Any]:
+    """Make one completion request, raising OpenRouterError on failure."""
+    headers = {
+        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+        "Content-Type": "application/json",
+    }
+
+    payload = {
+        **(params or {}),
+        "model": model,
+        "messages": messages,
+    }
+
+    try:
+        response = await get_client().post(
+            OPENROUTER_API_URL,
+            headers=headers,
+            json=payload,
+            timeout=httpx.Timeout(timeout, connect=OPENROUTER_CONNECT_TIMEOUT),
+        )
+        response.raise_for_status()
+
+        data = response.json()
+        if "error" in data:
+            # OpenRouter reports some provider failures in a 200 body
+            error = data["error"]
+            raise error_from_status(int(error.get("code") or 502), str(error.get("message", error)))
+        message = data['choices'][0]['message']
+
+        return {
+            'content': message.get('content'),
+            'reasoning_details': message.get('reasoning_details')
+        }
+    except Exception as exc:
+        raise classify_error(exc) from exc
+
+
+class _Flight:
+    """An upstream call shared by every concurrent identical request."""
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self.task: asyncio.Task | None = None
+        self.waiters = 0
+        self.events: List[Dict[str, Any]] = []  # streams only: events so far, for replay
+        self.done = False
+        self._changed = asyncio.Event()
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        self.events.append(event)
+        self._wake()
+
+    def finish(self) -> None:
+        self.done = True
+        self._wake()
+
+    def _wake(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def replay(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield every event published so far, then new ones until the stream ends."""
+        index = 0
+        while True:
+            if index < len(self.events):
+                index += 1
+                yield self.events[index - 1]
+            elif self.done:
+                return
+            else:
+                await self._changed.wait()
+
+    def leave(self) -> None:
+        """Drop a waiter; the upstream call is cancelled once nobody is waiting for it."""
+        self.waiters -= 1
+        if self.waiters == 0 and not self.task.done():
+            self.task.cancel()
+            # The task only finishes cancelling on a later loop iteration; unlist it
+            # now so a caller arriving in between starts a fresh call instead of joining
+            if _INFLIGHT.get(self.key) is self:
+                del _INFLIGHT[self.key]
+
+
+# In-flight upstream calls by request key (persist across Lambda invocations in warm containers)
+_INFLIGHT: Dict[str, _Flight] = {}
+
+
+def _join_flight(key: str, start: Callable[[_Flight], Coroutine[Any, Any, Any]]) -> _Flight:
+    """Return the in-flight call for key, starting one with start(flight) if there is none."""
+    flight = _INFLIGHT.get(key)
+    if flight is None or flight.task.done() or flight.task.get_loop() is not asyncio.get_running_loop():
+        flight = _INFLIGHT[key] = _Flight(key)
+        flight.task = asyncio.create_task(start(flight))
+
+        def forget(_: asyncio.Task) -> None:
+            if _INFLIGHT.get(key) is flight:
+                del _INFLIGHT[key]
+
+        flight.task.add_done_callback(forget)
+    flight.waiters += 1
+    return flight
+
+
+async def _single_flight(key: str, start: Callable[[_Flight], Coroutine[Any, Any, Any]]) -> Any:
+    """
+    Await the result of start(flight), sharing it with identical concurrent callers.
+
+    Each caller waits on a shield, so cancelling one caller leaves the others
+    (and the upstream call) running.
+    """
+    flight = _join_flight(key, start)
+    try:
+        return await asyncio.shield(flight.task)
+    finally:
+        flight.leave()
 
 
 async def query_model(
     model: str,
     messages: List[Dict[str, str]],
-    timeout: float = 120.0
+    timeout: float = 120.0,
+    params: Dict[str, Any] | None = None,
+    stage: str = "default",
+    cache: bool = True
 ) -> Optional[Dict[str, Any]]:
     """
     Query a single model via OpenRouter API.
 
+    Rate limits, 5xx and network errors are retried with backoff (honouring
+    Retry-After). Models whose circuit breaker is open are skipped instantly.
+    The actual timeout adapts to the model's observed latency in stage (see
+    latency.timeout_for), with timeout as the ceiling. Successful responses are
+    cached (see cache.py), and a cached response is returned without a call.
+    Identical concurrent calls share a single upstream request.
+
     Args:
         model: OpenRouter model identifier (e.g., "openai/gpt-4o")
         messages: List of message dicts with 'role' and 'content'
-        timeout: Request timeout in seconds
+        timeout: Maximum request timeout in seconds
+        params: Extra request body fields (e.g. 'provider' routing, 'temperature')
+        stage: Pipeline stage the call belongs to, for latency tracking
+        cache: Set False to bypass the response cache for this call
 
     Returns:
         Response dict with 'content' and optional 'reasoning_details', or None if failed
@@ -25,56 +228,321 @@ async def query_model(
         print(f"Error querying model {model}: OPENROUTER_API_KEY not configured")
         return None
 
+    key = response_cache.cache_key(model, messages, params)
+    use_cache = response_cache.enabled(cache)
+    if use_cache:
+        cached = await response_cache.lookup(key)
+        if cached is not None:
+            return cached
+
+    return await _single_flight(
+        key,
+        lambda _: _query_upstream(model, messages, timeout, params, stage, key if use_cache else None),
+    )
+
+
+async def _query_upstream(
+    model: str,
+    messages: List[Dict[str, str]],
+    timeout: float,
+    params: Dict[str, Any] | None,
+    stage: str,
+    cache_key: str | None
+) -> Optional[Dict[str, Any]]:
+    """Call OpenRouter for query_model (breaker, retries), caching the result under cache_key."""
+    breaker = get_breaker(model)
+    if not breaker.allow():
+        print(f"Skipping model {model}: circuit open after {breaker.last_error}")
+        return None
+
+    timeout = latency.timeout_for(model, stage, timeout)
+    try:
+        for attempt in range(OPENROUTER_MAX_RETRIES + 1):
+            try:
+                started = time.monotonic()
+                result = await _post_completion(model, messages, timeout, params)
+                latency.record(model, time.monotonic() - started, stage)
+                break
+            except OpenRouterError as error:
+                delay = retry_delay(error, attempt)
+                if delay is None or attempt == OPENROUTER_MAX_RETRIES:
+                    raise
+                print(f"Retrying model {model} in {delay:.1f}s after {error}")
+                await asyncio.sleep(delay)
+    except OpenRouterError as e:
+        breaker.record_failure(e.kind)
+        print(f"Error querying model {model}: {e}")
+        return None
+    except asyncio.CancelledError:
+        breaker.release()
+        raise
+
+    breaker.record_success()
+    if cache_key and result.get('content'):
+        await response_cache.store(cache_key, result)
+    return result
+
+
+def hedge_route(model: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    Return the (model, params) a hedge for model should be sent to.
+
+    Uses HEDGE_ALTERNATES if configured; otherwise the same model, routed to
+    OpenRouter's lowest-latency provider.
+    """
+    alternate = HEDGE_ALTERNATES.get(model)
+    if alternate:
+        return alternate, {}
+    return model, {"provider": {"sort": "latency"}}
+
+
+def hedge_delay(model: str, stage: str = "default") -> float:
+    """Seconds to wait for model before hedging: its observed tail latency in stage."""
+    observed = latency.percentile(model, HEDGE_PERCENTILE, stage)
+    if observed is None:
+        return HEDGE_DEFAULT_DELAY
+    return max(observed, HEDGE_MIN_DELAY)
+
+
+async def query_model_hedged(
+    model: str,
+    messages: List[Dict[str, str]],
+    timeout: float = 120.0,
+    stage: str = "default"
+) -> Optional[Dict[str, Any]]:
+    """
+    Query a model, hedging with an equivalent route if it is slow or fails.
+
+    If model has not answered within hedge_delay(model, stage), the same messages are
+    sent to hedge_route(model) and whichever succeeds first wins; the loser is
+    cancelled. If the primary fails outright, the hedge is used as a fallback.
+
+    Returns:
+        Response dict as from query_model, plus 'served_by' when the hedge won,
+        or None if both failed
+    """
+    alternate, params = hedge_route(model)
+    primary = asyncio.create_task(query_model(model, messages, timeout, stage=stage))
+    hedge: asyncio.Task | None = None
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=hedge_delay(model, stage))
+        if done and primary.result() is not None:
+            return primary.result()
+
+        print(f"Hedging model {model} with {alternate} ({'failed' if done else 'slow'})")
+        hedge = asyncio.create_task(query_model(alternate, messages, timeout, params, stage))
+        racing = {hedge} if done else {primary, hedge}
+        while racing:
+            done, racing = await asyncio.wait(racing, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = task.result()
+                if result is None:
+                    continue
+                if task is hedge:
+                    result = {**result, 'served_by': alternate, 'hedged': True}
+                return result
+        return None
+    finally:
+        for task in (primary, hedge):
+            if task is not None and not task.done():
+                task.cancel()
+
+
+async def iter_sse_data(lines: AsyncIterator[str]) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Parse a Server-Sent Events line stream into decoded JSON payloads.
+
+    Comment lines (OpenRouter sends ": OPENROUTER PROCESSING" keep-alives) are
+    skipped, multi-line data fields are joined, and "[DONE]" ends the stream.
+    """
+    data_lines: List[str] = []
+    async for line in lines:
+        if line.startswith(":"):
+            continue
+        if line.startswith("data:"):
+            data_lines.append(line[5:].lstrip(" "))
+            continue
+        if line or not data_lines:
+            continue  # other fields (event:, id:) or stray blank lines
+
+        data = "\n".join(data_lines)
+        data_lines = []
+        if data == "[DONE]":
+            return
+        yield json.loads(data)
+
+    if data_lines and "\n".join(data_lines) != "[DONE]":
+        yield json.loads("\n".join(data_lines))
+
+
+async def stream_model(
+    model: str,
+    messages: List[Dict[str, str]],
+    timeout: float = 120.0,
+    cache: bool = True
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream a single model's completion token by token via OpenRouter API.
+
+    Identical concurrent streams share one upstream stream; a caller that joins
+    late is replayed the events it missed. Closing one caller's stream leaves
+    the others running.
+
+    Args:
+        model: OpenRouter model identifier (e.g., "openai/gpt-4o")
+        messages: List of message dicts with 'role' and 'content'
+        timeout: Maximum seconds to wait between chunks
+        cache: Set False to bypass the response cache (shared with query_model)
+
+    Yields:
+        Event dicts, one of:
+        - {'type': 'content', 'delta': str}
+        - {'type': 'reasoning', 'delta': str}
+        - {'type': 'done', 'finish_reason': str | None, 'usage': dict | None}
+          ('cached': True when replayed from the cache as a single delta)
+        - {'type': 'error', 'error': str, 'kind': str} (terminal; replaces 'done')
+    """
+    key = "stream:" + response_cache.cache_key(model, messages)
+    flight = _join_flight(key, lambda flight: _pump_stream(flight, _stream_upstream(model, messages, timeout, cache)))
+    try:
+        async for event in flight.replay():
+            yield event
+    finally:
+        flight.leave()
+
+
+async def _pump_stream(flight: _Flight, events: AsyncIterator[Dict[str, Any]]) -> None:
+    """Publish an upstream stream's events to everyone subscribed to flight."""
+    try:
+        async for event in events:
+            flight.publish(event)
+    except Exception as exc:  # noqa: BLE001
+        flight.publish({"type": "error", "error": str(exc), "kind": "unknown"})
+    finally:
+        flight.finish()
+
+
+async def _stream_upstream(
+    model: str,
+    messages: List[Dict[str, str]],
+    timeout: float,
+    cache: bool
+) -> AsyncIterator[Dict[str, Any]]:
+    """Stream from OpenRouter for stream_model (cache, breaker, retries before the first delta)."""
+    if not OPENROUTER_API_KEY:
+        print(f"Error streaming model {model}: OPENROUTER_API_KEY not configured")
+        yield {"type": "error", "error": "OPENROUTER_API_KEY not configured"}
+        return
+
+    use_cache = response_cache.enabled(cache)
+    if use_cache:
+        key = response_cache.cache_key(model, messages)
+        cached = await response_cache.lookup(key)
+        if cached is not None:
+            yield {"type": "content", "delta": cached.get('content') or ""}
+            yield {"type": "done", "finish_reason": "stop", "usage": None, "cached": True}
+            return
+
+    breaker = get_breaker(model)
+    if not breaker.allow():
+        print(f"Skipping model {model}: circuit open after {breaker.last_error}")
+        yield {"type": "error", "error": f"circuit open after {breaker.last_error}"}
+        return
+
     headers = {
         "Authorization": f"Bearer {OPENROUTER_API_KEY}",
         "Content-Type": "application/json",
+        "Accept": "text/event-stream",
     }
 
     payload = {
         "model": model,
         "messages": messages,
+        "stream": True,
     }
 
+    finish_reason = None
+    usage = None
+    content: List[str] = []
+    started = False  # once deltas have been yielded, a failure can't be retried
+    attempt = 0
     try:
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            response = await client.post(
-                OPENROUTER_API_URL,
-                headers=headers,
-                json=payload
-            )
-            response.raise_for_status()
-
-            data = response.json()
-            message = data['choices'][0]['message']
-
-            return {
-                'content': message.get('content'),
-                'reasoning_details': message.get('reasoning_details')
-            }
+        while True:
+            try:
+                async with get_client().stream(
+                    "POST",
+                    OPENROUTER_API_URL,
+                    headers=headers,
+                    json=payload,
+                    timeout=httpx.Timeout(timeout, connect=OPENROUTER_CONNECT_TIMEOUT),
+                ) as response:
+                    if response.is_error:
+                        await response.aread()
+                    response.raise_for_status()
+                    async for chunk in iter_sse_data(response.aiter_lines()):
+                        if "error" in chunk:
+                            error = chunk["error"]
+                            raise error_from_status(
+                                int(error.get("code") or 502), str(error.get("message", error))
+                            )
+                        usage = chunk.get("usage") or usage
+                        for choice in chunk.get("choices") or []:
+                            delta = choice.get("delta") or {}
+                            if delta.get("reasoning"):
+                                started = True
+                                yield {"type": "reasoning", "delta": delta["reasoning"]}
+                            if delta.get("content"):
+                                started = True
+                                content.append(delta["content"])
+                                yield {"type": "content", "delta": delta["content"]}
+                            finish_reason = choice.get("finish_reason") or finish_reason
+                break
+            except Exception as exc:
+                error = classify_error(exc)
+                delay = None if started else retry_delay(error, attempt)
+                if delay is None or attempt == OPENROUTER_MAX_RETRIES:
+                    raise error from exc
+                print(f"Retrying model {model} stream in {delay:.1f}s after {error}")
+                attempt += 1
+                await asyncio.sleep(delay)
 
-    except Exception as e:
-        print(f"Error querying model {model}: {e}")
-        return None
+    except OpenRouterError as e:
+        breaker.record_failure(e.kind)
+        print(f"Error streaming model {model}: {e}")
+        yield {"type": "error", "error": str(e), "kind": e.kind}
+        return
+    except BaseException:
+        # Cancelled, or the consumer stopped iterating early
+        breaker.release()
+        raise
+
+    breaker.record_success()
+    if use_cache and content and finish_reason in (None, "stop"):
+        await response_cache.store(key, {'content': "".join(content), 'reasoning_details': None})
+    yield {"type": "done", "finish_reason": finish_reason, "usage": usage}
 
 
 async def query_models_parallel(
     models: List[str],
-    messages: List[Dict[str, str]]
+    messages: List[Dict[str, str]],
+    stage: str = "default"
 ) -> Dict[str, Optional[Dict[str, Any]]]:
     """
     Query multiple models in parallel.
 
+    Slow or failing models are hedged (see query_model_hedged) when HEDGE_ENABLED.
+
     Args:
         models: List of OpenRouter model identifiers
         messages: List of message dicts to send to each model
+        stage: Pipeline stage the calls belong to, for latency tracking
 
     Returns:
         Dict mapping model identifier to response dict (or None if failed)
     """
-    import asyncio
-
     # Create tasks for all models
-    tasks = [query_model(model, messages) for model in models]
+    query = query_model_hedged if HEDGE_ENABLED else query_model
+    tasks = [query(model, messages, stage=stage) for model in models]
 
     # Wait for all to complete
     responses = await asyncio.gather(*tasks)
@@ -83,6 +551,67 @@ async def query_models_parallel(
     return {model: response for model, response in zip(models, responses)}
 
 
+async def query_models_as_completed(
+    models: List[str],
+    messages: List[Dict[str, str]],
+    quorum: int | None = None,
+    soft_deadline: float | None = None,
+    pending: Dict[str, asyncio.Task] | None = None,
+    stage: str = "default"
+) -> AsyncIterator[Tuple[str, Optional[Dict[str, Any]]]]:
+    """
+    Query multiple models in parallel, yielding each result as soon as it lands.
+
+    Slow or failing models are hedged (see query_model_hedged) when HEDGE_ENABLED.
+
+    Args:
+        models: List of OpenRouter model identifiers
+        messages: List of message dicts to send to each model
+        quorum: Stop once this many models have responded successfully
+        soft_deadline: Stop once this many seconds have passed, as soon as at
+            least one model has responded successfully
+        pending: If given, calls still in flight when iteration stops early are
+            handed over here (model -> task) instead of being cancelled
+        stage: Pipeline stage the calls belong to, for latency tracking
+
+    Yields:
+        (model, response dict or None) tuples in completion order
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + soft_deadline if soft_deadline else None
+    query = query_model_hedged if HEDGE_ENABLED else query_model
+    tasks = {asyncio.create_task(query(model, messages, stage=stage)): model for model in models}
+    successes = 0
+    handed_off = False
+    try:
+        while tasks:
+            timeout = None
+            if deadline is not None and successes:
+                timeout = max(deadline - loop.time(), 0)
+            done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                break  # soft deadline passed
+
+            for task in done:
+                model = tasks.pop(task)
+                response = task.result()
+                if response is not None:
+                    successes += 1
+                yield model, response
+
+            if quorum and successes >= quorum:
+                break
+
+        if pending is not None:
+            pending.update({model: task for task, model in tasks.items()})
+            handed_off = True
+    finally:
+        # Consumer stopped early (or was cancelled): don't leak in-flight calls
+        if not handed_off:
+            for task in tasks:
+                task.cancel()
+
+
 async def list_models() -> List[str]:
     """
     Fetch available models from OpenRouter. Returns IDs (e.g., "openai/gpt-4o").
@@ -97,12 +626,11 @@ async def list_models() -> List[str]:
     }
 
     try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            resp = await client.get("https://openrouter.ai/api/v1/models", headers=headers)
-            resp.raise_for_status()
-            data = resp.json()
-            if isinstance(data, dict) and "data" in data:
-                return [item["id"] for item in data["data"] if "id" in item]
+        resp = await get_client().get(OPENROUTER_MODELS_URL, headers=headers, timeout=15.0)
+        resp.raise_for_status()
+        data = resp.json()
+        if isinstance(data, dict) and "data" in data:
+            return [item["id"] for item in data["data"] if "id" in item]
     except Exception as e:
         print(f"Error listing models from OpenRouter: {e}")
 
@@ -0,0 +1,206 @@
+"""Error classification, retry backoff and per-model circuit breakers for OpenRouter calls."""
+
+from __future__ import annotations
+
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from .config import (
+    BREAKER_COOLDOWN,
+    BREAKER_FAILURE_THRESHOLD,
+    OPENROUTER_RETRY_BASE_DELAY,
+    OPENROUTER_RETRY_MAX_DELAY,
+)
+
+# Error kinds worth retrying: the same request may well succeed a moment later
+RETRYABLE_KINDS = {"rate_limited", "server_error", "network"}
+
+# Error kinds that say something about the provider's health (and so feed the breaker).
+# Timeouts are not retried, since a retry would double an already-blown latency
+# budget, but a model that keeps timing out should be tripped.
+BREAKER_KINDS = RETRYABLE_KINDS | {"timeout"}
+
+
+class OpenRouterError(Exception):
+    """A classified failure of an OpenRouter call."""
+
+    def __init__(
+        self,
+        kind: str,
+        message: str,
+        status_code: int | None = None,
+        retry_after: float | None = None,
+    ) -> None:
+        super().__init__(message)
+        self.kind = kind
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        return self.kind in RETRYABLE_KINDS
+
+    def __str__(self) -> str:
+        status = f" {self.status_code}" if self.status_code else ""
+        return f"[{self.kind}{status}] {super().__str__()}"
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header given either in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def error_from_status(status_code: int, message: str, retry_after: float | None = None) -> OpenRouterError:
+    """Classify an HTTP status code (or an in-band error code) from OpenRouter."""
+    if status_code == 429:
+        kind = "rate_limited"
+    elif status_code in (401, 403):
+        kind = "auth"
+    elif status_code == 408:
+        kind = "timeout"
+    elif status_code >= 500:
+        kind = "server_error"
+    else:
+        kind = "client_error"
+    return OpenRouterError(kind, message, status_code=status_code, retry_after=retry_after)
+
+
+def classify_error(exc: BaseException) -> OpenRouterError:
+    """Map an exception raised while calling OpenRouter onto an OpenRouterError."""
+    if isinstance(exc, OpenRouterError):
+        return exc
+    if isinstance(exc, httpx.HTTPStatusError):
+        response = exc.response
+        return error_from_status(
+            response.status_code,
+            response.text[:200] or str(exc),
+            retry_after=_parse_retry_after(response.headers.get("Retry-After")),
+        )
+    if isinstance(exc, httpx.TimeoutException):
+        return OpenRouterError("timeout", str(exc) or type(exc).__name__)
+    if isinstance(exc, httpx.TransportError):
+        return OpenRouterError("network", str(exc) or type(exc).__name__)
+    if isinstance(exc, (KeyError, IndexError, TypeError, ValueError)):
+        return OpenRouterError("invalid_response", f"{type(exc).__name__}: {exc}")
+    return OpenRouterError("unknown", f"{type(exc).__name__}: {exc}")
+
+
+def retry_delay(error: OpenRouterError, attempt: int) -> float | None:
+    """
+    Seconds to wait before retrying after error, or None if it should not be retried.
+
+    Uses exponential backoff with full jitter. A Retry-After hint is honoured as
+    a lower bound; if it exceeds OPENROUTER_RETRY_MAX_DELAY we give up instead.
+    """
+    if not error.retryable:
+        return None
+    backoff = random.uniform(0, min(OPENROUTER_RETRY_MAX_DELAY, OPENROUTER_RETRY_BASE_DELAY * 2 ** attempt))
+    if error.retry_after is not None:
+        if error.retry_after > OPENROUTER_RETRY_MAX_DELAY:
+            return None
+        return max(error.retry_after, backoff)
+    return backoff
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for a single model.
+
+    closed: calls flow; failures are counted.
+    open: calls are rejected until the cooldown has passed.
+    half_open: a single probe call is let through; success closes the
+        breaker, failure re-opens it for another cooldown.
+    """
+
+    def __init__(self, failure_threshold: int, cooldown: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.last_error: str | None = None
+        self.probe_in_flight = False
+
+    def allow(self) -> bool:
+        """Return True if a call may proceed now."""
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.cooldown:
+                return False
+            self.state = "half_open"
+            self.probe_in_flight = False
+        if self.state == "half_open":
+            if self.probe_in_flight:
+                return False
+            self.probe_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = None
+        self.probe_in_flight = False
+
+    def record_failure(self, kind: str) -> None:
+        self.last_error = kind
+        self.probe_in_flight = False
+        if kind not in BREAKER_KINDS:
+            return
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """Forget an in-flight probe that ended without a verdict (e.g. cancelled)."""
+        self.probe_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        retry_in = None
+        if self.state == "open":
+            retry_in = round(max(self.cooldown - (time.monotonic() - self.opened_at), 0.0), 1)
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "last_error": self.last_error,
+            "retry_in_seconds": retry_in,
+        }
+
+
+# Global breaker registry (persists across Lambda invocations in warm containers)
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(model: str) -> CircuitBreaker:
+    """Return the circuit breaker for model, creating it on first use."""
+    breaker = _BREAKERS.get(model)
+    if breaker is None:
+        breaker = _BREAKERS[model] = CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_COOLDOWN)
+    return breaker
+
+
+def breaker_snapshot(models: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Breaker state for the given models, for inclusion in response metadata."""
+    return {model: get_breaker(model).snapshot() for model in dict.fromkeys(models)}
+
+
+def reset_breakers(models: Optional[List[str]] = None) -> None:
+    """Close the breakers for models (or all of them)."""
+    for model in models if models is not None else list(_BREAKERS):
+        _BREAKERS.pop(model, None)
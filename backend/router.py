@@ -0,0 +1,155 @@
+"""
+Declarative request routing for API Gateway events.
+
+Routes are registered once at import time with a path template such as
+"/api/conversations/{conversation_id}/messages/{seq:int}/resynthesize". Each
+template is compiled when it is registered and indexed by method and by its
+static prefix (everything before the first parameter): static paths are one
+dict lookup, and a templated path is only matched against the routes that
+share its prefix, so dispatch cost does not grow with the number of endpoints.
+
+Middleware wraps a route's handler (auth, body parsing, ...) and is composed
+once at registration. Timing hooks see every routed request with the route
+it hit and how long the handler took.
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+Handler = Callable[["Request"], Awaitable[Dict[str, Any]]]
+Middleware = Callable[["Request", Handler], Awaitable[Dict[str, Any]]]
+TimingHook = Callable[["Route", "Request", Dict[str, Any], float], None]
+
+# Converters for "{name:type}" template parameters: (pattern, parse)
+_CONVERTERS: Dict[str, Tuple[str, Callable[[str], Any]]] = {
+    "str": (r"[^/]+", str),
+    "int": (r"\d+", int),
+}
+_PARAMETER = re.compile(r"\{(\w+)(?::(\w+))?\}")
+
+
+class Request:
+    """A routed API Gateway event, with what middleware has attached to it."""
+
+    def __init__(self, event: Dict[str, Any], method: str, path: str, params: Dict[str, Any]) -> None:
+        self.event = event
+        self.method = method
+        self.path = path
+        self.params = params
+        self.query: Dict[str, str] = event.get("queryStringParameters") or {}
+        self.headers: Dict[str, str] = event.get("headers") or {}
+        self.user_id: str | None = None  # set by auth middleware
+        self.body: Dict[str, Any] = {}  # set by body-parsing middleware
+
+
+class Route:
+    """One method and path template, its compiled pattern and its composed handler."""
+
+    def __init__(self, method: str, template: str, handler: Handler, middleware: Tuple[Middleware, ...]) -> None:
+        self.method = method
+        self.template = template
+        self.name = handler.__name__
+        self.prefix, self.pattern, self.converters = _compile(template)
+        self.handler = _compose(handler, middleware)
+
+    def match(self, path: str) -> Optional[Dict[str, Any]]:
+        """Path parameters if path fits the template, else None."""
+        if self.pattern is None:
+            return {} if path == self.template else None
+        match = self.pattern.fullmatch(path)
+        if match is None:
+            return None
+        return {name: self.converters[name](value) for name, value in match.groupdict().items()}
+
+
+def _compile(template: str) -> Tuple[str, Optional[re.Pattern], Dict[str, Callable[[str], Any]]]:
+    """(static prefix, pattern, converters) for template; static templates have no pattern."""
+    first = _PARAMETER.search(template)
+    if first is None:
+        return template, None, {}
+    prefix = template[: first.start()]
+    if not prefix.endswith("/"):
+        raise ValueError(f"Route parameters must span whole path segments: {template}")
+
+    converters: Dict[str, Callable[[str], Any]] = {}
+    pattern, position = "", 0
+    for parameter in _PARAMETER.finditer(template):
+        name, kind = parameter.group(1), parameter.group(2) or "str"
+        if kind not in _CONVERTERS:
+            raise ValueError(f"Unknown route parameter type {kind!r} in {template}")
+        regex, converters[name] = _CONVERTERS[kind]
+        pattern += re.escape(template[position : parameter.start()]) + f"(?P<{name}>{regex})"
+        position = parameter.end()
+    pattern += re.escape(template[position:])
+    return prefix, re.compile(pattern), converters
+
+
+def _compose(handler: Handler, middleware: Tuple[Middleware, ...]) -> Handler:
+    """Wrap handler so middleware runs outermost-first, in the order given."""
+    for layer in reversed(middleware):
+        handler = (lambda layer, inner: lambda request: layer(request, inner))(layer, handler)
+    return handler
+
+
+class Router:
+    """Routes indexed by method and static prefix."""
+
+    def __init__(self) -> None:
+        self._static: Dict[Tuple[str, str], Route] = {}
+        self._templated: Dict[Tuple[str, str], List[Route]] = {}
+        self._timing_hooks: List[TimingHook] = []
+
+    def route(self, method: str, template: str, *middleware: Middleware) -> Callable[[Handler], Handler]:
+        """Decorator registering a handler for method and template, wrapped in middleware."""
+
+        def register(handler: Handler) -> Handler:
+            self.add(Route(method.upper(), template, handler, middleware))
+            return handler
+
+        return register
+
+    def add(self, route: Route) -> None:
+        if route.pattern is None:
+            if (route.method, route.template) in self._static:
+                raise ValueError(f"Duplicate route {route.method} {route.template}")
+            self._static[(route.method, route.template)] = route
+        else:
+            self._templated.setdefault((route.method, route.prefix), []).append(route)
+
+    def on_timing(self, hook: TimingHook) -> None:
+        """Call hook(route, request, response, seconds) after every routed request."""
+        self._timing_hooks.append(hook)
+
+    def match(self, method: str, path: str) -> Tuple[Optional[Route], Dict[str, Any]]:
+        """The route for method and path, and its path parameters; (None, {}) if none fits."""
+        route = self._static.get((method, path))
+        if route is not None:
+            return route, {}
+        # Probe each prefix of path ending in "/", longest (most specific) first
+        end = path.rfind("/")
+        while end >= 0:
+            for route in self._templated.get((method, path[: end + 1]), ()):
+                params = route.match(path)
+                if params is not None:
+                    return route, params
+            end = path.rfind("/", 0, end)
+        return None, {}
+
+    async def dispatch(self, event: Dict[str, Any], method: str, path: str) -> Optional[Dict[str, Any]]:
+        """Run the matching route's handler, or return None if no route fits."""
+        route, params = self.match(method, path)
+        if route is None:
+            return None
+        request = Request(event, method, path, params)
+        start = time.perf_counter()
+        response = await route.handler(request)
+        elapsed = time.perf_counter() - start
+        for hook in self._timing_hooks:
+            try:
+                hook(route, request, response, elapsed)
+            except Exception as exc:  # noqa: BLE001
+                print(f"Error in route timing hook: {exc}")
+        return response
@@ -0,0 +1,5 @@
+#!/bin/bash
+# Entrypoint for the streaming Function URL: the Lambda Web Adapter forwards
+# each invocation to this HTTP server and streams its response back.
+export PYTHONPATH="${LAMBDA_TASK_ROOT}:${PYTHONPATH}"
+exec python -m backend.main
@@ -0,0 +1,71 @@
+"""Per-container asyncio runtime shared by warm Lambda invocations."""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+from typing import Any, Awaitable, Callable, Coroutine, Dict, List, TypeVar
+
+T = TypeVar("T")
+
+# Global loop and loop-bound resources (persist across Lambda invocations in warm containers)
+_LOOP: asyncio.AbstractEventLoop | None = None
+_RESOURCES: Dict[str, Any] = {}
+_SHUTDOWN_HOOKS: List[Callable[[], Awaitable[None]]] = []
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Return the container's event loop, creating it on first use."""
+    global _LOOP
+    if _LOOP is None or _LOOP.is_closed():
+        _LOOP = asyncio.new_event_loop()
+        asyncio.set_event_loop(_LOOP)
+        _RESOURCES.clear()
+    return _LOOP
+
+
+def run(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    Run a coroutine to completion on the persistent loop.
+
+    Unlike asyncio.run, the loop is left open afterwards so pooled connections,
+    caches and background tasks survive until the next invocation.
+    """
+    return get_loop().run_until_complete(coro)
+
+
+def resource(name: str, factory: Callable[[], T]) -> T:
+    """
+    Return the loop-bound resource registered under name, creating it once.
+
+    Use this for objects that must be created on the running loop (semaphores,
+    locks, queues) so they are shared by every invocation in the container.
+    """
+    get_loop()
+    if name not in _RESOURCES:
+        _RESOURCES[name] = factory()
+    return _RESOURCES[name]
+
+
+def on_shutdown(hook: Callable[[], Awaitable[None]]) -> None:
+    """Register an async cleanup hook to run when the container shuts down."""
+    _SHUTDOWN_HOOKS.append(hook)
+
+
+def shutdown() -> None:
+    """Run shutdown hooks and close the loop."""
+    global _LOOP
+    if _LOOP is None or _LOOP.is_closed() or _LOOP.is_running():
+        return
+    for hook in reversed(_SHUTDOWN_HOOKS):
+        try:
+            _LOOP.run_until_complete(hook())
+        except Exception as exc:  # noqa: BLE001
+            print(f"Error during runtime shutdown: {exc}")
+    _LOOP.run_until_complete(_LOOP.shutdown_asyncgens())
+    _LOOP.close()
+    _LOOP = None
+    _RESOURCES.clear()
+
+
+atexit.register(shutdown)
@@ -0,0 +1,72 @@
+"""JSON encoding for API responses and stored payloads, using orjson when it is installed."""
+
+from __future__ import annotations
+
+import json
+from decimal import Decimal
+from typing import Any
+
+from .config import JSON_ENCODER
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def to_plain(value: Any) -> Any:
+    """
+    Replace the Decimals boto3 returns for DynamoDB numbers with ints and floats.
+
+    Applied once where items leave storage, so encoders never need a
+    per-value fallback. Other values are returned as they are.
+    """
+    if isinstance(value, dict):
+        return {key: to_plain(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [to_plain(item) for item in value]
+    if isinstance(value, Decimal):
+        return int(value) if value % 1 == 0 else float(value)
+    return value
+
+
+def _default(value: Any) -> Any:
+    # Safety net for Decimals that did not come through a storage read
+    if isinstance(value, Decimal):
+        return int(value) if value % 1 == 0 else float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _json_dumps(value: Any) -> str:
+    # ASCII output is the C encoder's fastest path
+    return json.dumps(value, default=_default, separators=(",", ":"))
+
+
+def _json_dumps_utf8(value: Any) -> str:
+    # Stored payloads keep non-ASCII text as is: \uXXXX escapes would inflate
+    # them and move stages across STAGE_COMPRESSION_MIN_BYTES
+    return json.dumps(value, default=_default, separators=(",", ":"), ensure_ascii=False)
+
+
+def _orjson_dumps(value: Any) -> str:
+    return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+
+def encoder_name() -> str:
+    """Encoder chosen by JSON_ENCODER ("auto" prefers orjson when installed)."""
+    if JSON_ENCODER == "json" or (JSON_ENCODER == "auto" and orjson is None):
+        return "json"
+    if orjson is None:
+        raise RuntimeError("JSON_ENCODER is orjson but the orjson package is not installed")
+    return "orjson"
+
+
+# dumps(value) -> compact JSON text for responses; dumps_utf8 for stored
+# payloads (orjson always emits UTF-8); loads(str or bytes)
+if encoder_name() == "orjson":
+    dumps = dumps_utf8 = _orjson_dumps
+    loads = orjson.loads
+else:
+    dumps = _json_dumps
+    dumps_utf8 = _json_dumps_utf8
+    loads = json.loads
@@ -0,0 +1,93 @@
+"""Per-user settings (council models and debate panel) behind a warm-container TTL cache."""
+
+from __future__ import annotations
+
+import copy
+import time
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+from . import storage_async
+from .config import SETTINGS_CACHE_MAX_ENTRIES, SETTINGS_CACHE_TTL
+
+# Cached settings by user id, least recently used first, and how many
+# invalidations have happened (persist across Lambda invocations in warm containers)
+_CACHE: OrderedDict[str, Tuple[float, Dict[str, List[str]]]] = OrderedDict()
+_INVALIDATIONS = 0
+_STATS = {"hits": 0, "misses": 0}
+
+
+def _remember(user_id: str, settings: Dict[str, List[str]]) -> None:
+    if SETTINGS_CACHE_TTL <= 0:
+        return
+    _CACHE[user_id] = (time.monotonic() + SETTINGS_CACHE_TTL, copy.deepcopy(settings))
+    _CACHE.move_to_end(user_id)
+    while len(_CACHE) > SETTINGS_CACHE_MAX_ENTRIES:
+        _CACHE.popitem(last=False)
+
+
+def invalidate(user_id: str) -> None:
+    """Forget user_id's cached settings, including any read still in flight."""
+    global _INVALIDATIONS
+    _INVALIDATIONS += 1
+    _CACHE.pop(user_id, None)
+
+
+async def get_user_settings(user_id: str) -> Dict[str, List[str]]:
+    """
+    A user's {"models": council models, "panel_models": debate panel}.
+
+    Served from the cache while fresh; otherwise both are read with one
+    storage call (a single BatchGetItem on DynamoDB) and cached.
+    """
+    entry = _CACHE.get(user_id)
+    if entry is not None and entry[0] > time.monotonic():
+        _STATS["hits"] += 1
+        _CACHE.move_to_end(user_id)
+        return copy.deepcopy(entry[1])
+
+    _STATS["misses"] += 1
+    invalidations = _INVALIDATIONS
+    settings = await storage_async.get_user_settings(user_id)
+    # A save that landed while this read was in flight may have made it stale
+    if invalidations == _INVALIDATIONS:
+        _remember(user_id, settings)
+    return settings
+
+
+async def get_user_council_models(user_id: str) -> List[str]:
+    """Get the list of selected council models for this user."""
+    return (await get_user_settings(user_id))["models"]
+
+
+async def get_user_debate_panel(user_id: str) -> List[str]:
+    """Get user's debate panel models."""
+    return (await get_user_settings(user_id))["panel_models"]
+
+
+async def save_user_council_models(user_id: str, models: List[str]) -> None:
+    """Save the list of selected council models for this user."""
+    try:
+        await storage_async.save_user_council_models(user_id, models)
+    finally:
+        invalidate(user_id)
+
+
+async def save_user_debate_panel(user_id: str, panel_models: List[str]) -> None:
+    """Save user's debate panel models."""
+    try:
+        await storage_async.save_user_debate_panel(user_id, panel_models)
+    finally:
+        invalidate(user_id)
+
+
+def stats() -> Dict[str, int]:
+    """Hit/miss counters and occupancy for this container."""
+    return {**_STATS, "entries": len(_CACHE)}
+
+
+def clear() -> None:
+    """Empty the cache and reset counters."""
+    _CACHE.clear()
+    for name in _STATS:
+        _STATS[name] = 0
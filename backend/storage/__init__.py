@@ -0,0 +1,50 @@
+"""
+Storage for conversations, user settings and shared caches.
+
+The implementation is chosen by STORAGE_BACKEND: dynamodb (the deployed
+stack), sqlite (single-node self-hosting) or memory (local runs and
+benchmarks). Every backend module provides the functions re-exported here,
+with the same arguments, return values and errors: ValueError for a missing
+or foreign conversation on writes, RuntimeError for a failure in the store.
+"""
+
+from __future__ import annotations
+
+from importlib import import_module
+
+from ..config import STORAGE_BACKEND
+from .common import MESSAGE_FIELDS, etag, project_message
+
+BACKENDS = ("dynamodb", "sqlite", "memory")
+
+if STORAGE_BACKEND not in BACKENDS:
+    raise ValueError(f"Unknown STORAGE_BACKEND {STORAGE_BACKEND!r}; expected one of {', '.join(BACKENDS)}")
+
+# Only the selected backend is imported, so sqlite and memory run without AWS credentials or tables
+_backend = import_module(f".{STORAGE_BACKEND}", __name__)
+
+create_conversation = _backend.create_conversation
+get_conversation = _backend.get_conversation
+get_conversation_header = _backend.get_conversation_header
+get_conversation_for_user = _backend.get_conversation_for_user
+get_message = _backend.get_message
+save_conversation = _backend.save_conversation
+list_conversations_page = _backend.list_conversations_page
+list_conversations = _backend.list_conversations
+add_user_message = _backend.add_user_message
+add_assistant_message = _backend.add_assistant_message
+start_assistant_message = _backend.start_assistant_message
+update_assistant_message = _backend.update_assistant_message
+add_message_alternate = _backend.add_message_alternate
+update_conversation_title = _backend.update_conversation_title
+delete_conversation = _backend.delete_conversation
+get_user_debate_panel = _backend.get_user_debate_panel
+save_user_debate_panel = _backend.save_user_debate_panel
+get_user_council_models = _backend.get_user_council_models
+save_user_council_models = _backend.save_user_council_models
+get_user_settings = _backend.get_user_settings
+get_latency_stats = _backend.get_latency_stats
+save_latency_stats = _backend.save_latency_stats
+get_cached_response = _backend.get_cached_response
+put_cached_response = _backend.put_cached_response
+save_debate_session = _backend.save_debate_session
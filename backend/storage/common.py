@@ -0,0 +1,122 @@
+"""Record shapes and helpers shared by every storage backend."""
+
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Sequence
+
+# Length of the last-message preview kept on each conversation for listings
+PREVIEW_LENGTH = 120
+
+# Assistant message attributes stored compressed (see compression.pack)
+STAGE_ATTRIBUTES = ("stage1", "stage2", "stage3")
+
+# Message attributes a read can leave out with fields= (see project_message);
+# everything else (role, content, status, rankings, ...) is always returned
+MESSAGE_FIELDS = (*STAGE_ATTRIBUTES, "alternates")
+
+# Stage 2 outcome stored beside the rankings themselves, so a view without
+# stage2 can still order the answers
+RANKING_ATTRIBUTES = ("label_to_model", "aggregate_rankings")
+
+# Returned for a user who has not saved a debate panel yet
+DEFAULT_DEBATE_PANEL = ["", "", ""]
+
+
+def now_iso() -> str:
+    return datetime.utcnow().isoformat()
+
+
+def preview(message: Dict[str, Any]) -> str:
+    """One-line preview of a user message, assistant message (stage 3) or debate turn."""
+    text = message.get("content") or (message.get("stage3") or {}).get("response") or message.get("response")
+    return " ".join(str(text or "").split())[:PREVIEW_LENGTH]
+
+
+def summarize(conversation: Dict[str, Any]) -> Dict[str, Any]:
+    """Refresh the summary attributes listings read instead of the message bodies, and bump the version."""
+    messages = conversation.get("messages", [])
+    conversation["message_count"] = len(messages)
+    conversation["updated_at"] = now_iso()
+    conversation["preview"] = preview(messages[-1]) if messages else ""
+    conversation["version"] = int(conversation.get("version", 0)) + 1
+    return conversation
+
+
+def etag(conversation: Dict[str, Any], before: int | None = None) -> str | None:
+    """
+    Weak validator for a conversation (header alone, or a page fetched with before).
+
+    Every write to a conversation or its messages bumps the header's version;
+    updated_at covers headers written before versions existed. An append
+    bumps the header just before its message lands, so a latest page that
+    ends short of message_count gets None rather than a tag for stale data.
+    """
+    messages = conversation.get("messages")
+    if messages is not None and before is None:
+        last_seq = messages[-1]["seq"] if messages else 0
+        if last_seq < int(conversation.get("message_count", 0)):
+            return None
+    return f'W/"{int(conversation.get("version", 0))}-{conversation.get("updated_at", "")}"'
+
+
+def header(conversation: Dict[str, Any]) -> Dict[str, Any]:
+    """The conversation record itself: everything except the messages."""
+    return {key: value for key, value in conversation.items() if key != "messages"}
+
+
+def partial_assistant_message(
+    stage1: List[Dict[str, Any]],
+    council_models: List[str] | None = None,
+    chairman_model: str | None = None,
+) -> Dict[str, Any]:
+    """
+    An assistant message holding only stage 1, plus what a resumed run needs to finish it.
+
+    Messages stored stage by stage carry a status: the last stage stored
+    ("stage1", "stage2") until they are "complete". Messages without one are complete.
+    """
+    message: Dict[str, Any] = {"role": "assistant", "status": "stage1", "stage1": stage1}
+    if council_models:
+        message["council_models"] = council_models
+    if chairman_model:
+        message["chairman_model"] = chairman_model
+    return message
+
+
+def project_message(message: Dict[str, Any], fields: Sequence[str] | None) -> Dict[str, Any]:
+    """message without the MESSAGE_FIELDS missing from fields (message itself if fields is None)."""
+    if fields is None:
+        return message
+    return {key: value for key, value in message.items() if key not in MESSAGE_FIELDS or key in fields}
+
+
+def listing_entry(item: Dict[str, Any]) -> Dict[str, Any]:
+    """The summary of a conversation header returned by list_conversations_page."""
+    return {
+        "id": item["id"],
+        "created_at": item.get("created_at", ""),
+        "title": item.get("title", "New Conversation"),
+        "updated_at": item.get("updated_at", item.get("created_at", "")),
+        "type": item.get("type", "council"),
+        "message_count": int(item.get("message_count", 0)),
+        "preview": item.get("preview", ""),
+    }
+
+
+def encode_cursor(last_key: Dict[str, Any]) -> str:
+    """Opaque listing cursor for the last conversation of a page (its id, user_id and created_at)."""
+    return base64.urlsafe_b64encode(json.dumps(last_key).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, user_id: str) -> Dict[str, Any]:
+    """Decode a listing cursor, rejecting malformed ones and other users' cursors."""
+    try:
+        last_key = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, UnicodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(last_key, dict) or last_key.get("user_id") != user_id:
+        raise ValueError("Invalid cursor")
+    return last_key
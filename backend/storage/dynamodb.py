@@ -0,0 +1,1033 @@
+"""
+DynamoDB storage backend.
+
+A conversation is a header item in the conversations table (owner, title,
+summary attributes) plus one item per message in the messages table, keyed
+by (conversation_id, seq) with seq counting from 1. Conversations written
+before that split keep their messages embedded in the header; readers merge
+both until `python -m backend.migrate messages` has moved them out.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import boto3
+from boto3.dynamodb.types import TypeSerializer
+from botocore.exceptions import ClientError
+
+from .. import compression
+from ..serialization import to_plain
+from ..config import CONVERSATIONS_TABLE, CONVERSATIONS_USER_INDEX, MESSAGES_TABLE
+from .common import (
+    DEFAULT_DEBATE_PANEL,
+    RANKING_ATTRIBUTES,
+    STAGE_ATTRIBUTES,
+    decode_cursor,
+    encode_cursor,
+    header,
+    listing_entry,
+    now_iso,
+    partial_assistant_message,
+    preview,
+    project_message,
+    summarize,
+)
+
+
+# Per-thread boto3 resources (persist across Lambda invocations in warm containers)
+_LOCAL = threading.local()
+
+
+def _resource() -> Any:
+    """
+    This thread's DynamoDB service resource.
+
+    boto3 resources and sessions are not thread-safe, and storage calls run on
+    a pool of worker threads (see backend.storage_async), so every thread
+    builds its resource from a private session on first use.
+    """
+    resource = getattr(_LOCAL, "resource", None)
+    if resource is None:
+        resource = boto3.session.Session().resource("dynamodb")
+        _LOCAL.resource = resource
+    return resource
+
+
+class _ThreadLocalTable:
+    """A DynamoDB Table that resolves to the calling thread's own resource (see _resource)."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._local = threading.local()
+
+    def _resolve(self) -> Any:
+        table = getattr(self._local, "table", None)
+        if table is None:
+            table = _resource().Table(self.name)
+            self._local.table = table
+        return table
+
+    def __getattr__(self, attribute: str) -> Any:
+        return getattr(self._resolve(), attribute)
+
+
+_table = _ThreadLocalTable(CONVERSATIONS_TABLE)
+_messages_table = _ThreadLocalTable(MESSAGES_TABLE)
+
+
+def _handle_client_error(error: ClientError) -> None:
+    raise RuntimeError(f"DynamoDB error: {error}") from error
+
+
+# Attributes read by conversation listings (also the index's projection)
+SUMMARY_ATTRIBUTES = "id, created_at, updated_at, title, message_count, preview, #tp"
+
+# BatchGetItem calls made for one read before giving up on throttled keys
+BATCH_GET_ATTEMPTS = 4
+
+# Transactions tried per message append before giving up on a contended conversation
+APPEND_ATTEMPTS = 5
+
+# What a projected message read (fields=) returns besides the requested
+# fields: every other attribute messages and debate turns are written with
+MESSAGE_ATTRIBUTES = (
+    "seq",
+    "role",
+    "content",
+    "status",
+    "council_models",
+    "chairman_model",
+    *RANKING_ATTRIBUTES,
+    "model",
+    "response",
+)
+
+
+_SERIALIZER = TypeSerializer()
+
+
+def _serialize(values: Dict[str, Any]) -> Dict[str, Any]:
+    """Expression values in the low-level client's typed form (transactions have no resource API)."""
+    return {name: _SERIALIZER.serialize(value) for name, value in values.items()}
+
+
+def _to_dynamo(value: Any) -> Any:
+    """Floats as the Decimals boto3 requires for numbers (the inverse of to_plain)."""
+    if isinstance(value, dict):
+        return {key: _to_dynamo(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_to_dynamo(item) for item in value]
+    if isinstance(value, float):
+        return Decimal(str(value))
+    return value
+
+
+def _projection(fields: Sequence[str] | None) -> Dict[str, Any]:
+    """Read parameters for MESSAGE_ATTRIBUTES plus fields (none, for whole items, if fields is None)."""
+    if fields is None:
+        return {}
+    # Names are aliased because several (status, role, ...) are DynamoDB reserved words
+    names = {f"#p{index}": name for index, name in enumerate(dict.fromkeys((*MESSAGE_ATTRIBUTES, *fields)))}
+    return {"ProjectionExpression": ", ".join(names), "ExpressionAttributeNames": names}
+
+
+def _batch_get(request: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """Run one BatchGetItem request to completion, returning the items found per table."""
+    items: Dict[str, List[Dict[str, Any]]] = {}
+    try:
+        for attempt in range(BATCH_GET_ATTEMPTS):
+            response = _resource().batch_get_item(RequestItems=request)
+            for table, found in response.get("Responses", {}).items():
+                items.setdefault(table, []).extend(found)
+            request = response.get("UnprocessedKeys")
+            if not request:
+                return items
+            # Keys come back unprocessed when a table is throttled; back off before retrying them
+            time.sleep(0.05 * 2 ** attempt)
+    except ClientError as error:  # noqa: BLE001
+        _handle_client_error(error)
+    raise RuntimeError("DynamoDB batch read failed: keys left unprocessed")
+
+
+def _pack_stages(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: compression.pack(value) if key in STAGE_ATTRIBUTES else value for key, value in record.items()}
+
+
+def _unpack_stages(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: compression.unpack(value) if key in STAGE_ATTRIBUTES else value for key, value in record.items()}
+
+
+def _message_item(conversation_id: str, seq: int, message: Dict[str, Any]) -> Dict[str, Any]:
+    """The messages-table item for message, with its stage payloads compressed."""
+    item = _to_dynamo(_pack_stages(message))
+    item.update(conversation_id=conversation_id, seq=seq)
+    return item
+
+
+def _message_from_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Inverse of _message_item: decompress stage payloads and drop the conversation key."""
+    # Numbers become ints and floats before the (already plain) compressed payloads are unpacked
+    message = _unpack_stages({key: to_plain(value) for key, value in item.items() if key != "conversation_id"})
+    if "alternates" in message:
+        message["alternates"] = [_unpack_stages(alternate) for alternate in message["alternates"]]
+    message["seq"] = int(item["seq"])
+    return message
+
+
+def _put_messages(conversation_id: str, messages: List[Dict[str, Any]], first_seq: int = 1) -> None:
+    """Write messages as items numbered from first_seq (idempotent)."""
+    with _messages_table.batch_writer() as batch:
+        for seq, message in enumerate(messages, start=first_seq):
+            message = {key: value for key, value in message.items() if key != "seq"}
+            batch.put_item(Item=_message_item(conversation_id, seq, message))
+
+
+def _query_messages(
+    conversation_id: str,
+    limit: int | None = None,
+    before: int | None = None,
+    fields: Sequence[str] | None = None,
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Return the latest limit message items with seq < before (oldest first), and whether older ones exist.
+
+    With fields, the query projects the items to MESSAGE_ATTRIBUTES and
+    those fields, so left-out stages are neither read nor decompressed.
+    """
+    query_kwargs: Dict[str, Any] = {
+        "KeyConditionExpression": "conversation_id = :cid",
+        "ExpressionAttributeValues": {":cid": conversation_id},
+        "ScanIndexForward": False,
+        "ConsistentRead": True,
+        **_projection(fields),
+    }
+    if before is not None:
+        query_kwargs["KeyConditionExpression"] += " AND seq < :before"
+        query_kwargs["ExpressionAttributeValues"][":before"] = before
+
+    items: List[Dict[str, Any]] = []
+    last_key = None
+    try:
+        while True:
+            if limit is not None:
+                query_kwargs["Limit"] = limit - len(items)
+            response = _messages_table.query(**query_kwargs)
+            items.extend(response.get("Items", []))
+
+            last_key = response.get("LastEvaluatedKey")
+            if not last_key or (limit is not None and len(items) >= limit):
+                break
+            query_kwargs["ExclusiveStartKey"] = last_key
+    except ClientError as error:  # noqa: BLE001
+        _handle_client_error(error)
+
+    messages = [_message_from_item(item) for item in reversed(items)]
+    return messages, last_key is not None
+
+
+def _load_messages(
+    conversation: Dict[str, Any],
+    limit: int | None = None,
+    before: int | None = None,
+    fields: Sequence[str] | None = None,
+) -> Dict[str, Any]:
+    """
+    Attach messages (oldest first, each with its seq) to a conversation header.
+
+    Sets next_before to the seq to pass as before= for the previous page, or
+    None when the start of the conversation has been reached.
+    """
+    # Messages still embedded in a pre-migration header are seq 1..n
+    embedded = conversation.pop("messages", None) or []
+    merged = {
+        seq: {**project_message(message, fields), "seq": seq}
+        for seq, message in enumerate(embedded, start=1)
+        if before is None or seq < before
+    }
+    items, has_more = _query_messages(conversation["id"], limit, before, fields)
+    merged.update((message["seq"], message) for message in items)
+
+    messages = [merged[seq] for seq in sorted(merged)]
+    if limit is not None and len(messages) > limit:
+        messages = messages[-limit:]
+        has_more = True
+    conversation["messages"] = messages
+    conversation["next_before"] = messages[0]["seq"] if has_more and messages else None
+    return conversation
+
+
+def create_conversation(conversation_id: str, user_id: str) -> Dict[str, Any]:
+    """Create a new conversation record owned by user_id."""
+    conversation = {
+        "id": conversation_id,
+        "user_id": user_id,
+        "created_at": now_iso(),
+        "title": "New Conversation",
+        "type": "council",
+        "messages": [],
+    }
+    summarize(conversation)
+    try:
+        _table.put_item(Item=header(conversation))
+    except ClientError as error:  # noqa: BLE001
+        _handle_client_error(error)
+    return conversation
+
+
+def _get_header(conversation_id: str) -> Optional[Dict[str, Any]]:
+    try:
+        response = _table.get_item(Key={"id": conversation_id})
+    except ClientError as error:  # noqa: BLE001
+        _handle_client_error(error)
+    item = response.get("Item")
+    return to_plain(item) if item is not None else None
+
+
+def get_conversation(conversation_id: str) -> Optional[Dict[str, Any]]:
+    """Fetch a conversation by id, with all of its messages."""
+    conversation = _get_header(conversation_id)
+    if conversation is None:
+        return None
+    return _load_messages(conversation)
+
+
+def get_conversation_header(conversation_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+    """
+    The header attributes a conditional fetch compares (id, version, updated_at,
+    message_count), without any messages; None if missing or owned by someone else.
+    """
+    try:
+        response = _table.get_item(
+            Key={"id": conversation_id},
+            ProjectionExpression="id, user_id, version, updated_at, message_count",
+        )
+    except ClientError as error:  # noqa: BLE001
+        _handle_client_error(error)
+    item = response.get("Item")
+    if item is None or item.get("user_id") != user_id:
+        return None
+    return to_plain(item)
+
+
+def get_conversation_for_user(
+    conversation_id: str,
+    user_id: str,
+    limit: int | None = None,
+    before: int | None = None,
+    fields: Sequence[str] | None = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Fetch a conversation by id, only if owned by user_id.
+
+    Args:
+        conversation_id: Conversation to fetch
+        user_id: Expected owner
+        limit: Only return the latest limit messages (all of them if None)
+        before: Only return messages with seq below this (from next_before)
+        fields: Only return these of MESSAGE_FIELDS (all of them if None);
+            other message attributes are always returned
+
+    Returns:
+        The conversation with 'messages' oldest first and 'next_before', or
+        None if missing or owned by someone else
+    """
+    conversation = _get_header(conversation_id)
+    if conversation is None:
+        return None
+    if conversation.get("user_id") != user_id:
+        return None
+    return _load_messages(conversation, limit, before, fields)
+
+
+def get_message(
+    conversation_id: str,
+    seq: int,
+    user_id: str,
+    fields: Sequence[str] | None = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    One message of a conversation, reading the owner and the message in a single BatchGetItem.
+
+    Args:
+        conversation_id: Conversation the message belongs to
+        seq: The message's seq
+        user_id: Expected owner of the conversation
+        fields: Only return these of MESSAGE_FIELDS (all of them if None)
+
+    Returns:
+        The message with its seq, or None if the conversation is missing or
+        owned by someone else, or has no such message
+    """
+    if seq < 1:
+        return None
+    items = _batch_get(
+        {
+            # Pre-migration conversations still hold their messages in the header;
+            # the list-index path reads only the requested one
+            CONVERSATIONS_TABLE: {
+                "Keys": [{"id": conversation_id}],
+                "ProjectionExpression": f"user_id, messages[{seq - 1}]",
+            },
+            MESSAGES_TABLE: {"Keys": [{"conversation_id": conversation_id, "seq": seq}], **_projection(fields)},
+        }
+    )
+    headers = items.get(CONVERSATIONS_TABLE, [])
+    if not headers or headers[0].get("user_id") != user_id:
+        return None
+    found = items.get(MESSAGES_TABLE, [])
+    if found:
+        return _message_from_item(found[0])
+    # A projected list element comes back as a one-element list
+    embedded = headers[0].get("messages") or []
+    if embedded:
+        return {**project_message(to_plain(embedded[0]), fields), "seq": seq}
+    return None
+
+
+def save_conversation(conversation: Dict[str, Any]) -> None:
+    """Persist a conversation (header and messages), refreshing its summary attributes."""
+    summarize(conversation)
+    try:
+        _table.put_item(Item=header(conversation))
+        _put_messages(conversation["id"], conversation.get("messages", []))
+    except ClientError as error:  # noqa: BLE001
+        _handle_client_error(error)
+
+
+def list_conversations_page(
+    user_id: str,
+    limit: int | None = None,
+    cursor: str | None = None,
+    conversation_type: str | None = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Return one page of a user's conversation metadata, newest first.
+
+    Queries the user_id/created_at index, so the cost depends only on the
+    user's own history. Settings items carry no user_id and are never read.
+
+    Args:
+        user_id: Owner of the conversations
+        limit: Maximum conversations to return (all of them if None)
+        cursor: next_cursor from a previous page
+        conversation_type: Only return conversations of this type ("council" or "debate")
+
+    Returns:
+        (conversations, next_cursor); next_cursor is None on the last page
+
+    Raises:
+        ValueError: If cursor is malformed
+    """
+    query_kwargs: Dict[str, Any] = {
+        "IndexName": CONVERSATIONS_USER_INDEX,
+        "KeyConditionExpression": "user_id = :uid",
+        "ExpressionAttributeValues": {":uid": user_id},
+        "ProjectionExpression": SUMMARY_ATTRIBUTES,
+        "ExpressionAttributeNames": {"#tp": "type"},
+        "ScanIndexForward": False,
+    }
+    if conversation_type == "council":
+        # Conversations predating the type attribute are council conversations
+        query_kwargs["FilterExpression"] = "attribute_not_exists(#tp) OR #tp = :tp"
+        query_kwargs["ExpressionAttributeValues"][":tp"] = conversation_type
+    elif conversation_type:
+        query_kwargs["FilterExpression"] = "#tp = :tp"
+        query_kwargs["ExpressionAttributeValues"][":tp"] = conversation_type
+    if cursor:
+        query_kwargs["ExclusiveStartKey"] = decode_cursor(cursor, user_id)
+
+    items: List[Dict[str, Any]] = []
+    last_key = None
+    try:
+        # Limit applies before the type filter, so keep reading until the page is full.
+        # Each read asks for at most the remaining count, so a page never overshoots
+        # and LastEvaluatedKey is exactly where the next page starts.
+        while True:
+            if limit is not None:
+                query_kwargs["Limit"] = limit - len(items)
+            response = _table.query(**query_kwargs)
+            items.extend(response.get("Items", []))
+
+            last_key = response.get("LastEvaluatedKey")
+            if not last_key or (limit is not None and len(items) >= limit):
+                break
+            query_kwargs["ExclusiveStartKey"] = last_key
+    except ClientError as error:  # noqa: BLE001
+        _handle_client_error(error)
+
+    conversations = [listing_entry(item) for item in items]
+    return conversations, encode_cursor(last_key) if last_key else None
+
+
+def list_conversations(user_id: str, conversation_type: str | None = None) -> List[Dict[str, Any]]:
+    """Return conversation metadata for a specific user, sorted newest first."""
+    conversations, _ = list_conversations_page(user_id, conversation_type=conversation_type)
+    return conversations
+
+
+def backfill_conversation_summaries() -> int:
+    """
+    Add summary attributes to conversations written before they existed.
+
+    Listings only read the summary, so older conversations show no message
+    count or preview until this has run. Returns how many items were updated.
+    """
+    scan_kwargs: Dict[str, Any] = {
+        "FilterExpression": "attribute_exists(user_id) AND attribute_not_exists(message_count)",
+    }
+    updated = 0
+    try:
+        while True:
+            response = _table.scan(**scan_kwargs)
+            for item in response.get("Items", []):
+                messages = item.get("messages", [])
+                try:
+                    _table.update_item(
+                        Key={"id": item["id"]},
+                        UpdateExpression="SET message_count = :count, updated_at = :updated, preview = :preview",
+                        ConditionExpression="attribute_not_exists(message_count)",
+                        ExpressionAttributeValues={
+                            ":count": len(messages),
+                            ":updated": item.get("created_at") or now_iso(),
+                            ":preview": preview(messages[-1]) if messages else "",
+                        },
+                    )
+                except ClientError as error:
+                    # A concurrent write already summarized it
+                    if error.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                        raise
+                    continue
+                updated += 1
+            last_key = response.get("LastEvaluatedKey")
+            if not last_key:
+                break
+            scan_kwargs["ExclusiveStartKey"] = last_key
+    except ClientError as error:  # noqa: BLE001
+        _handle_client_error(error)
+    return updated
+
+
+def _update_conversation(
+    conversation_id: str,
+    user_id: str | None,
+    update_expression: str,
+    values: Dict[str, Any],
+) -> None:
+    """
+    Apply one conditional UpdateItem to an existing conversation.
+
+    The write only happens if the conversation exists (and, when user_id is
+    given, belongs to that user), so a single round trip replaces the old
+    get_item/put_item pair and concurrent writers cannot clobber each other.
+
+    Raises:
+        ValueError: If the conversation does not exist or is not owned by user_id
+    """
+    condition = "attribute_exists(id)"
+    if user_id is not None:
+        condition += " AND user_id = :uid"
+        values = {**values, ":uid": user_id}
+    try:
+        _table.update_item(
+            Key={"id": conversation_id},
+            UpdateExpression=update_expression,
+            ConditionExpression=condition,
+            ExpressionAttributeValues=values,
+        )
+    except ClientError as error:  # noqa: BLE001
+        if error.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            raise ValueError(f"Conversation {conversation_id} not found") from error
+        _handle_client_error(error)
+
+
+def _append_message(conversation_id: str, message: Dict[str, Any], user_id: str | None) -> int:
+    """
+    Append message as the conversation's next item; returns its seq (the new message count).
+
+    The header update (count, updated_at, preview, version) and the message
+    put run in one transaction, conditioned on the count read just before, so
+    a failed put never leaves the count ahead of the stored messages.
+    Concurrent appends that lose the race re-read and retry. Neither write
+    touches earlier messages, so the cost is independent of history length.
+
+    Raises:
+        ValueError: If the conversation does not exist or is not owned by user_id
+    """
+    for attempt in range(APPEND_ATTEMPTS):
+        try:
+            # messages is only present on pre-migration headers, which may predate message_count
+            current = _table.get_item(
+                Key={"id": conversation_id},
+                ProjectionExpression="user_id, message_count, messages",
+                ConsistentRead=True,
+            ).get("Item")
+        except ClientError as error:  # noqa: BLE001
+            _handle_client_error(error)
+        if current is None or (user_id is not None and current.get("user_id") != user_id):
+            raise ValueError(f"Conversation {conversation_id} not found")
+
+        if "message_count" in current:
+            count = int(current["message_count"])
+            condition = "attribute_exists(id) AND message_count = :count"
+        else:
+            # Without a count, the embedded messages are seq 1..n and the next seq follows them
+            count = len(current.get("messages") or [])
+            condition = (
+                "attribute_exists(id) AND attribute_not_exists(message_count)"
+                " AND (attribute_not_exists(messages) OR size(messages) = :count)"
+            )
+        seq = count + 1
+        try:
+            _resource().meta.client.transact_write_items(
+                TransactItems=[
+                    {
+                        "Update": {
+                            "TableName": CONVERSATIONS_TABLE,
+                            "Key": {"id": {"S": conversation_id}},
+                            "UpdateExpression": (
+                                "SET updated_at = :now, preview = :preview, message_count = :seq ADD version :one"
+                            ),
+                            "ConditionExpression": condition,
+                            "ExpressionAttributeValues": _serialize(
+                                {":now": now_iso(), ":preview": preview(message), ":seq": seq, ":count": count, ":one": 1}
+                            ),
+                        }
+                    },
+                    {
+                        "Put": {
+                            "TableName": MESSAGES_TABLE,
+                            "Item": _serialize(_message_item(conversation_id, seq, message)),
+                            "ConditionExpression": "attribute_not_exists(seq)",
+                        }
+                    },
+                ]
+            )
+            return seq
+        except ClientError as error:  # noqa: BLE001
+            if error.response["Error"]["Code"] != "TransactionCanceledException":
+                _handle_client_error(error)
+            reasons = [reason.get("Code") for reason in error.response.get("CancellationReasons", [])]
+            if not set(reasons) & {"ConditionalCheckFailed", "TransactionConflict"}:
+                _handle_client_error(error)
+        # Another append took this seq; back off and read the new count
+        time.sleep(0.02 * 2 ** attempt)
+    raise RuntimeError(f"Failed to append to conversation {conversation_id}: too many concurrent appends")
+
+
+def migrate_embedded_messages() -> int:
+    """
+    Move messages embedded in pre-split conversation headers into message items.
+
+    Items are written first (idempotently), then the embedded list is removed
+    only if it hasn't changed meanwhile, so the migration can run while the
+    service is live and can simply be re-run. Returns how many conversations
+    were migrated.
+    """
+    scan_kwargs: Dict[str, Any] = {"FilterExpression": "attribute_exists(messages)"}
+    migrated = 0
+    try:
+        while True:
+            response = _table.scan(**scan_kwargs)
+            for item in response.get("Items", []):
+                messages = item.get("messages", [])
+                _put_messages(item["id"], messages)
+                try:
+                    _table.update_item(
+                        Key={"id": item["id"]},
+                        # Newer appends may already have advanced message_count past the embedded list
+                        UpdateExpression=(
+                            "SET message_count = if_not_exists(message_count, :count), "
+                            "preview = if_not_exists(preview, :preview) REMOVE messages"
+                        ),
+                        ConditionExpression="size(messages) = :count",
+                        ExpressionAttributeValues={
+                            ":count": len(messages),
+                            ":preview": preview(messages[-1]) if messages else "",
+                        },
+                    )
+                except ClientError as error:
+                    # Written to by an older deployment meanwhile; picked up on the next run
+                    if error.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                        raise
+                    continue
+                migrated += 1
+            last_key = response.get("LastEvaluatedKey")
+            if not last_key:
+                break
+            scan_kwargs["ExclusiveStartKey"] = last_key
+    except ClientError as error:  # noqa: BLE001
+        _handle_client_error(error)
+    return migrated
+
+
+def add_user_message(conversation_id: str, content: str, user_id: str | None = None) -> int:
+    """
+    Append a user message to a conversation.
+
+    Returns:
+        The conversation's message count after the append (1 for a first message)
+
+    Raises:
+        ValueError: If the conversation does not exist or is not owned by user_id
+    """
+    return _append_message(conversation_id, {"role": "user", "content": content}, user_id)
+
+
+def add_assistant_message(
+    conversation_id: str,
+    stage1: List[Dict[str, Any]],
+    stage2: List[Dict[str, Any]],
+    stage3: Dict[str, Any],
+    user_id: str | None = None,
+) -> None:
+    """Append an assistant message with all three stages."""
+    _append_message(
+        conversation_id,
+        {
+            "role": "assistant",
+            "stage1": stage1,
+            "stage2": stage2,
+            "stage3": stage3,
+        },
+        user_id,
+    )
+
+
+def start_assistant_message(
+    conversation_id: str,
+    stage1: List[Dict[str, Any]],
+    council_models: List[str] | None = None,
+    chairman_model: str | None = None,
+    user_id: str | None = None,
+) -> int:
+    """
+    Append an assistant message holding only stage 1 results (status "stage1").
+
+    Later stages are added with update_assistant_message as they complete, so
+    a run that dies part-way keeps what it already paid for.
+
+    Returns:
+        The new message's seq
+
+    Raises:
+        ValueError: If the conversation does not exist or is not owned by user_id
+    """
+    message = partial_assistant_message(stage1, council_models, chairman_model)
+    return _append_message(conversation_id, message, user_id)
+
+
+def _update_message_and_header(
+    conversation_id: str,
+    seq: int,
+    user_id: str | None,
+    header_expression: str,
+    header_values: Dict[str, Any],
+    message_expression: str,
+    message_values: Dict[str, Any],
+    message_names: Dict[str, str] | None = None,
+) -> None:
+    """
+    Update one message and its conversation header (bumping the version) in a single transaction.
+
+    The header write carries the ownership check and the message write
+    requires the message to exist; either failing cancels both, so readers
+    never see a new version without the change it stands for (see common.etag).
+
+    Raises:
+        ValueError: If the conversation or message does not exist, or the
+            conversation is not owned by user_id
+    """
+    condition = "attribute_exists(id)"
+    header_values = {**header_values, ":one": 1}
+    if user_id is not None:
+        condition += " AND user_id = :uid"
+        header_values[":uid"] = user_id
+    message_update: Dict[str, Any] = {
+        "TableName": MESSAGES_TABLE,
+        "Key": {"conversation_id": {"S": conversation_id}, "seq": {"N": str(seq)}},
+        "UpdateExpression": message_expression,
+        "ConditionExpression": "attribute_exists(seq)",
+        "ExpressionAttributeValues": _serialize(message_values),
+    }
+    if message_names:
+        message_update["ExpressionAttributeNames"] = message_names
+    try:
+        _resource().meta.client.transact_write_items(
+            TransactItems=[
+                {
+                    "Update": {
+                        "TableName": CONVERSATIONS_TABLE,
+                        "Key": {"id": {"S": conversation_id}},
+                        "UpdateExpression": header_expression + " ADD version :one",
+                        "ConditionExpression": condition,
+                        "ExpressionAttributeValues": _serialize(header_values),
+                    }
+                },
+                {"Update": message_update},
+            ]
+        )
+    except ClientError as error:  # noqa: BLE001
+        if error.response["Error"]["Code"] == "TransactionCanceledException":
+            reasons = [reason.get("Code") for reason in error.response.get("CancellationReasons", [])]
+            if reasons[:1] == ["ConditionalCheckFailed"]:
+                raise ValueError(f"Conversation {conversation_id} not found") from error
+            if reasons[1:2] == ["ConditionalCheckFailed"]:
+                raise ValueError(f"Message {seq} of conversation {conversation_id} not found") from error
+        _handle_client_error(error)
+
+
+def update_assistant_message(
+    conversation_id: str,
+    seq: int,
+    fields: Dict[str, Any],
+    user_id: str | None = None,
+) -> None:
+    """
+    Set fields (stage1/stage2/stage3, status, ...) on an existing message.
+
+    The conversation's preview is refreshed when stage3 is among them.
+
+    Raises:
+        ValueError: If the conversation or message does not exist, or the
+            conversation is not owned by user_id
+    """
+    expression = "SET updated_at = :now"
+    values: Dict[str, Any] = {":now": now_iso()}
+    if "stage3" in fields:
+        expression += ", preview = :preview"
+        values[":preview"] = preview(fields)
+
+    item = _message_item(conversation_id, seq, fields)
+    assignments, names, field_values = [], {}, {}
+    for index, name in enumerate(fields):
+        assignments.append(f"#f{index} = :f{index}")
+        names[f"#f{index}"] = name
+        field_values[f":f{index}"] = item[name]
+    _update_message_and_header(
+        conversation_id,
+        seq,
+        user_id,
+        expression,
+        values,
+        "SET " + ", ".join(assignments),
+        field_values,
+        names,
+    )
+
+
+def add_message_alternate(
+    conversation_id: str,
+    seq: int,
+    alternate: Dict[str, Any],
+    user_id: str | None = None,
+) -> None:
+    """
+    Append an alternate result (e.g. a re-run stage2 and/or stage3) to a message's alternates.
+
+    The alternate is stamped with created_at and appended with a single
+    list_append, so concurrent re-syntheses of the same message all keep
+    their results. Stage payloads are compressed like the message's own.
+
+    Raises:
+        ValueError: If the conversation or message does not exist, or the
+            conversation is not owned by user_id
+    """
+    _update_message_and_header(
+        conversation_id,
+        seq,
+        user_id,
+        "SET updated_at = :now",
+        {":now": now_iso()},
+        "SET alternates = list_append(if_not_exists(alternates, :empty), :alternate)",
+        {":empty": [], ":alternate": [_pack_stages({**alternate, "created_at": now_iso()})]},
+    )
+
+
+def update_conversation_title(conversation_id: str, title: str, user_id: str | None = None) -> None:
+    """Update a conversation title."""
+    _update_conversation(
+        conversation_id,
+        user_id,
+        "SET title = :title, updated_at = :now ADD version :one",
+        {":title": title, ":now": now_iso(), ":one": 1},
+    )
+
+
+def delete_conversation(conversation_id: str, user_id: str) -> bool:
+    """Delete a conversation and its messages by id if owned by user_id. Returns True if deleted."""
+    try:
+        _table.delete_item(
+            Key={"id": conversation_id},
+            ConditionExpression="user_id = :uid",
+            ExpressionAttributeValues={":uid": user_id},
+        )
+    except ClientError as error:  # noqa: BLE001
+        if error.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            return False
+        _handle_client_error(error)
+
+    query_kwargs: Dict[str, Any] = {
+        "KeyConditionExpression": "conversation_id = :cid",
+        "ExpressionAttributeValues": {":cid": conversation_id},
+        "ProjectionExpression": "conversation_id, seq",
+    }
+    try:
+        with _messages_table.batch_writer() as batch:
+            while True:
+                response = _messages_table.query(**query_kwargs)
+                for key in response.get("Items", []):
+                    batch.delete_item(Key=key)
+                last_key = response.get("LastEvaluatedKey")
+                if not last_key:
+                    break
+                query_kwargs["ExclusiveStartKey"] = last_key
+    except ClientError as error:  # noqa: BLE001
+        _handle_client_error(error)
+    return True
+
+
+def get_user_debate_panel(user_id: str) -> List[str]:
+    """Get user's debate panel models."""
+    try:
+        response = _table.get_item(Key={"id": f"user_panel_{user_id}"})
+    except ClientError as error:  # noqa: BLE001
+        _handle_client_error(error)
+    item = response.get("Item")
+    if item:
+        return item.get("panel_models", list(DEFAULT_DEBATE_PANEL))
+    return list(DEFAULT_DEBATE_PANEL)
+
+
+def save_user_debate_panel(user_id: str, panel_models: List[str]) -> None:
+    """Save user's debate panel models."""
+    item = {
+        "id": f"user_panel_{user_id}",
+        "panel_models": panel_models,
+        "updated_at": now_iso(),
+    }
+    try:
+        _table.put_item(Item=item)
+    except ClientError as error:  # noqa: BLE001
+        _handle_client_error(error)
+
+def get_user_council_models(user_id: str) -> List[str]:
+    """Get the list of selected council models for this user."""
+    try:
+        response = _table.get_item(Key={"id": f"user_council_{user_id}"})
+        return response.get("Item", {}).get("models", [])
+    except ClientError as error:  # noqa: BLE001
+        _handle_client_error(error)
+    return []
+
+
+def save_user_council_models(user_id: str, models: List[str]) -> None:
+    """Save the list of selected council models for this user."""
+    try:
+        _table.put_item(
+            Item={
+                "id": f"user_council_{user_id}",
+                "models": models,
+                "updated_at": now_iso(),
+            }
+        )
+    except ClientError as error:  # noqa: BLE001
+        _handle_client_error(error)
+
+
+def get_user_settings(user_id: str) -> Dict[str, List[str]]:
+    """
+    Get a user's council models and debate panel with a single BatchGetItem.
+
+    Returns:
+        {"models": council models, "panel_models": debate panel}, with the
+        same defaults as get_user_council_models and get_user_debate_panel
+    """
+    keys = [{"id": f"user_council_{user_id}"}, {"id": f"user_panel_{user_id}"}]
+    found = _batch_get({CONVERSATIONS_TABLE: {"Keys": keys, "ProjectionExpression": "id, models, panel_models"}})
+    items = {item["id"]: item for item in found.get(CONVERSATIONS_TABLE, [])}
+    return {
+        "models": items.get(f"user_council_{user_id}", {}).get("models", []),
+        "panel_models": items.get(f"user_panel_{user_id}", {}).get("panel_models", list(DEFAULT_DEBATE_PANEL)),
+    }
+
+
+def get_latency_stats() -> Dict[str, Any]:
+    """Get the persisted model latency histograms (empty if none saved yet)."""
+    try:
+        response = _table.get_item(Key={"id": "latency_stats"})
+    except ClientError as error:  # noqa: BLE001
+        _handle_client_error(error)
+    item = response.get("Item")
+    if item and item.get("stats"):
+        return json.loads(item["stats"])
+    return {}
+
+
+def save_latency_stats(stats: Dict[str, Any]) -> None:
+    """Persist model latency histograms (stored as JSON; DynamoDB rejects floats)."""
+    try:
+        _table.put_item(
+            Item={
+                "id": "latency_stats",
+                "stats": json.dumps(stats),
+                "updated_at": now_iso(),
+            }
+        )
+    except ClientError as error:  # noqa: BLE001
+        _handle_client_error(error)
+
+
+def get_cached_response(key: str) -> Optional[Dict[str, Any]]:
+    """Get a cached model response, or None if missing or expired."""
+    try:
+        response = _table.get_item(Key={"id": f"cache_{key}"})
+    except ClientError as error:  # noqa: BLE001
+        _handle_client_error(error)
+    item = response.get("Item")
+    # DynamoDB TTL deletes lazily, so expired items can still be read
+    if not item or int(item.get("expires_at", 0)) <= time.time():
+        return None
+    return json.loads(item["response"])
+
+
+def put_cached_response(key: str, response: Dict[str, Any], ttl: float) -> None:
+    """Cache a model response for ttl seconds (expires_at is the table's TTL attribute)."""
+    try:
+        _table.put_item(
+            Item={
+                "id": f"cache_{key}",
+                "response": json.dumps(response),
+                "expires_at": int(time.time() + ttl),
+            }
+        )
+    except ClientError as error:  # noqa: BLE001
+        _handle_client_error(error)
+
+
+def save_debate_session(
+    conversation_id: str,
+    user_id: str,
+    title: str,
+    turns: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Save a debate session."""
+    conversation = {
+        "id": conversation_id,
+        "user_id": user_id,
+        "created_at": now_iso(),
+        "title": title,
+        "type": "debate",
+        "messages": turns,  # Reuse messages field for turns
+    }
+    summarize(conversation)
+    try:
+        _table.put_item(Item=header(conversation))
+        _put_messages(conversation_id, turns)
+    except ClientError as error:  # noqa: BLE001
+        _handle_client_error(error)
+    return conversation
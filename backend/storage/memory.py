@@ -0,0 +1,385 @@
+"""
+In-process storage backend.
+
+Everything lives in module-level dicts behind one lock, so it needs no
+database, credentials or network and adds no I/O latency: use it for local
+runs and throughput benchmarks of the handlers. Data is lost when the process
+exits. Records are copied on the way in and out, so callers can no more
+mutate stored state than they could with a real database.
+"""
+
+from __future__ import annotations
+
+import copy
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .common import (
+    DEFAULT_DEBATE_PANEL,
+    decode_cursor,
+    encode_cursor,
+    header,
+    listing_entry,
+    now_iso,
+    partial_assistant_message,
+    preview,
+    project_message,
+    summarize,
+)
+
+# Stored state (persists across Lambda invocations in warm containers)
+_LOCK = threading.Lock()
+_CONVERSATIONS: Dict[str, Dict[str, Any]] = {}
+_MESSAGES: Dict[str, Dict[int, Dict[str, Any]]] = {}
+_ITEMS: Dict[str, Dict[str, Any]] = {}
+
+
+def clear() -> None:
+    """Drop everything stored."""
+    with _LOCK:
+        _CONVERSATIONS.clear()
+        _MESSAGES.clear()
+        _ITEMS.clear()
+
+
+def _page_messages(
+    conversation_id: str,
+    limit: int | None = None,
+    before: int | None = None,
+    fields: Sequence[str] | None = None,
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """The latest limit messages with seq < before (oldest first), and whether older ones exist."""
+    stored = _MESSAGES.get(conversation_id, {})
+    seqs = sorted(seq for seq in stored if before is None or seq < before)
+    has_more = limit is not None and len(seqs) > limit
+    if has_more:
+        seqs = seqs[-limit:]
+    # Projected before copying, so left-out stages are never copied
+    return [{**copy.deepcopy(project_message(stored[seq], fields)), "seq": seq} for seq in seqs], has_more
+
+
+def _with_messages(
+    conversation_id: str,
+    limit: int | None = None,
+    before: int | None = None,
+    fields: Sequence[str] | None = None,
+) -> Dict[str, Any]:
+    conversation = copy.deepcopy(_CONVERSATIONS[conversation_id])
+    messages, has_more = _page_messages(conversation_id, limit, before, fields)
+    conversation["messages"] = messages
+    conversation["next_before"] = messages[0]["seq"] if has_more and messages else None
+    return conversation
+
+
+def _put_conversation(conversation: Dict[str, Any]) -> None:
+    """Store the header and messages (numbered from 1) of conversation."""
+    _CONVERSATIONS[conversation["id"]] = copy.deepcopy(header(conversation))
+    stored = _MESSAGES.setdefault(conversation["id"], {})
+    for seq, message in enumerate(conversation.get("messages", []), start=1):
+        stored[seq] = copy.deepcopy({key: value for key, value in message.items() if key != "seq"})
+
+
+def create_conversation(conversation_id: str, user_id: str) -> Dict[str, Any]:
+    """Create a new conversation record owned by user_id."""
+    conversation = {
+        "id": conversation_id,
+        "user_id": user_id,
+        "created_at": now_iso(),
+        "title": "New Conversation",
+        "type": "council",
+        "messages": [],
+    }
+    summarize(conversation)
+    with _LOCK:
+        _put_conversation(conversation)
+    return conversation
+
+
+def get_conversation(conversation_id: str) -> Optional[Dict[str, Any]]:
+    """Fetch a conversation by id, with all of its messages."""
+    with _LOCK:
+        if conversation_id not in _CONVERSATIONS:
+            return None
+        return _with_messages(conversation_id)
+
+
+def get_conversation_header(conversation_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+    """A conversation's header without messages, only if owned by user_id (see storage.dynamodb)."""
+    with _LOCK:
+        conversation = _CONVERSATIONS.get(conversation_id)
+        if conversation is None or conversation.get("user_id") != user_id:
+            return None
+        return copy.deepcopy(conversation)
+
+
+def get_conversation_for_user(
+    conversation_id: str,
+    user_id: str,
+    limit: int | None = None,
+    before: int | None = None,
+    fields: Sequence[str] | None = None,
+) -> Optional[Dict[str, Any]]:
+    """Fetch a conversation by id, only if owned by user_id (see storage.dynamodb)."""
+    with _LOCK:
+        conversation = _CONVERSATIONS.get(conversation_id)
+        if conversation is None or conversation.get("user_id") != user_id:
+            return None
+        return _with_messages(conversation_id, limit, before, fields)
+
+
+def get_message(
+    conversation_id: str,
+    seq: int,
+    user_id: str,
+    fields: Sequence[str] | None = None,
+) -> Optional[Dict[str, Any]]:
+    """One message of a conversation owned by user_id (see storage.dynamodb)."""
+    with _LOCK:
+        conversation = _CONVERSATIONS.get(conversation_id)
+        message = _MESSAGES.get(conversation_id, {}).get(seq)
+        if conversation is None or conversation.get("user_id") != user_id or message is None:
+            return None
+        return {**copy.deepcopy(project_message(message, fields)), "seq": seq}
+
+
+def save_conversation(conversation: Dict[str, Any]) -> None:
+    """Persist a conversation (header and messages), refreshing its summary attributes."""
+    summarize(conversation)
+    with _LOCK:
+        _put_conversation(conversation)
+
+
+def list_conversations_page(
+    user_id: str,
+    limit: int | None = None,
+    cursor: str | None = None,
+    conversation_type: str | None = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Return one page of a user's conversation metadata, newest first (see storage.dynamodb)."""
+    last_key = decode_cursor(cursor, user_id) if cursor else None
+    with _LOCK:
+        items = [
+            item
+            for item in _CONVERSATIONS.values()
+            if item.get("user_id") == user_id
+            and (not conversation_type or item.get("type", "council") == conversation_type)
+        ]
+    items.sort(key=lambda item: (item["created_at"], item["id"]), reverse=True)
+    if last_key is not None:
+        start = (last_key["created_at"], last_key["id"])
+        items = [item for item in items if (item["created_at"], item["id"]) < start]
+
+    next_cursor = None
+    if limit is not None and len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor({"id": last["id"], "user_id": user_id, "created_at": last["created_at"]})
+    return [listing_entry(item) for item in items], next_cursor
+
+
+def list_conversations(user_id: str, conversation_type: str | None = None) -> List[Dict[str, Any]]:
+    """Return conversation metadata for a specific user, sorted newest first."""
+    conversations, _ = list_conversations_page(user_id, conversation_type=conversation_type)
+    return conversations
+
+
+def _owned(conversation_id: str, user_id: str | None) -> Dict[str, Any]:
+    """The stored header of conversation_id; caller must hold _LOCK."""
+    conversation = _CONVERSATIONS.get(conversation_id)
+    if conversation is None or (user_id is not None and conversation.get("user_id") != user_id):
+        raise ValueError(f"Conversation {conversation_id} not found")
+    return conversation
+
+
+def _touch(conversation: Dict[str, Any], **changes: Any) -> None:
+    """Apply changes to a stored header, refreshing updated_at and bumping the version."""
+    conversation.update(changes, updated_at=now_iso(), version=conversation.get("version", 0) + 1)
+
+
+def _append_message(conversation_id: str, message: Dict[str, Any], user_id: str | None) -> int:
+    """Append message as the conversation's next message; returns its seq (the new message count)."""
+    with _LOCK:
+        conversation = _owned(conversation_id, user_id)
+        seq = int(conversation.get("message_count", 0)) + 1
+        _touch(conversation, message_count=seq, preview=preview(message))
+        _MESSAGES.setdefault(conversation_id, {})[seq] = copy.deepcopy(message)
+    return seq
+
+
+def add_user_message(conversation_id: str, content: str, user_id: str | None = None) -> int:
+    """
+    Append a user message to a conversation.
+
+    Returns:
+        The conversation's message count after the append (1 for a first message)
+
+    Raises:
+        ValueError: If the conversation does not exist or is not owned by user_id
+    """
+    return _append_message(conversation_id, {"role": "user", "content": content}, user_id)
+
+
+def add_assistant_message(
+    conversation_id: str,
+    stage1: List[Dict[str, Any]],
+    stage2: List[Dict[str, Any]],
+    stage3: Dict[str, Any],
+    user_id: str | None = None,
+) -> None:
+    """Append an assistant message with all three stages."""
+    _append_message(
+        conversation_id,
+        {
+            "role": "assistant",
+            "stage1": stage1,
+            "stage2": stage2,
+            "stage3": stage3,
+        },
+        user_id,
+    )
+
+
+def start_assistant_message(
+    conversation_id: str,
+    stage1: List[Dict[str, Any]],
+    council_models: List[str] | None = None,
+    chairman_model: str | None = None,
+    user_id: str | None = None,
+) -> int:
+    """Append an assistant message holding only stage 1 results (see storage.dynamodb)."""
+    message = partial_assistant_message(stage1, council_models, chairman_model)
+    return _append_message(conversation_id, message, user_id)
+
+
+def update_assistant_message(
+    conversation_id: str,
+    seq: int,
+    fields: Dict[str, Any],
+    user_id: str | None = None,
+) -> None:
+    """Set fields (stage1/stage2/stage3, status, ...) on an existing message (see storage.dynamodb)."""
+    with _LOCK:
+        conversation = _owned(conversation_id, user_id)
+        message = _MESSAGES.get(conversation_id, {}).get(seq)
+        if message is None:
+            raise ValueError(f"Message {seq} of conversation {conversation_id} not found")
+        message.update(copy.deepcopy(fields))
+        _touch(conversation, **({"preview": preview(fields)} if "stage3" in fields else {}))
+
+
+def add_message_alternate(
+    conversation_id: str,
+    seq: int,
+    alternate: Dict[str, Any],
+    user_id: str | None = None,
+) -> None:
+    """Append an alternate result to a message's alternates (see storage.dynamodb)."""
+    with _LOCK:
+        conversation = _owned(conversation_id, user_id)
+        message = _MESSAGES.get(conversation_id, {}).get(seq)
+        if message is None:
+            raise ValueError(f"Message {seq} of conversation {conversation_id} not found")
+        message.setdefault("alternates", []).append(copy.deepcopy({**alternate, "created_at": now_iso()}))
+        _touch(conversation)
+
+
+def update_conversation_title(conversation_id: str, title: str, user_id: str | None = None) -> None:
+    """Update a conversation title."""
+    with _LOCK:
+        _touch(_owned(conversation_id, user_id), title=title)
+
+
+def delete_conversation(conversation_id: str, user_id: str) -> bool:
+    """Delete a conversation and its messages by id if owned by user_id. Returns True if deleted."""
+    with _LOCK:
+        try:
+            _owned(conversation_id, user_id)
+        except ValueError:
+            return False
+        del _CONVERSATIONS[conversation_id]
+        _MESSAGES.pop(conversation_id, None)
+    return True
+
+
+def _get_item(key: str) -> Optional[Dict[str, Any]]:
+    with _LOCK:
+        item = _ITEMS.get(key)
+        return copy.deepcopy(item) if item is not None else None
+
+
+def _put_item(key: str, item: Dict[str, Any]) -> None:
+    with _LOCK:
+        _ITEMS[key] = copy.deepcopy(item)
+
+
+def get_user_debate_panel(user_id: str) -> List[str]:
+    """Get user's debate panel models."""
+    item = _get_item(f"user_panel_{user_id}")
+    return item["panel_models"] if item else list(DEFAULT_DEBATE_PANEL)
+
+
+def save_user_debate_panel(user_id: str, panel_models: List[str]) -> None:
+    """Save user's debate panel models."""
+    _put_item(f"user_panel_{user_id}", {"panel_models": panel_models, "updated_at": now_iso()})
+
+
+def get_user_council_models(user_id: str) -> List[str]:
+    """Get the list of selected council models for this user."""
+    item = _get_item(f"user_council_{user_id}")
+    return item["models"] if item else []
+
+
+def save_user_council_models(user_id: str, models: List[str]) -> None:
+    """Save the list of selected council models for this user."""
+    _put_item(f"user_council_{user_id}", {"models": models, "updated_at": now_iso()})
+
+
+def get_user_settings(user_id: str) -> Dict[str, List[str]]:
+    """Get a user's council models and debate panel together (see storage.dynamodb)."""
+    return {"models": get_user_council_models(user_id), "panel_models": get_user_debate_panel(user_id)}
+
+
+def get_latency_stats() -> Dict[str, Any]:
+    """Get the persisted model latency histograms (empty if none saved yet)."""
+    item = _get_item("latency_stats")
+    return item["stats"] if item else {}
+
+
+def save_latency_stats(stats: Dict[str, Any]) -> None:
+    """Persist model latency histograms."""
+    _put_item("latency_stats", {"stats": stats, "updated_at": now_iso()})
+
+
+def get_cached_response(key: str) -> Optional[Dict[str, Any]]:
+    """Get a cached model response, or None if missing or expired."""
+    item = _get_item(f"cache_{key}")
+    if not item or item["expires_at"] <= time.time():
+        return None
+    return item["response"]
+
+
+def put_cached_response(key: str, response: Dict[str, Any], ttl: float) -> None:
+    """Cache a model response for ttl seconds."""
+    _put_item(f"cache_{key}", {"response": response, "expires_at": time.time() + ttl})
+
+
+def save_debate_session(
+    conversation_id: str,
+    user_id: str,
+    title: str,
+    turns: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Save a debate session."""
+    conversation = {
+        "id": conversation_id,
+        "user_id": user_id,
+        "created_at": now_iso(),
+        "title": title,
+        "type": "debate",
+        "messages": turns,  # Reuse messages field for turns
+    }
+    summarize(conversation)
+    with _LOCK:
+        _put_conversation(conversation)
+    return conversation
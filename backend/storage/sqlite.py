@@ -0,0 +1,540 @@
+"""
+SQLite storage backend for single-node, self-hosted deployments.
+
+Mirrors the DynamoDB layout: a conversations table of headers, indexed on
+(user_id, created_at) for listings, a messages table keyed by
+(conversation_id, seq), and an items table for settings, latency stats and
+cached responses. The database runs in WAL mode so readers never wait for
+the writer, and each thread (see backend.storage_async) keeps its own
+connection. Message bodies are stored as JSON, compressed like DynamoDB's
+stage payloads once they are large enough (see compression.pack).
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .. import compression, serialization
+from ..config import SQLITE_PATH
+from .common import (
+    DEFAULT_DEBATE_PANEL,
+    decode_cursor,
+    encode_cursor,
+    header,
+    listing_entry,
+    now_iso,
+    partial_assistant_message,
+    preview,
+    project_message,
+    summarize,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    title TEXT NOT NULL,
+    type TEXT NOT NULL DEFAULT 'council',
+    message_count INTEGER NOT NULL DEFAULT 0,
+    preview TEXT NOT NULL DEFAULT '',
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS conversations_user_created
+    ON conversations (user_id, created_at DESC, id DESC);
+CREATE TABLE IF NOT EXISTS messages (
+    conversation_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    body BLOB NOT NULL,
+    PRIMARY KEY (conversation_id, seq)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS items (
+    id TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS items_expires
+    ON items (expires_at) WHERE expires_at IS NOT NULL;
+"""
+
+HEADER_COLUMNS = ("id", "user_id", "created_at", "updated_at", "title", "type", "message_count", "preview", "version")
+
+# Per-thread connections (persist across Lambda invocations in warm containers)
+_LOCAL = threading.local()
+_SCHEMA_LOCK = threading.Lock()
+_SCHEMA_READY = False
+
+
+def _connect() -> sqlite3.Connection:
+    global _SCHEMA_READY
+    connection = getattr(_LOCAL, "connection", None)
+    if connection is None:
+        connection = sqlite3.connect(SQLITE_PATH, timeout=30.0)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        # Durable at checkpoints rather than on every commit; safe against corruption in WAL mode
+        connection.execute("PRAGMA synchronous=NORMAL")
+        with _SCHEMA_LOCK:
+            if not _SCHEMA_READY:
+                connection.executescript(SCHEMA)
+                columns = {row["name"] for row in connection.execute("PRAGMA table_info(conversations)")}
+                if "version" not in columns:
+                    # Databases created before conversations had versions
+                    connection.execute("ALTER TABLE conversations ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+                _SCHEMA_READY = True
+        _LOCAL.connection = connection
+    return connection
+
+
+@contextmanager
+def _transaction() -> Iterator[sqlite3.Connection]:
+    """One transaction on this thread's connection, committed on success and rolled back on error."""
+    connection = _connect()
+    try:
+        with connection:
+            yield connection
+    except sqlite3.Error as error:
+        raise RuntimeError(f"SQLite error: {error}") from error
+
+
+def _encode_message(message: Dict[str, Any]) -> Any:
+    body = compression.pack({key: value for key, value in message.items() if key != "seq"})
+    return body if isinstance(body, bytes) else serialization.dumps_utf8(body)
+
+
+def _decode_message(seq: int, body: Any) -> Dict[str, Any]:
+    message = compression.unpack(body) if isinstance(body, bytes) else serialization.loads(body)
+    message["seq"] = seq
+    return message
+
+
+def _put_conversation(connection: sqlite3.Connection, conversation: Dict[str, Any]) -> None:
+    """Upsert the header and messages (numbered from 1) of conversation."""
+    row = header(conversation)
+    connection.execute(
+        f"INSERT OR REPLACE INTO conversations ({', '.join(HEADER_COLUMNS)}) "
+        f"VALUES ({', '.join('?' for _ in HEADER_COLUMNS)})",
+        [row.get(column) for column in HEADER_COLUMNS],
+    )
+    connection.executemany(
+        "INSERT OR REPLACE INTO messages (conversation_id, seq, body) VALUES (?, ?, ?)",
+        [
+            (conversation["id"], seq, _encode_message(message))
+            for seq, message in enumerate(conversation.get("messages", []), start=1)
+        ],
+    )
+
+
+def _load_messages(
+    connection: sqlite3.Connection,
+    conversation: Dict[str, Any],
+    limit: int | None = None,
+    before: int | None = None,
+    fields: Sequence[str] | None = None,
+) -> Dict[str, Any]:
+    """
+    Attach messages (oldest first) and next_before to a conversation header.
+
+    A message body is one document, so fields trims messages after decoding:
+    it saves the response, not the read.
+    """
+    sql = "SELECT seq, body FROM messages WHERE conversation_id = ?"
+    params: List[Any] = [conversation["id"]]
+    if before is not None:
+        sql += " AND seq < ?"
+        params.append(before)
+    sql += " ORDER BY seq DESC"
+    if limit is not None:
+        # One extra row tells whether older messages exist
+        sql += " LIMIT ?"
+        params.append(limit + 1)
+    rows = connection.execute(sql, params).fetchall()
+
+    has_more = limit is not None and len(rows) > limit
+    rows = rows[:limit] if has_more else rows
+    messages = [project_message(_decode_message(row["seq"], row["body"]), fields) for row in reversed(rows)]
+    conversation["messages"] = messages
+    conversation["next_before"] = messages[0]["seq"] if has_more and messages else None
+    return conversation
+
+
+def _get_header(connection: sqlite3.Connection, conversation_id: str) -> Optional[Dict[str, Any]]:
+    row = connection.execute("SELECT * FROM conversations WHERE id = ?", (conversation_id,)).fetchone()
+    return dict(row) if row is not None else None
+
+
+def create_conversation(conversation_id: str, user_id: str) -> Dict[str, Any]:
+    """Create a new conversation record owned by user_id."""
+    conversation = {
+        "id": conversation_id,
+        "user_id": user_id,
+        "created_at": now_iso(),
+        "title": "New Conversation",
+        "type": "council",
+        "messages": [],
+    }
+    summarize(conversation)
+    with _transaction() as connection:
+        _put_conversation(connection, conversation)
+    return conversation
+
+
+def get_conversation(conversation_id: str) -> Optional[Dict[str, Any]]:
+    """Fetch a conversation by id, with all of its messages."""
+    with _transaction() as connection:
+        conversation = _get_header(connection, conversation_id)
+        if conversation is None:
+            return None
+        return _load_messages(connection, conversation)
+
+
+def get_conversation_header(conversation_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+    """A conversation's header without messages, only if owned by user_id (see storage.dynamodb)."""
+    with _transaction() as connection:
+        conversation = _get_header(connection, conversation_id)
+    if conversation is None or conversation.get("user_id") != user_id:
+        return None
+    return conversation
+
+
+def get_conversation_for_user(
+    conversation_id: str,
+    user_id: str,
+    limit: int | None = None,
+    before: int | None = None,
+    fields: Sequence[str] | None = None,
+) -> Optional[Dict[str, Any]]:
+    """Fetch a conversation by id, only if owned by user_id (see storage.dynamodb)."""
+    with _transaction() as connection:
+        conversation = _get_header(connection, conversation_id)
+        if conversation is None or conversation["user_id"] != user_id:
+            return None
+        return _load_messages(connection, conversation, limit, before, fields)
+
+
+def get_message(
+    conversation_id: str,
+    seq: int,
+    user_id: str,
+    fields: Sequence[str] | None = None,
+) -> Optional[Dict[str, Any]]:
+    """One message of a conversation owned by user_id (see storage.dynamodb)."""
+    with _transaction() as connection:
+        row = connection.execute(
+            "SELECT messages.body FROM messages JOIN conversations ON conversations.id = messages.conversation_id "
+            "WHERE messages.conversation_id = ? AND messages.seq = ? AND conversations.user_id = ?",
+            (conversation_id, seq, user_id),
+        ).fetchone()
+    if row is None:
+        return None
+    return project_message(_decode_message(seq, row["body"]), fields)
+
+
+def save_conversation(conversation: Dict[str, Any]) -> None:
+    """Persist a conversation (header and messages), refreshing its summary attributes."""
+    summarize(conversation)
+    with _transaction() as connection:
+        _put_conversation(connection, conversation)
+
+
+def list_conversations_page(
+    user_id: str,
+    limit: int | None = None,
+    cursor: str | None = None,
+    conversation_type: str | None = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Return one page of a user's conversation metadata, newest first (see storage.dynamodb)."""
+    sql = "SELECT id, created_at, updated_at, title, type, message_count, preview FROM conversations WHERE user_id = ?"
+    params: List[Any] = [user_id]
+    if conversation_type:
+        sql += " AND type = ?"
+        params.append(conversation_type)
+    if cursor:
+        last_key = decode_cursor(cursor, user_id)
+        sql += " AND (created_at, id) < (?, ?)"
+        params += [last_key["created_at"], last_key["id"]]
+    sql += " ORDER BY created_at DESC, id DESC"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit + 1)
+    with _transaction() as connection:
+        rows = [dict(row) for row in connection.execute(sql, params)]
+
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor({"id": last["id"], "user_id": user_id, "created_at": last["created_at"]})
+    return [listing_entry(row) for row in rows], next_cursor
+
+
+def list_conversations(user_id: str, conversation_type: str | None = None) -> List[Dict[str, Any]]:
+    """Return conversation metadata for a specific user, sorted newest first."""
+    conversations, _ = list_conversations_page(user_id, conversation_type=conversation_type)
+    return conversations
+
+
+def _update_conversation(
+    connection: sqlite3.Connection,
+    conversation_id: str,
+    user_id: str | None,
+    assignments: str,
+    values: List[Any],
+) -> None:
+    """
+    Apply one UPDATE to an existing conversation (owned by user_id, if given), bumping its version.
+
+    Raises:
+        ValueError: If the conversation does not exist or is not owned by user_id
+    """
+    sql = f"UPDATE conversations SET {assignments}, version = version + 1 WHERE id = ?"
+    params = [*values, conversation_id]
+    if user_id is not None:
+        sql += " AND user_id = ?"
+        params.append(user_id)
+    if connection.execute(sql, params).rowcount == 0:
+        raise ValueError(f"Conversation {conversation_id} not found")
+
+
+def _append_message(conversation_id: str, message: Dict[str, Any], user_id: str | None) -> int:
+    """
+    Append message as the conversation's next message; returns its seq (the new message count).
+
+    The count is bumped and read back in the same write transaction as the
+    insert, so concurrent appends (from any process) never collide.
+    """
+    with _transaction() as connection:
+        _update_conversation(
+            connection,
+            conversation_id,
+            user_id,
+            "message_count = message_count + 1, updated_at = ?, preview = ?",
+            [now_iso(), preview(message)],
+        )
+        seq = connection.execute(
+            "SELECT message_count FROM conversations WHERE id = ?", (conversation_id,)
+        ).fetchone()[0]
+        connection.execute(
+            "INSERT INTO messages (conversation_id, seq, body) VALUES (?, ?, ?)",
+            (conversation_id, seq, _encode_message(message)),
+        )
+    return seq
+
+
+def add_user_message(conversation_id: str, content: str, user_id: str | None = None) -> int:
+    """
+    Append a user message to a conversation.
+
+    Returns:
+        The conversation's message count after the append (1 for a first message)
+
+    Raises:
+        ValueError: If the conversation does not exist or is not owned by user_id
+    """
+    return _append_message(conversation_id, {"role": "user", "content": content}, user_id)
+
+
+def add_assistant_message(
+    conversation_id: str,
+    stage1: List[Dict[str, Any]],
+    stage2: List[Dict[str, Any]],
+    stage3: Dict[str, Any],
+    user_id: str | None = None,
+) -> None:
+    """Append an assistant message with all three stages."""
+    _append_message(
+        conversation_id,
+        {
+            "role": "assistant",
+            "stage1": stage1,
+            "stage2": stage2,
+            "stage3": stage3,
+        },
+        user_id,
+    )
+
+
+def start_assistant_message(
+    conversation_id: str,
+    stage1: List[Dict[str, Any]],
+    council_models: List[str] | None = None,
+    chairman_model: str | None = None,
+    user_id: str | None = None,
+) -> int:
+    """Append an assistant message holding only stage 1 results (see storage.dynamodb)."""
+    message = partial_assistant_message(stage1, council_models, chairman_model)
+    return _append_message(conversation_id, message, user_id)
+
+
+def _update_message(
+    conversation_id: str,
+    seq: int,
+    user_id: str | None,
+    change: Callable[[Dict[str, Any]], Dict[str, Any]],
+    preview_text: str | None = None,
+) -> None:
+    """Read, change and rewrite one message in a single transaction (see _update_conversation for errors)."""
+    assignments = "updated_at = ?"
+    values: List[Any] = [now_iso()]
+    if preview_text is not None:
+        assignments += ", preview = ?"
+        values.append(preview_text)
+    with _transaction() as connection:
+        _update_conversation(connection, conversation_id, user_id, assignments, values)
+        row = connection.execute(
+            "SELECT body FROM messages WHERE conversation_id = ? AND seq = ?", (conversation_id, seq)
+        ).fetchone()
+        if row is None:
+            raise ValueError(f"Message {seq} of conversation {conversation_id} not found")
+        message = change(_decode_message(seq, row["body"]))
+        connection.execute(
+            "UPDATE messages SET body = ? WHERE conversation_id = ? AND seq = ?",
+            (_encode_message(message), conversation_id, seq),
+        )
+
+
+def update_assistant_message(
+    conversation_id: str,
+    seq: int,
+    fields: Dict[str, Any],
+    user_id: str | None = None,
+) -> None:
+    """Set fields (stage1/stage2/stage3, status, ...) on an existing message (see storage.dynamodb)."""
+    preview_text = preview(fields) if "stage3" in fields else None
+    _update_message(conversation_id, seq, user_id, lambda message: {**message, **fields}, preview_text)
+
+
+def add_message_alternate(
+    conversation_id: str,
+    seq: int,
+    alternate: Dict[str, Any],
+    user_id: str | None = None,
+) -> None:
+    """Append an alternate result to a message's alternates (see storage.dynamodb)."""
+    alternate = {**alternate, "created_at": now_iso()}
+    _update_message(
+        conversation_id,
+        seq,
+        user_id,
+        lambda message: {**message, "alternates": [*message.get("alternates", []), alternate]},
+    )
+
+
+def update_conversation_title(conversation_id: str, title: str, user_id: str | None = None) -> None:
+    """Update a conversation title."""
+    with _transaction() as connection:
+        _update_conversation(connection, conversation_id, user_id, "title = ?, updated_at = ?", [title, now_iso()])
+
+
+def delete_conversation(conversation_id: str, user_id: str) -> bool:
+    """Delete a conversation and its messages by id if owned by user_id. Returns True if deleted."""
+    with _transaction() as connection:
+        deleted = connection.execute(
+            "DELETE FROM conversations WHERE id = ? AND user_id = ?", (conversation_id, user_id)
+        ).rowcount
+        if not deleted:
+            return False
+        connection.execute("DELETE FROM messages WHERE conversation_id = ?", (conversation_id,))
+    return True
+
+
+def _get_item(key: str) -> Any:
+    """The value stored under key, or None if missing or expired."""
+    with _transaction() as connection:
+        row = connection.execute("SELECT value, expires_at FROM items WHERE id = ?", (key,)).fetchone()
+    if row is None or (row["expires_at"] is not None and row["expires_at"] <= time.time()):
+        return None
+    return json.loads(row["value"])
+
+
+def _put_item(key: str, value: Any, expires_at: float | None = None) -> None:
+    with _transaction() as connection:
+        if expires_at is not None:
+            # Nothing else removes expired rows, so writers of expiring items sweep them
+            connection.execute("DELETE FROM items WHERE expires_at <= ?", (time.time(),))
+        connection.execute(
+            "INSERT OR REPLACE INTO items (id, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value), expires_at),
+        )
+
+
+def get_user_debate_panel(user_id: str) -> List[str]:
+    """Get user's debate panel models."""
+    panel_models = _get_item(f"user_panel_{user_id}")
+    return panel_models if panel_models is not None else list(DEFAULT_DEBATE_PANEL)
+
+
+def save_user_debate_panel(user_id: str, panel_models: List[str]) -> None:
+    """Save user's debate panel models."""
+    _put_item(f"user_panel_{user_id}", panel_models)
+
+
+def get_user_council_models(user_id: str) -> List[str]:
+    """Get the list of selected council models for this user."""
+    return _get_item(f"user_council_{user_id}") or []
+
+
+def save_user_council_models(user_id: str, models: List[str]) -> None:
+    """Save the list of selected council models for this user."""
+    _put_item(f"user_council_{user_id}", models)
+
+
+def get_user_settings(user_id: str) -> Dict[str, List[str]]:
+    """Get a user's council models and debate panel with one query (see storage.dynamodb)."""
+    council_key, panel_key = f"user_council_{user_id}", f"user_panel_{user_id}"
+    with _transaction() as connection:
+        rows = connection.execute(
+            "SELECT id, value FROM items WHERE id IN (?, ?)", (council_key, panel_key)
+        ).fetchall()
+    values = {row["id"]: json.loads(row["value"]) for row in rows}
+    return {
+        "models": values.get(council_key) or [],
+        "panel_models": values[panel_key] if panel_key in values else list(DEFAULT_DEBATE_PANEL),
+    }
+
+
+def get_latency_stats() -> Dict[str, Any]:
+    """Get the persisted model latency histograms (empty if none saved yet)."""
+    return _get_item("latency_stats") or {}
+
+
+def save_latency_stats(stats: Dict[str, Any]) -> None:
+    """Persist model latency histograms."""
+    _put_item("latency_stats", stats)
+
+
+def get_cached_response(key: str) -> Optional[Dict[str, Any]]:
+    """Get a cached model response, or None if missing or expired."""
+    return _get_item(f"cache_{key}")
+
+
+def put_cached_response(key: str, response: Dict[str, Any], ttl: float) -> None:
+    """Cache a model response for ttl seconds."""
+    _put_item(f"cache_{key}", response, time.time() + ttl)
+
+
+def save_debate_session(
+    conversation_id: str,
+    user_id: str,
+    title: str,
+    turns: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Save a debate session."""
+    conversation = {
+        "id": conversation_id,
+        "user_id": user_id,
+        "created_at": now_iso(),
+        "title": title,
+        "type": "debate",
+        "messages": turns,  # Reuse messages field for turns
+    }
+    summarize(conversation)
+    with _transaction() as connection:
+        _put_conversation(connection, conversation)
+    return conversation
@@ -0,0 +1,60 @@
+"""
+Awaitable versions of the storage functions.
+
+boto3 is synchronous, so calling storage directly from a handler blocks the
+event loop for the whole DynamoDB round trip and stalls every model call in
+flight. These wrappers run the same functions on a bounded pool of worker
+threads (STORAGE_MAX_WORKERS), letting handlers overlap persistence with
+model calls. Each function is looked up on backend.storage at call time, so
+anything that replaces a storage function is picked up here too.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable
+
+from . import storage
+from .config import STORAGE_MAX_WORKERS
+
+# Worker pool for storage calls (persists across Lambda invocations in warm containers)
+_EXECUTOR = ThreadPoolExecutor(max_workers=STORAGE_MAX_WORKERS, thread_name_prefix="storage")
+
+
+async def run(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking storage call on the shared worker pool (for stores outside backend.storage)."""
+    return await asyncio.get_running_loop().run_in_executor(_EXECUTOR, functools.partial(func, *args, **kwargs))
+
+
+def _offload(name: str) -> Callable[..., Awaitable[Any]]:
+    @functools.wraps(getattr(storage, name))
+    async def call(*args: Any, **kwargs: Any) -> Any:
+        return await run(getattr(storage, name), *args, **kwargs)
+
+    return call
+
+
+create_conversation = _offload("create_conversation")
+get_conversation = _offload("get_conversation")
+get_conversation_header = _offload("get_conversation_header")
+get_conversation_for_user = _offload("get_conversation_for_user")
+get_message = _offload("get_message")
+save_conversation = _offload("save_conversation")
+list_conversations_page = _offload("list_conversations_page")
+list_conversations = _offload("list_conversations")
+add_user_message = _offload("add_user_message")
+add_assistant_message = _offload("add_assistant_message")
+start_assistant_message = _offload("start_assistant_message")
+update_assistant_message = _offload("update_assistant_message")
+add_message_alternate = _offload("add_message_alternate")
+update_conversation_title = _offload("update_conversation_title")
+delete_conversation = _offload("delete_conversation")
+get_user_debate_panel = _offload("get_user_debate_panel")
+save_user_debate_panel = _offload("save_user_debate_panel")
+get_user_council_models = _offload("get_user_council_models")
+save_user_council_models = _offload("save_user_council_models")
+get_user_settings = _offload("get_user_settings")
+save_latency_stats = _offload("save_latency_stats")
+save_debate_session = _offload("save_debate_session")
@@ -0,0 +1,106 @@
+"""
+Benchmark: fixed vs adaptive per-model timeouts.
+
+The local OpenRouter stand-in answers most requests quickly, but a fraction
+hang (``--hang-rate``) far beyond the fixed timeout (``--ceiling``). After a
+warm-up that fills the model's latency histogram, ``query_model`` is called
+``--calls`` times with adaptive timeouts off and on, and the time spent
+waiting on calls that ended up failing is compared. Finally the learned state
+is round-tripped through export_state/load_state, as a cold container would
+seed it from storage.
+
+Usage:
+    python -m benchmarks.bench_adaptive_timeouts --calls 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import time
+from typing import List, Tuple
+
+from .openrouter_stub import OpenRouterStub
+
+MODEL = "stub/sometimes-hangs"
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--hang-rate", type=float, default=0.05)
+    parser.add_argument("--ceiling", type=float, default=3.0, help="fixed timeout (seconds)")
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+
+    def latency(model: str) -> float:
+        if rng.random() < args.hang_rate:
+            return args.ceiling * 10
+        return rng.uniform(0.1, 0.4)
+
+    stub = OpenRouterStub(latency=latency)
+    os.environ["OPENROUTER_BASE_URL"] = await stub.start()
+    os.environ.setdefault("OPENROUTER_API_KEY", "bench")
+    os.environ["RESPONSE_CACHE_ENABLED"] = "false"  # measure real upstream calls
+    os.environ.setdefault("OPENROUTER_MAX_RETRIES", "0")
+    # Scale the floor and padding down to the stub's sub-second latencies
+    os.environ.setdefault("ADAPTIVE_TIMEOUT_MIN", "0.5")
+    os.environ.setdefault("ADAPTIVE_TIMEOUT_PADDING", "0.2")
+    os.environ.setdefault("BREAKER_FAILURE_THRESHOLD", "1000000")
+
+    from backend import latency as tracker
+    from backend.openrouter import close_client, query_model
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    questions = itertools.count()
+
+    async def timed() -> Tuple[float, bool]:
+        async with semaphore:
+            start = time.perf_counter()
+            # Distinct questions, so concurrent calls aren't coalesced into one
+            messages = [{"role": "user", "content": f"Why #{next(questions)}?"}]
+            result = await query_model(MODEL, messages, timeout=args.ceiling, stage="bench")
+            return time.perf_counter() - start, result is not None
+
+    # Warm-up: learn the model's latency distribution
+    await asyncio.gather(*(timed() for _ in range(50)))
+
+    for label, adaptive in (("fixed", False), ("adaptive", True)):
+        tracker.ADAPTIVE_TIMEOUTS = adaptive
+        timeout = tracker.timeout_for(MODEL, "bench", args.ceiling)
+        start = time.perf_counter()
+        outcomes = await asyncio.gather(*(timed() for _ in range(args.calls)))
+        wall = time.perf_counter() - start
+        timings = [elapsed for elapsed, _ in outcomes]
+        wasted = sum(elapsed for elapsed, ok in outcomes if not ok)
+        answered = sum(ok for _, ok in outcomes)
+        print(
+            f"{label:<9} timeout {timeout:5.2f}s  answered {answered}/{args.calls}  "
+            f"p99 {_percentile(timings, 99):5.2f}s  waiting on failures {wasted:6.2f}s  wall {wall:5.2f}s"
+        )
+
+    learned = tracker.timeout_for(MODEL, "bench", args.ceiling)
+    state = tracker.export_state()
+    tracker._HISTOGRAMS.clear()
+    cold = tracker.timeout_for(MODEL, "bench", args.ceiling)
+    tracker.load_state(state)
+    seeded = tracker.timeout_for(MODEL, "bench", args.ceiling)
+    print(f"cold container timeout {cold:.2f}s -> seeded from storage {seeded:.2f}s (warm {learned:.2f}s)")
+
+    await close_client()
+    await stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
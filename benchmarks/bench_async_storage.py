@@ -0,0 +1,125 @@
+"""
+Benchmark: blocking vs worker-pool storage calls in the message handler.
+
+Storage functions are replaced by stand-ins that sleep ``--storage-latency``
+seconds (a DynamoDB round trip) and model calls go to the local OpenRouter
+stand-in. ``--requests`` first messages are then sent concurrently through
+``backend.main._send_message`` twice: once with storage called directly on
+the event loop, as the handlers used to, and once through
+``backend.storage_async``. Reports wall time, per-request latency and the
+longest stretch the event loop was blocked.
+
+Usage:
+    python -m benchmarks.bench_async_storage --requests 20 --storage-latency 0.02
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import io
+import itertools
+import os
+import statistics
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+from .openrouter_stub import OpenRouterStub
+
+STORAGE_FUNCTIONS = (
+    "add_user_message",
+    "add_assistant_message",
+    "start_assistant_message",
+    "update_assistant_message",
+    "update_conversation_title",
+)
+
+
+async def _loop_lag(stop: asyncio.Event) -> float:
+    """Longest delay between consecutive 1 ms ticks until stop is set."""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        worst = max(worst, time.perf_counter() - start - 0.001)
+    return worst
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--storage-latency", type=float, default=0.02, help="seconds per storage call")
+    parser.add_argument("--model-latency", type=float, default=0.2, help="seconds per model call")
+    args = parser.parse_args()
+
+    # Everything runs on the container's persistent loop, as in Lambda
+    from backend import runtime
+
+    stub = OpenRouterStub(latency=args.model_latency)
+    os.environ["OPENROUTER_BASE_URL"] = runtime.run(stub.start())
+    os.environ.setdefault("OPENROUTER_API_KEY", "bench")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-west-2")
+    os.environ["RESPONSE_CACHE_ENABLED"] = "false"  # measure real upstream calls
+
+    with contextlib.redirect_stdout(io.StringIO()):  # no AWS here: loading latency stats fails
+        from backend import main as handler, storage, storage_async
+
+    def slow(result: Any):
+        def call(*_: Any, **__: Any) -> Any:
+            time.sleep(args.storage_latency)
+            return result
+        return call
+
+    storage.add_user_message = slow(1)  # every request is a conversation's first message
+    storage.add_assistant_message = slow(None)
+    storage.start_assistant_message = slow(2)
+    storage.update_assistant_message = slow(None)
+    storage.update_conversation_title = slow(None)
+    storage.save_latency_stats = lambda stats: None
+
+    def blocking(name: str):
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            return getattr(storage, name)(*args, **kwargs)
+        return call
+
+    modes: Dict[str, Any] = {
+        "blocking": SimpleNamespace(**{name: blocking(name) for name in STORAGE_FUNCTIONS}),
+        "worker pool": storage_async,
+    }
+    runtime.run(_compare(args, handler, modes))
+    runtime.run(stub.stop())
+    runtime.shutdown()
+
+
+async def _compare(args: argparse.Namespace, handler: Any, modes: Dict[str, Any]) -> None:
+    questions = itertools.count()
+
+    async def send() -> float:
+        start = time.perf_counter()
+        # Distinct questions, so concurrent calls aren't coalesced into one
+        payload = {"content": f"Question #{next(questions)}?"}
+        response = await handler._send_message("conversation", "user", payload)
+        assert response["statusCode"] == 200, response
+        return time.perf_counter() - start
+
+    for label, module in modes.items():
+        handler.storage_async = module
+        stop = asyncio.Event()
+        lag = asyncio.create_task(_loop_lag(stop))
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):  # silence council debug logs
+            timings: List[float] = await asyncio.gather(*(send() for _ in range(args.requests)))
+        wall = time.perf_counter() - start
+        stop.set()
+        print(
+            f"{label:<12} wall {wall:6.2f}s  median {statistics.median(timings):6.2f}s  "
+            f"max {max(timings):6.2f}s  worst loop stall {await lag * 1000:7.1f} ms"
+        )
+
+    handler.storage_async = modes["worker pool"]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark: bytes sent and handler time for repeated conversation fetches.
+
+Stores one conversation of ``--messages`` assistant turns (prose from
+bench_stage_compression) in the in-memory backend, then fetches it through
+``backend.main._route`` the way a client re-fetching after every action would:
+
+- plain: no Accept-Encoding, no validator
+- gzip / br: compressed for a client that accepts them (br needs the brotli package)
+- 304: a revalidation with the ETag from an earlier fetch, which only reads
+  the conversation header
+
+Usage:
+    python -m benchmarks.bench_conditional_get --messages 40
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import time
+from typing import Any, Dict
+
+from benchmarks.bench_stage_compression import build_messages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=40)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=13)
+    args = parser.parse_args()
+
+    os.environ["STORAGE_BACKEND"] = "memory"
+    os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+    import jwt
+
+    from backend import negotiation, runtime, storage
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        from backend import main as handler
+
+    messages = []
+    for message in build_messages(args.messages, args.seed):
+        messages += [{"role": "user", "content": "Question?"}, message]
+    conversation = storage.create_conversation("bench", "bench-user")
+    conversation["messages"] = messages
+    storage.save_conversation(conversation)
+
+    # Unsigned token: without COGNITO_USER_POOL_ID the handler trusts API Gateway's check
+    token = jwt.encode({"sub": "bench-user"}, "bench" * 8, algorithm="HS256")
+
+    def fetch(headers: Dict[str, str]) -> Dict[str, Any]:
+        event = {
+            "rawPath": "/api/conversations/bench",
+            "headers": {"authorization": f"Bearer {token}", **headers},
+            "requestContext": {"http": {"method": "GET", "path": "/api/conversations/bench"}},
+        }
+        with contextlib.redirect_stdout(io.StringIO()):
+            return runtime.run(handler._route(event))
+
+    etag = fetch({})["headers"]["ETag"]
+    variants = {
+        "plain": {},
+        "gzip": {"accept-encoding": "gzip"},
+        "br": {"accept-encoding": "br"},
+        "304": {"accept-encoding": "gzip, br", "if-none-match": etag},
+    }
+    if negotiation.brotli is None:
+        del variants["br"]
+        print("brotli not installed (pip install brotli); skipping br")
+
+    print(f"{'variant':<8} {'status':>6} {'bytes':>10} {'median ms':>10}")
+    for name, headers in variants.items():
+        timings = []
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            response = fetch(headers)
+            timings.append(time.perf_counter() - start)
+        body = response.get("body") or ""
+        size = len(body) * 3 // 4 if response.get("isBase64Encoded") else len(body.encode("utf-8"))
+        print(f"{name:<8} {response['statusCode']:>6} {size:>10} {statistics.median(timings) * 1e3:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
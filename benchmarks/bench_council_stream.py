@@ -0,0 +1,68 @@
+"""
+Benchmark: time to first visible result for the streaming council engine.
+
+Runs ``run_full_council`` and ``run_council_stream`` against the local
+OpenRouter stand-in, where each council model has its own simulated latency,
+and reports when the first stage 1 result, the first stage 3 token and the
+final synthesis become available.
+
+Usage:
+    python -m benchmarks.bench_council_stream --latencies 0.2,0.5,0.8,1.5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import time
+from typing import Dict
+
+from .openrouter_stub import OpenRouterStub
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latencies", default="0.2,0.5,0.8,1.5", help="per-model seconds, comma separated")
+    parser.add_argument("--token-delay", type=float, default=0.002)
+    args = parser.parse_args()
+
+    latencies: Dict[str, float] = {
+        f"stub/model-{index}": float(value) for index, value in enumerate(args.latencies.split(","))
+    }
+    models = list(latencies)
+    stub = OpenRouterStub(
+        latency=lambda model: latencies.get(model, 0.1),
+        token_delay=args.token_delay,
+        reply="Council answer " * 50 + "\n\nFINAL RANKING:\n1. Response A\n2. Response B",
+    )
+    os.environ["OPENROUTER_BASE_URL"] = await stub.start()
+    os.environ.setdefault("OPENROUTER_API_KEY", "bench")
+    os.environ["RESPONSE_CACHE_ENABLED"] = "false"  # measure real upstream calls
+
+    from backend.council import run_council_stream, run_full_council
+    from backend.openrouter import close_client
+
+    start = time.perf_counter()
+    await run_full_council("Why?", council_models=models, chairman_model="stub/chair")
+    buffered = time.perf_counter() - start
+    print(f"run_full_council     first visible {buffered * 1000:8.1f} ms  total {buffered * 1000:8.1f} ms")
+
+    start = time.perf_counter()
+    marks: Dict[str, float] = {}
+    async for event in run_council_stream("Why?", council_models=models, chairman_model="stub/chair"):
+        marks.setdefault(event["type"], time.perf_counter() - start)
+    total = time.perf_counter() - start
+    print(
+        f"run_council_stream   first visible {marks['stage1_result'] * 1000:8.1f} ms  "
+        f"total {total * 1000:8.1f} ms"
+    )
+    for kind in ("stage1_complete", "stage2_result", "stage2_complete", "stage3_delta", "stage3_complete"):
+        print(f"  {kind:<16} {marks[kind] * 1000:8.1f} ms")
+
+    await close_client()
+    await stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
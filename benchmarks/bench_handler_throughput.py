@@ -0,0 +1,108 @@
+"""
+Benchmark: throughput of the full request handler on a local storage backend.
+
+Runs ``--sessions`` user sessions, ``--concurrency`` at a time, through
+``backend.main._route`` on the container's event loop. Each session creates a
+conversation, sends a message (the whole council, against the local
+OpenRouter stand-in), reads the conversation back and lists the user's
+conversations. Storage is the in-memory or SQLite backend, so nothing
+touches AWS. Reports requests per second and latency for each route.
+
+Usage:
+    python -m benchmarks.bench_handler_throughput --backend sqlite --sessions 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import statistics
+import tempfile
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+import jwt
+
+from .openrouter_stub import OpenRouterStub
+
+
+def _event(method: str, path: str, token: str, body: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    return {
+        "rawPath": path,
+        "headers": {"authorization": f"Bearer {token}"},
+        "body": json.dumps(body) if body is not None else None,
+        "requestContext": {"http": {"method": method, "path": path}},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=("memory", "sqlite"), default="sqlite")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--model-latency", type=float, default=0.0, help="seconds per model call")
+    args = parser.parse_args()
+
+    os.environ["STORAGE_BACKEND"] = args.backend
+    os.environ["SQLITE_PATH"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-west-2")
+    os.environ.setdefault("OPENROUTER_API_KEY", "bench")
+    os.environ["RESPONSE_CACHE_ENABLED"] = "false"  # measure real upstream calls
+
+    from backend import runtime
+
+    stub = OpenRouterStub(latency=args.model_latency)
+    os.environ["OPENROUTER_BASE_URL"] = runtime.run(stub.start())
+
+    from backend import main as handler
+
+    # Unsigned tokens: without COGNITO_USER_POOL_ID the handler trusts API Gateway's check
+    tokens = [jwt.encode({"sub": f"user-{user}"}, "bench" * 8, algorithm="HS256") for user in range(args.users)]
+    timings: Dict[str, List[float]] = defaultdict(list)
+
+    async def call(route: str, event: Dict[str, Any]) -> Dict[str, Any]:
+        start = time.perf_counter()
+        response = await handler._route(event)
+        timings[route].append(time.perf_counter() - start)
+        assert response["statusCode"] < 300, (route, response)
+        return response
+
+    async def session(number: int, semaphore: asyncio.Semaphore) -> None:
+        token = tokens[number % len(tokens)]
+        async with semaphore:
+            created = await call("create", _event("POST", "/api/conversations", token))
+            conversation_id = json.loads(created["body"])["id"]
+            path = f"/api/conversations/{conversation_id}"
+            await call("message", _event("POST", f"{path}/message", token, {"content": f"Question #{number}?"}))
+            await call("get", _event("GET", path, token))
+            await call("list", _event("GET", "/api/conversations", token))
+
+    async def run() -> float:
+        semaphore = asyncio.Semaphore(args.concurrency)
+        start = time.perf_counter()
+        await asyncio.gather(*(session(number, semaphore) for number in range(args.sessions)))
+        return time.perf_counter() - start
+
+    with contextlib.redirect_stdout(io.StringIO()):  # silence handler debug logs
+        wall = runtime.run(run())
+
+    requests = sum(len(values) for values in timings.values())
+    print(f"{args.backend}: {args.sessions} sessions, {requests} requests in {wall:.2f}s ({requests / wall:.0f} req/s)")
+    for route, values in timings.items():
+        print(
+            f"  {route:<8} median {statistics.median(values) * 1000:7.2f} ms  "
+            f"p99 {sorted(values)[int(0.99 * (len(values) - 1))] * 1000:7.2f} ms"
+        )
+
+    runtime.run(stub.stop())
+    runtime.shutdown()
+
+
+if __name__ == "__main__":
+    main()
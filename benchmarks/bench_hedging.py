@@ -0,0 +1,95 @@
+"""
+Benchmark: tail latency of plain vs hedged model calls, and chairman fallback.
+
+The local OpenRouter stand-in answers most requests quickly, but a small
+fraction stall (``--stall-rate``, ``--stall``). After a warm-up that teaches
+the latency tracker the model's p95, ``query_model`` and ``query_model_hedged``
+are each called ``--calls`` times and their latency percentiles and extra
+upstream requests compared. Finally a failing chairman shows the fallback chain.
+
+Usage:
+    python -m benchmarks.bench_hedging --calls 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from .openrouter_stub import OpenRouterStub
+
+MODEL = "stub/tail-heavy"
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--stall-rate", type=float, default=0.04)
+    parser.add_argument("--stall", type=float, default=2.0, help="seconds a stalled request takes")
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+
+    def latency(model: str) -> float:
+        if rng.random() < args.stall_rate:
+            return args.stall
+        return rng.uniform(0.05, 0.15)
+
+    stub = OpenRouterStub(latency=latency, errors=lambda model: 503 if model == "stub/broken-chair" else None)
+    os.environ["OPENROUTER_BASE_URL"] = await stub.start()
+    os.environ.setdefault("OPENROUTER_API_KEY", "bench")
+    os.environ["RESPONSE_CACHE_ENABLED"] = "false"  # measure real upstream calls
+    os.environ.setdefault("HEDGE_MIN_DELAY", "0.05")
+    os.environ.setdefault("OPENROUTER_MAX_RETRIES", "0")
+
+    from backend import council
+    from backend.openrouter import close_client, hedge_delay, query_model, query_model_hedged
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    questions = itertools.count()
+
+    def messages() -> List[Dict[str, str]]:
+        # Distinct questions, so concurrent calls aren't coalesced into one
+        return [{"role": "user", "content": f"Why #{next(questions)}?"}]
+
+    async def timed(call: Callable[[], Awaitable[object]]) -> float:
+        async with semaphore:
+            start = time.perf_counter()
+            await call()
+            return time.perf_counter() - start
+
+    # Warm-up: learn the model's latency distribution
+    await asyncio.gather(*(timed(lambda: query_model(MODEL, messages())) for _ in range(50)))
+    print(f"hedge delay learned for {MODEL}: {hedge_delay(MODEL) * 1000:.0f} ms")
+
+    for label, call in (("plain", query_model), ("hedged", query_model_hedged)):
+        stub.reset_counters()
+        timings = await asyncio.gather(*(timed(lambda: call(MODEL, messages())) for _ in range(args.calls)))
+        print(
+            f"{label:<7} p50 {_percentile(timings, 50) * 1000:7.1f} ms  "
+            f"p95 {_percentile(timings, 95) * 1000:7.1f} ms  p99 {_percentile(timings, 99) * 1000:7.1f} ms  "
+            f"max {max(timings) * 1000:7.1f} ms  upstream requests {stub.requests}/{args.calls}"
+        )
+
+    council.CHAIRMAN_FALLBACK_MODELS[:] = ["stub/backup-chair"]
+    result = await council.stage3_synthesize_final("Why?", [], [], chairman_model="stub/broken-chair")
+    print(f"chairman fallback: requested {result.get('requested_model')} -> served by {result['model']}")
+
+    await close_client()
+    await stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
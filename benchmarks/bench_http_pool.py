@@ -0,0 +1,95 @@
+"""
+Benchmark: per-call httpx clients vs the shared pooled OpenRouter client.
+
+Simulates the request pattern of one council run (stage 1 and stage 2 fan-out
+over N models, the chairman and the title call: 2N+2 requests) and reports wall
+time and how many connections each strategy opened.
+
+By default it targets a local stand-in server that charges ``--connect-delay``
+seconds per new connection to model the TCP + TLS handshake. Pass ``--url`` to
+measure real handshakes against a live endpoint instead (e.g.
+``--url https://openrouter.ai/api/v1/models``).
+
+Usage:
+    python -m benchmarks.bench_http_pool --runs 5 --models 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import Awaitable, Callable, List
+
+import httpx
+
+from .openrouter_stub import OpenRouterStub
+
+
+async def _fresh_client_get(url: str) -> None:
+    # The pre-pool behaviour: one client (and one handshake) per call.
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        (await client.get(url)).raise_for_status()
+
+
+async def _council_run(call: Callable[[], Awaitable[None]], models: int) -> None:
+    await asyncio.gather(*(call() for _ in range(models)))  # stage 1
+    await asyncio.gather(*(call() for _ in range(models)))  # stage 2
+    await call()  # chairman
+    await call()  # title
+
+
+async def _measure(call: Callable[[], Awaitable[None]], runs: int, models: int) -> List[float]:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await _council_run(call, models)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _report(label: str, timings: List[float], connections: int | None) -> None:
+    conns = "n/a" if connections is None else str(connections)
+    print(
+        f"{label:<10} median {statistics.median(timings) * 1000:8.1f} ms  "
+        f"min {min(timings) * 1000:8.1f} ms  connections {conns}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--models", type=int, default=4)
+    parser.add_argument("--connect-delay", type=float, default=0.05, help="simulated handshake seconds")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated model latency seconds")
+    parser.add_argument("--url", help="benchmark against a live URL instead of the local stub")
+    args = parser.parse_args()
+
+    stub = None
+    url = args.url
+    if url is None:
+        stub = OpenRouterStub(latency=args.latency, connect_delay=args.connect_delay)
+        os.environ["OPENROUTER_BASE_URL"] = await stub.start()
+        url = f"{stub.base_url}/models"
+
+    from backend.openrouter import close_client, get_client
+
+    async def pooled_get() -> None:
+        (await get_client().get(url)).raise_for_status()
+
+    print(f"{args.runs} council runs x {2 * args.models + 2} requests against {url}")
+    for label, call in (("per-call", lambda: _fresh_client_get(url)), ("pooled", pooled_get)):
+        if stub:
+            stub.reset_counters()
+        timings = await _measure(call, args.runs, args.models)
+        _report(label, timings, stub.connections if stub else None)
+
+    await close_client()
+    if stub:
+        await stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
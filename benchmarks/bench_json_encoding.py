@@ -0,0 +1,122 @@
+"""
+Benchmark: encoding large stored conversations as API response bodies.
+
+Builds ``--conversations`` conversations of ``--messages`` assistant turns
+(prose from bench_stage_compression) shaped as boto3 returns them, with every
+number a Decimal: sequence numbers, counts, token usage, latencies, ranks.
+Then times three ways of producing the response body:
+
+- before: json.dumps with a JSONEncoder subclass whose default() converts
+  each Decimal (the pre-serialization-module path)
+- json: Decimals normalised (serialization.to_plain), then the stdlib
+  fallback encoder
+- orjson: the same normalised value, encoded with orjson (if installed)
+
+Every number here sits in the body, as in legacy uncompressed items, so
+to_plain walks the whole conversation: its cost is included above and also
+shown alone. With compressed stage payloads the storage layer only
+normalises the small uncompressed attributes, which the "encode only"
+column approximates.
+
+Usage:
+    python -m benchmarks.bench_json_encoding --conversations 5 --messages 40
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from decimal import Decimal
+from typing import Any, Callable, Dict, List
+
+from benchmarks.bench_stage_compression import build_messages
+
+
+class _DecimalEncoder(json.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return int(obj) if obj % 1 == 0 else float(obj)
+        return super().default(obj)
+
+
+def _as_stored(messages: List[Dict[str, Any]], rng: random.Random) -> Dict[str, Any]:
+    """A conversation as read from DynamoDB: numbers are Decimals throughout."""
+    stored = []
+    for seq, message in enumerate(messages, start=1):
+        message = json.loads(json.dumps(message))
+        for result in message["stage1"]:
+            result["latency"] = Decimal(f"{rng.uniform(2, 40):.3f}")
+            result["usage"] = {
+                "prompt_tokens": Decimal(rng.randint(200, 4000)),
+                "completion_tokens": Decimal(rng.randint(300, 2000)),
+            }
+        for result in message["stage2"]:
+            result["scores"] = [Decimal(f"{rng.uniform(1, 4):.2f}") for _ in range(4)]
+        message["seq"] = Decimal(seq)
+        stored.append(message)
+    return {
+        "id": "bench",
+        "title": "Benchmark conversation",
+        "message_count": Decimal(len(stored)),
+        "messages": stored,
+    }
+
+
+def _throughput(encode: Callable[[Any], str], conversations: List[Dict[str, Any]], repeat: int) -> float:
+    """Seconds per pass over conversations (best of repeat)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for conversation in conversations:
+            encode(conversation)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=5)
+    parser.add_argument("--messages", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=13)
+    args = parser.parse_args()
+
+    from backend import serialization
+
+    rng = random.Random(args.seed)
+    conversations = [
+        _as_stored(build_messages(args.messages, args.seed + index), rng) for index in range(args.conversations)
+    ]
+    size = sum(len(json.dumps(c, cls=_DecimalEncoder).encode("utf-8")) for c in conversations)
+    print(f"{args.conversations} conversations, {size / 1e6:.1f} MB of JSON "
+          f"({size / args.conversations / 1e6:.2f} MB each)")
+
+    variants = {
+        "before": lambda value: json.dumps(value, cls=_DecimalEncoder),
+        "json": lambda value: serialization._json_dumps(serialization.to_plain(value)),
+    }
+    if serialization.orjson is not None:
+        variants["orjson"] = lambda value: serialization._orjson_dumps(serialization.to_plain(value))
+    else:
+        print("orjson not installed (pip install orjson); showing the stdlib encoder only")
+
+    encoders = {"json": serialization._json_dumps}
+    if serialization.orjson is not None:
+        encoders["orjson"] = serialization._orjson_dumps
+    plain = [serialization.to_plain(conversation) for conversation in conversations]
+
+    normalise = _throughput(serialization.to_plain, conversations, args.repeat)
+    print(f"to_plain alone: {normalise / args.conversations * 1e3:.1f} ms/body")
+    print(f"{'encoder':<8} {'ms/body':>8} {'MB/s':>7} {'encode only ms':>15}")
+    for name, encode in variants.items():
+        elapsed = _throughput(encode, conversations, args.repeat)
+        only = f"{'-':>15}"
+        if name in encoders:
+            only = f"{_throughput(encoders[name], plain, args.repeat) / args.conversations * 1e3:15.1f}"
+        print(f"{name:<8} {elapsed / args.conversations * 1e3:8.1f} {size / elapsed / 1e6:7.0f} {only}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark: read capacity consumed by listing one user's conversations.
+
+Builds a synthetic table (``--users`` users with ``--conversations`` council
+conversations of ``--turns`` turns each, plus their settings items) and
+computes, with DynamoDB's item-size and capacity rules, the read units one
+sidebar listing consumes under three layouts:
+
+- scan: the original full-table Scan filtered on user_id
+- index + messages: the user_id/created_at index projecting the messages list
+- index + summary: the same index projecting only the summary attributes
+
+No AWS access is needed; sizes follow the documented DynamoDB accounting
+(attribute names plus values, 4 KB read units, eventually consistent reads
+at half cost).
+
+Usage:
+    python -m benchmarks.bench_listing_capacity --users 50 --conversations 40
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import random
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List
+
+WORDS = (
+    "the model argues that evidence suggests however response ranking council synthesis "
+    "because therefore first second finally consider approach accuracy insight clarity "
+    "answer question data analysis tradeoff latency cost quality reasoning example"
+).split()
+
+KEY_ATTRIBUTES = ("id", "user_id", "created_at")
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _value_size(value: Any) -> int:
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, bool) or value is None:
+        return 1
+    if isinstance(value, (int, float, Decimal)):
+        return len(str(value).lstrip("-").replace(".", "")) // 2 + 2
+    if isinstance(value, dict):
+        return 3 + sum(len(name.encode("utf-8")) + _value_size(item) + 1 for name, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return 3 + sum(_value_size(item) + 1 for item in value)
+    raise TypeError(type(value))
+
+
+def item_size(item: Dict[str, Any], attributes: Iterable[str] | None = None) -> int:
+    """DynamoDB size of item (or of the given attributes of it) in bytes."""
+    names = item if attributes is None else [name for name in attributes if name in item]
+    return sum(len(name.encode("utf-8")) + _value_size(item[name]) for name in names)
+
+
+def read_units(sizes: List[int]) -> float:
+    """Eventually consistent read units for a Query/Scan returning items of these sizes."""
+    return math.ceil(sum(sizes) / 4096) * 0.5
+
+
+def build_table(args: argparse.Namespace, summarize) -> List[Dict[str, Any]]:
+    rng = random.Random(args.seed)
+    items: List[Dict[str, Any]] = []
+    for user in range(args.users):
+        user_id = f"user-{user}"
+        items.append({"id": f"user_panel_{user_id}", "panel_models": ["a", "b", "c"], "updated_at": "2026-01-01"})
+        items.append({"id": f"user_council_{user_id}", "models": ["a", "b", "c", "d"], "updated_at": "2026-01-01"})
+        for number in range(args.conversations):
+            messages: List[Dict[str, Any]] = []
+            for _ in range(args.turns):
+                messages.append({"role": "user", "content": _text(rng, 40)})
+                messages.append({
+                    "role": "assistant",
+                    "stage1": [{"model": f"m{i}", "response": _text(rng, 600)} for i in range(4)],
+                    "stage2": [
+                        {"model": f"m{i}", "ranking": _text(rng, 300), "parsed_ranking": ["Response A", "Response B"]}
+                        for i in range(4)
+                    ],
+                    "stage3": {"model": "m0", "response": _text(rng, 500)},
+                })
+            items.append(summarize({
+                "id": f"{user_id}-{number}",
+                "user_id": user_id,
+                "created_at": f"2026-01-{number % 28 + 1:02d}T00:00:{number:02d}",
+                "title": _text(rng, 5),
+                "type": "council",
+                "messages": messages,
+            }))
+    return items
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--conversations", type=int, default=40, help="conversations per user")
+    parser.add_argument("--turns", type=int, default=3, help="council turns per conversation")
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-west-2")
+    from backend.storage.common import summarize
+    from backend.storage.dynamodb import SUMMARY_ATTRIBUTES
+
+    summary = [name.strip().replace("#tp", "type") for name in SUMMARY_ATTRIBUTES.split(",")]
+    table = build_table(args, summarize)
+    mine = [item for item in table if item.get("user_id") == "user-0"]
+
+    layouts = {
+        "scan": [item_size(item) for item in table],
+        "index + messages": [item_size(item, KEY_ATTRIBUTES + ("title", "type", "messages")) for item in mine],
+        "index + summary": [item_size(item, KEY_ATTRIBUTES + tuple(summary)) for item in mine],
+    }
+    print(f"table: {len(table)} items, {sum(layouts['scan']) / 1e6:.1f} MB; user-0 has {len(mine)} conversations")
+    for label, sizes in layouts.items():
+        print(f"{label:<17} read {sum(sizes) / 1024:10.1f} KB  {read_units(sizes):9.1f} RCU per listing")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark: retries and circuit breakers against failing providers.
+
+Against the local OpenRouter stand-in:
+
+1. A flaky model answers 429 (with Retry-After) on every other request.
+   Compares how many Stage 1 fan-outs keep it with and without retries.
+2. A dead model always answers 503 after a delay. Compares Stage 1 fan-out
+   latency with the breaker disabled vs enabled; once the breaker opens the dead
+   model is skipped instantly.
+
+Usage:
+    python -m benchmarks.bench_resilience --runs 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import os
+import statistics
+import time
+from typing import List
+
+from .openrouter_stub import OpenRouterStub
+
+HEALTHY = ["stub/a", "stub/b", "stub/c"]
+MESSAGES = [{"role": "user", "content": "Why?"}]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--dead-latency", type=float, default=0.5, help="seconds before the dead model errors")
+    args = parser.parse_args()
+
+    flaky_calls = itertools.count()
+
+    def errors(model: str) -> int | None:
+        if model == "stub/dead":
+            return 503
+        if model == "stub/flaky":
+            return 429 if next(flaky_calls) % 2 == 0 else None
+        return None
+
+    stub = OpenRouterStub(
+        latency=lambda model: args.dead_latency if model == "stub/dead" else args.latency,
+        errors=errors,
+        retry_after=0.05,
+    )
+    os.environ["OPENROUTER_BASE_URL"] = await stub.start()
+    os.environ.setdefault("OPENROUTER_API_KEY", "bench")
+    os.environ["RESPONSE_CACHE_ENABLED"] = "false"  # measure real upstream calls
+    os.environ["HEDGE_ENABLED"] = "false"  # a hedge would mask the failures under test
+
+    from backend import openrouter, resilience
+    from backend.openrouter import close_client, query_models_parallel
+
+    max_retries = openrouter.OPENROUTER_MAX_RETRIES
+    print("Flaky model (429 on every other request):")
+    for label, retries in (("no retries", 0), (f"{max_retries} retries", max_retries)):
+        openrouter.OPENROUTER_MAX_RETRIES = retries
+        resilience.reset_breakers()
+        kept = 0
+        for _ in range(args.runs):
+            responses = await query_models_parallel(HEALTHY + ["stub/flaky"], MESSAGES)
+            kept += responses["stub/flaky"] is not None
+        print(f"  {label:<16} flaky model answered {kept}/{args.runs} fan-outs")
+    openrouter.OPENROUTER_MAX_RETRIES = max_retries
+
+    print("Dead model (503 after a delay):")
+    for label, threshold in (("breaker disabled", 10**9), ("breaker enabled", None)):
+        resilience.reset_breakers()
+        breaker = resilience.get_breaker("stub/dead")
+        if threshold is not None:
+            breaker.failure_threshold = threshold
+        timings: List[float] = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            await query_models_parallel(HEALTHY + ["stub/dead"], MESSAGES)
+            timings.append(time.perf_counter() - start)
+        print(
+            f"  {label:<16} median {statistics.median(timings) * 1000:7.1f} ms  "
+            f"last {timings[-1] * 1000:7.1f} ms  breaker {breaker.snapshot()['state']}"
+        )
+
+    await close_client()
+    await stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
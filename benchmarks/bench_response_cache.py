@@ -0,0 +1,85 @@
+"""
+Benchmark: repeated council runs with and without the response cache.
+
+The same question is put to the full council (Stage 1, 2 and 3) ``--repeats``
+times against the local OpenRouter stand-in: with the cache bypassed, with a
+warm in-process tier, and as a cold container that only has the shared tier
+(a dict-backed store here, standing in for DynamoDB). Reports wall time,
+upstream requests and the cache counters.
+
+Usage:
+    python -m benchmarks.bench_response_cache --repeats 5 --latency 0.3
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import Any, Dict, List, Optional
+
+from .openrouter_stub import OpenRouterStub
+
+MODELS = ["stub/a", "stub/b", "stub/c", "stub/d"]
+
+
+class DictStore:
+    """Shared tier stand-in (what a second container would see in DynamoDB)."""
+
+    def __init__(self) -> None:
+        self.items: Dict[str, Dict[str, Any]] = {}
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self.items.get(key)
+
+    def put(self, key: str, value: Dict[str, Any], ttl: float) -> None:
+        self.items[key] = value
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.3)
+    args = parser.parse_args()
+
+    stub = OpenRouterStub(latency=args.latency)
+    os.environ["OPENROUTER_BASE_URL"] = await stub.start()
+    os.environ.setdefault("OPENROUTER_API_KEY", "bench")
+
+    from backend import cache
+    from backend.council import run_full_council
+    from backend.openrouter import close_client
+
+    cache.set_shared_store(DictStore())
+
+    async def run(label: str, bypass: bool = False, cold: bool = False) -> None:
+        stub.reset_counters()
+        timings: List[float] = []
+        for _ in range(args.repeats):
+            if cold:
+                cache._MEMORY.clear()
+            cache.set_request_bypass(bypass)
+            start = time.perf_counter()
+            await run_full_council("Why is the sky blue?", council_models=MODELS, chairman_model=MODELS[0])
+            timings.append(time.perf_counter() - start)
+        cache.set_request_bypass(False)
+        print(
+            f"{label:<22} median {statistics.median(timings) * 1000:7.1f} ms  "
+            f"upstream requests {stub.requests:3d}  hit rate {cache.stats()['hit_rate']}"
+        )
+
+    await run("no-cache", bypass=True)
+    cache.clear()
+    await run("memory tier")
+    cache.clear()
+    await run("cold container, shared", cold=True)
+    print(f"counters: {cache.stats()}")
+
+    await close_client()
+    await stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,70 @@
+"""
+Benchmark: route dispatch cost as the route table grows.
+
+Matches a mix of real request paths against the application's route table
+(``backend.main._ROUTER``), then registers ``--extra`` synthetic endpoints
+(static and templated, as further API areas would add them) and matches the
+same paths again. With routes indexed by method and static prefix, the cost
+per match should not grow with the table.
+
+Usage:
+    python -m benchmarks.bench_routing --iterations 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import time
+from typing import List, Tuple
+
+PATHS: List[Tuple[str, str]] = [
+    ("GET", "/api/conversations"),
+    ("GET", "/api/conversations/0b6f7a1e-4f6c-4d84-9a55-3f1c2b7d9e10"),
+    ("POST", "/api/conversations/0b6f7a1e-4f6c-4d84-9a55-3f1c2b7d9e10/message"),
+    ("POST", "/api/conversations/0b6f7a1e-4f6c-4d84-9a55-3f1c2b7d9e10/messages/12/resynthesize"),
+    ("GET", "/api/debate/history/5d2c9e4b-1a7f-4c3e-8b6d-2f9a0e1c7b34"),
+    ("GET", "/api/nothing/here"),
+]
+
+
+def _time_matches(router, iterations: int) -> float:
+    """Mean microseconds per match over PATHS."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for method, path in PATHS:
+            router.match(method, path)
+    return (time.perf_counter() - start) / (iterations * len(PATHS)) * 1e6
+
+
+async def _noop(request):
+    return {"statusCode": 200}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=100000)
+    parser.add_argument("--extra", type=int, nargs="+", default=[100, 1000])
+    args = parser.parse_args()
+
+    os.environ.setdefault("STORAGE_BACKEND", "memory")
+    with contextlib.redirect_stdout(io.StringIO()):
+        from backend.main import _ROUTER
+    from backend.router import Route
+
+    print(f"{'routes added':>12} {'us/match':>9}")
+    print(f"{0:>12} {_time_matches(_ROUTER, args.iterations):9.2f}")
+    added = 0
+    for extra in sorted(args.extra):
+        while added < extra:
+            area = f"/api/area{added}"
+            _ROUTER.add(Route("GET", area, _noop, ()))
+            _ROUTER.add(Route("POST", f"{area}/{{item_id}}/action", _noop, ()))
+            added += 2
+        print(f"{added:>12} {_time_matches(_ROUTER, args.iterations):9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: coalescing of identical concurrent model requests.
+
+``--clients`` concurrent callers (tabs, retries, users asking the same
+question) each run a Stage 1 fan-out and a streamed Stage 3 against the local
+OpenRouter stand-in, once with identical questions and once with distinct
+ones. The response cache is disabled so only in-flight coalescing is measured.
+Also shows that cancelling one caller leaves the others' results intact.
+
+Usage:
+    python -m benchmarks.bench_single_flight --clients 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import time
+
+from .openrouter_stub import OpenRouterStub
+
+MODELS = ["stub/a", "stub/b", "stub/c", "stub/d"]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.3)
+    args = parser.parse_args()
+
+    stub = OpenRouterStub(latency=args.latency, token_delay=0.01)
+    os.environ["OPENROUTER_BASE_URL"] = await stub.start()
+    os.environ.setdefault("OPENROUTER_API_KEY", "bench")
+    os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+
+    from backend.openrouter import close_client, query_models_parallel, stream_model
+
+    async def client(question: str) -> str:
+        messages = [{"role": "user", "content": question}]
+        await query_models_parallel(MODELS, messages, stage="stage1")
+        deltas = [event.get("delta", "") async for event in stream_model(MODELS[0], messages)]
+        return "".join(deltas)
+
+    for label, identical in (("identical", True), ("distinct", False)):
+        stub.reset_counters()
+        start = time.perf_counter()
+        await asyncio.gather(*(client("Why?" if identical else f"Why #{i}?") for i in range(args.clients)))
+        elapsed = time.perf_counter() - start
+        print(
+            f"{label:<10} {args.clients} clients  upstream requests {stub.requests:3d} "
+            f"(uncoalesced {args.clients * (len(MODELS) + 1)})  wall {elapsed * 1000:6.1f} ms"
+        )
+
+    stub.reset_counters()
+    callers = [asyncio.create_task(client("Why?")) for _ in range(args.clients)]
+    await asyncio.sleep(args.latency / 2)
+    callers[0].cancel()
+    results = await asyncio.gather(*callers, return_exceptions=True)
+    survivors = sum(isinstance(result, str) and bool(result) for result in results[1:])
+    print(f"cancelled 1 caller: {survivors}/{args.clients - 1} others completed, upstream requests {stub.requests}")
+
+    await close_client()
+    await stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+"""
+Benchmark: bytes sent and handler time for sparse conversation fetches.
+
+Stores one conversation of ``--messages`` assistant turns (prose from
+bench_stage_compression) in the selected backend (memory by default), then
+fetches it through ``backend.main._route``:
+
+- full: every stage of every message, as before fields= existed
+- stage3: ?fields=stage3, what the conversation view needs up front
+- expand: one message's stage1 and stage2 (the per-message endpoint), as
+  fetched when a user opens those tabs
+
+Bodies are measured uncompressed; see bench_conditional_get for encodings.
+
+Usage:
+    python -m benchmarks.bench_sparse_fields --messages 40
+    STORAGE_BACKEND=sqlite SQLITE_PATH=/tmp/bench.db python -m benchmarks.bench_sparse_fields
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import time
+from typing import Any, Dict
+
+from benchmarks.bench_stage_compression import build_messages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=40)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=13)
+    args = parser.parse_args()
+
+    os.environ.setdefault("STORAGE_BACKEND", "memory")
+    os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+    os.environ["RESPONSE_COMPRESSION"] = "false"
+    import jwt
+
+    from backend import runtime, storage
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        from backend import main as handler
+
+    messages = []
+    for message in build_messages(args.messages, args.seed):
+        messages += [{"role": "user", "content": "Question?"}, message]
+    conversation = storage.create_conversation("bench", "bench-user")
+    conversation["messages"] = messages
+    storage.save_conversation(conversation)
+
+    # Unsigned token: without COGNITO_USER_POOL_ID the handler trusts API Gateway's check
+    token = jwt.encode({"sub": "bench-user"}, "bench" * 8, algorithm="HS256")
+
+    def fetch(path: str, query: Dict[str, str] | None) -> Dict[str, Any]:
+        event = {
+            "rawPath": path,
+            "queryStringParameters": query,
+            "headers": {"authorization": f"Bearer {token}"},
+            "requestContext": {"http": {"method": "GET", "path": path}},
+        }
+        with contextlib.redirect_stdout(io.StringIO()):
+            return runtime.run(handler._route(event))
+
+    last = f"/api/conversations/bench/messages/{len(messages)}"
+    variants = {
+        "full": ("/api/conversations/bench", None),
+        "stage3": ("/api/conversations/bench", {"fields": "stage3"}),
+        "expand": (last, {"fields": "stage1,stage2"}),
+    }
+
+    print(f"{os.environ['STORAGE_BACKEND']} backend, {len(messages)} messages")
+    print(f"{'variant':<8} {'status':>6} {'bytes':>10} {'median ms':>10}")
+    for name, (path, query) in variants.items():
+        timings = []
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            response = fetch(path, query)
+            timings.append(time.perf_counter() - start)
+        size = len(response["body"].encode("utf-8"))
+        print(f"{name:<8} {response['statusCode']:>6} {size:>10} {statistics.median(timings) * 1e3:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
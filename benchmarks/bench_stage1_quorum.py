@@ -0,0 +1,95 @@
+"""
+Benchmark: Stage 1 early-advance policies under simulated latency distributions.
+
+Each council model gets a log-normal latency distribution (one slow, heavy
+tailed member, like a reasoning model). ``run_full_council`` is timed end to
+end against the local OpenRouter stand-in under several policies: wait for
+everyone, quorum of N-1, a soft deadline, and both combined.
+
+Usage:
+    python -m benchmarks.bench_stage1_quorum --trials 20 --scale 0.5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+from typing import Dict, List, Tuple
+
+from .openrouter_stub import OpenRouterStub
+
+# (median seconds, log-normal sigma) per council member before scaling
+DISTRIBUTIONS: Dict[str, Tuple[float, float]] = {
+    "stub/fast": (0.6, 0.3),
+    "stub/steady": (0.9, 0.3),
+    "stub/variable": (1.0, 0.6),
+    "stub/reasoning": (2.5, 0.8),
+}
+CHAIRMAN = "stub/fast"
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trials", type=int, default=20)
+    parser.add_argument("--scale", type=float, default=0.5, help="multiplier applied to every latency")
+    parser.add_argument("--deadline", type=float, default=1.0, help="soft deadline (seconds, before scaling)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+
+    def latency(model: str) -> float:
+        median, sigma = DISTRIBUTIONS.get(model, (0.5, 0.3))
+        return args.scale * rng.lognormvariate(0, sigma) * median
+
+    stub = OpenRouterStub(latency=latency)
+    os.environ["OPENROUTER_BASE_URL"] = await stub.start()
+    os.environ.setdefault("OPENROUTER_API_KEY", "bench")
+    os.environ["RESPONSE_CACHE_ENABLED"] = "false"  # measure real upstream calls
+
+    from backend.council import run_full_council
+    from backend.openrouter import close_client
+
+    models = list(DISTRIBUTIONS)
+    deadline = args.deadline * args.scale
+    policies = {
+        "wait for all": {"quorum": 0, "soft_deadline": 0},
+        f"quorum {len(models) - 1}/{len(models)}": {"quorum": len(models) - 1, "soft_deadline": 0},
+        f"deadline {deadline:.2f}s": {"quorum": 0, "soft_deadline": deadline},
+        "quorum + deadline": {"quorum": len(models) - 1, "soft_deadline": deadline},
+    }
+
+    print(f"{args.trials} trials per policy, {len(models)} council members")
+    for label, policy in policies.items():
+        timings: List[float] = []
+        ranked: List[int] = []
+        late: List[int] = []
+        for _ in range(args.trials):
+            start = time.perf_counter()
+            stage1, _, _, metadata = await run_full_council(
+                "Why?", council_models=models, chairman_model=CHAIRMAN, **policy
+            )
+            timings.append(time.perf_counter() - start)
+            cutoff = metadata["stage1_cutoff"]
+            late.append(len(cutoff["late_entries"]))
+            ranked.append(len(stage1) - late[-1])
+        print(
+            f"{label:<20} p50 {statistics.median(timings):6.2f}s  p95 {_percentile(timings, 95):6.2f}s  "
+            f"ranked {statistics.mean(ranked):4.2f}  late entries {statistics.mean(late):4.2f}"
+        )
+
+    await close_client()
+    await stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,131 @@
+"""
+Benchmark: size and CPU cost of compressing stored stage payloads.
+
+Builds ``--messages`` assistant messages whose stage 1 answers, stage 2
+critiques and stage 3 synthesis are made of real English prose (docstrings
+from the standard library, standing in for model output), then encodes their
+stage payloads with each available codec and level. Reports stored bytes,
+compression ratio, encode/decode throughput and the DynamoDB write and read
+units one message item costs.
+
+Usage:
+    python -m benchmarks.bench_stage_compression --messages 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import math
+import os
+import random
+import statistics
+import time
+from typing import Any, Dict, List, Tuple
+
+CORPUS_MODULES = [
+    "argparse", "asyncio.events", "collections", "concurrent.futures", "csv", "dataclasses",
+    "decimal", "email.message", "functools", "http.client", "inspect", "json", "logging",
+    "pathlib", "shutil", "statistics", "subprocess", "tarfile", "threading", "typing", "unittest",
+]
+STAGES = ("stage1", "stage2", "stage3")
+
+
+def _paragraphs() -> List[str]:
+    paragraphs: List[str] = []
+    for name in CORPUS_MODULES:
+        module = importlib.import_module(name)
+        for value in [module, *vars(module).values()]:
+            doc = getattr(value, "__doc__", None)
+            if isinstance(doc, str):
+                paragraphs.extend(p.strip() for p in doc.split("\n\n") if len(p.strip()) > 80)
+    return sorted(set(paragraphs))
+
+
+def _prose(rng: random.Random, paragraphs: List[str], chars: int) -> str:
+    parts: List[str] = []
+    while sum(map(len, parts)) < chars:
+        parts.append(rng.choice(paragraphs))
+    return "\n\n".join(parts)
+
+
+def build_messages(count: int, seed: int) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    paragraphs = _paragraphs()
+    models = ["openai/gpt-5.1", "google/gemini-3-pro-preview", "anthropic/claude-sonnet-4.5", "x-ai/grok-4"]
+    messages = []
+    for _ in range(count):
+        messages.append({
+            "role": "assistant",
+            "stage1": [{"model": model, "response": _prose(rng, paragraphs, 3000)} for model in models],
+            "stage2": [
+                {
+                    "model": model,
+                    "ranking": _prose(rng, paragraphs, 1500)
+                    + "\n\nFINAL RANKING:\n1. Response C\n2. Response A\n3. Response D\n4. Response B",
+                    "parsed_ranking": ["Response C", "Response A", "Response D", "Response B"],
+                }
+                for model in models
+            ],
+            "stage3": {"model": models[1], "response": _prose(rng, paragraphs, 2500)},
+        })
+    return messages
+
+
+def _units(size: int) -> Tuple[int, float]:
+    """(write units, eventually consistent read units) for an item of size bytes."""
+    return math.ceil(size / 1024), math.ceil(size / 4096) * 0.5
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=13)
+    args = parser.parse_args()
+
+    os.environ.setdefault("STAGE_COMPRESSION_MIN_BYTES", "0")
+    from backend import compression
+
+    messages = build_messages(args.messages, args.seed)
+    raw_sizes = [
+        sum(len(json.dumps(message[stage], ensure_ascii=False).encode("utf-8")) for stage in STAGES)
+        for message in messages
+    ]
+    raw_total = sum(raw_sizes)
+
+    codecs: List[Tuple[str, int, int]] = [("gzip", compression.CODEC_GZIP, level) for level in (1, 6, 9)]
+    if compression.zstd_available():
+        codecs += [("zstd", compression.CODEC_ZSTD, level) for level in (1, 3, 9, 19)]
+    else:
+        print("zstd not installed (pip install zstandard); showing gzip only")
+
+    wcu, rcu = zip(*map(_units, raw_sizes))
+    print(f"{args.messages} messages, {raw_total / 1e6:.2f} MB of stage JSON, "
+          f"median {statistics.median(raw_sizes) / 1024:.1f} KB per message")
+    print(f"{'codec':<8} {'stored MB':>9} {'ratio':>6} {'encode MB/s':>11} {'decode MB/s':>11} {'WCU/msg':>8} {'RCU/msg':>8}")
+    print(f"{'none':<8} {raw_total / 1e6:9.2f} {1:6.2f} {'-':>11} {'-':>11} "
+          f"{statistics.mean(wcu):8.1f} {statistics.mean(rcu):8.2f}")
+
+    for name, codec, level in codecs:
+        start = time.perf_counter()
+        packed = [{stage: compression.pack(message[stage], codec, level) for stage in STAGES} for message in messages]
+        encode = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for blobs in packed:
+            for stage in STAGES:
+                compression.unpack(blobs[stage])
+        decode = time.perf_counter() - start
+
+        sizes = [sum(len(blobs[stage]) for stage in STAGES) for blobs in packed]
+        wcu, rcu = zip(*map(_units, sizes))
+        print(
+            f"{f'{name}-{level}':<8} {sum(sizes) / 1e6:9.2f} {raw_total / sum(sizes):6.2f} "
+            f"{raw_total / encode / 1e6:11.1f} {raw_total / decode / 1e6:11.1f} "
+            f"{statistics.mean(wcu):8.1f} {statistics.mean(rcu):8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark: time to first token for streamed vs buffered completions.
+
+Runs ``query_model`` (buffered) and ``stream_model`` (SSE) against the local
+OpenRouter stand-in, which waits ``--latency`` seconds before the first token
+and ``--token-delay`` between tokens. Also checks that the streamed deltas
+reassemble into the buffered text and measures raw SSE parser throughput.
+
+Usage:
+    python -m benchmarks.bench_streaming --latency 0.5 --token-delay 0.005
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import AsyncIterator, List
+
+from .openrouter_stub import OpenRouterStub
+
+MESSAGES = [{"role": "user", "content": "Explain the council."}]
+
+
+async def _lines(lines: List[str]) -> AsyncIterator[str]:
+    for line in lines:
+        yield line
+
+
+async def _parser_throughput(chunks: int) -> float:
+    from backend.openrouter import iter_sse_data
+
+    chunk = json.dumps({"choices": [{"index": 0, "delta": {"content": "token "}}]})
+    lines = [": OPENROUTER PROCESSING", ""]
+    for _ in range(chunks):
+        lines += [f"data: {chunk}", ""]
+    lines += ["data: [DONE]", ""]
+
+    start = time.perf_counter()
+    count = 0
+    async for _ in iter_sse_data(_lines(lines)):
+        count += 1
+    assert count == chunks
+    return chunks / (time.perf_counter() - start)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds before the first token")
+    parser.add_argument("--token-delay", type=float, default=0.005, help="seconds between tokens")
+    parser.add_argument("--words", type=int, default=400, help="length of the stub reply")
+    args = parser.parse_args()
+
+    reply = " ".join(f"word{i}" for i in range(args.words))
+    stub = OpenRouterStub(
+        latency=args.latency,
+        token_delay=args.token_delay,
+        reply=reply,
+        reasoning="Thinking about the question first.",
+    )
+    os.environ["OPENROUTER_BASE_URL"] = await stub.start()
+    os.environ.setdefault("OPENROUTER_API_KEY", "bench")
+    os.environ["RESPONSE_CACHE_ENABLED"] = "false"  # measure real upstream calls
+
+    from backend.openrouter import close_client, query_model, stream_model
+
+    start = time.perf_counter()
+    buffered = await query_model("stub/model", MESSAGES)
+    buffered_total = time.perf_counter() - start
+
+    start = time.perf_counter()
+    first_token = None
+    content: List[str] = []
+    reasoning: List[str] = []
+    async for event in stream_model("stub/model", MESSAGES):
+        if event["type"] in ("content", "reasoning") and first_token is None:
+            first_token = time.perf_counter() - start
+        if event["type"] == "content":
+            content.append(event["delta"])
+        elif event["type"] == "reasoning":
+            reasoning.append(event["delta"])
+        elif event["type"] == "error":
+            raise SystemExit(f"stream failed: {event['error']}")
+    stream_total = time.perf_counter() - start
+
+    print(f"buffered   first visible {buffered_total * 1000:8.1f} ms  total {buffered_total * 1000:8.1f} ms")
+    print(f"streamed   first visible {first_token * 1000:8.1f} ms  total {stream_total * 1000:8.1f} ms")
+    print(f"reassembled text matches buffered: {''.join(content) == buffered['content']}")
+    print(f"reasoning deltas: {len(reasoning)}")
+    print(f"SSE parser throughput: {await _parser_throughput(50_000):,.0f} chunks/s")
+
+    await close_client()
+    await stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
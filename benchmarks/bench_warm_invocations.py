@@ -0,0 +1,87 @@
+"""
+Benchmark: consecutive warm Lambda invocations on the persistent event loop.
+
+Drives ``backend.main.lambda_handler`` with ``GET /api/models`` against the
+local OpenRouter stand-in, checks that the event loop and the pooled HTTP
+client are the same objects on every invocation, and compares latency and
+connection counts with the old ``asyncio.run`` per invocation.
+
+Usage:
+    python -m benchmarks.bench_warm_invocations --invocations 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import threading
+import time
+
+from .openrouter_stub import OpenRouterStub
+
+EVENT = {
+    "rawPath": "/api/models",
+    "requestContext": {"http": {"method": "GET", "path": "/api/models"}},
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--invocations", type=int, default=20)
+    parser.add_argument("--connect-delay", type=float, default=0.05, help="simulated handshake seconds")
+    args = parser.parse_args()
+
+    # The stub runs on its own loop in a background thread so it is independent
+    # of the handler's loop lifecycle.
+    stub = OpenRouterStub(connect_delay=args.connect_delay)
+    stub_loop = asyncio.new_event_loop()
+    threading.Thread(target=stub_loop.run_forever, daemon=True).start()
+    base_url = asyncio.run_coroutine_threadsafe(stub.start(), stub_loop).result()
+
+    os.environ["OPENROUTER_BASE_URL"] = base_url
+    os.environ.setdefault("OPENROUTER_API_KEY", "bench")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-west-2")
+
+    from backend import main as handler, openrouter, runtime
+
+    def invoke_persistent() -> None:
+        assert handler.lambda_handler(EVENT, None)["statusCode"] == 200
+
+    def invoke_asyncio_run() -> None:
+        assert asyncio.run(handler._route(EVENT))["statusCode"] == 200
+
+    loop = runtime.get_loop()
+    client = openrouter._CLIENT
+    reused = False
+    # Persistent first: asyncio.run replaces the pooled client on every call.
+    for label, invoke in (("persistent", invoke_persistent), ("asyncio.run", invoke_asyncio_run)):
+        stub.reset_counters()
+        timings = []
+        for _ in range(args.invocations):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):  # silence handler debug logs
+                invoke()
+            timings.append(time.perf_counter() - start)
+        print(
+            f"{label:<12} median {statistics.median(timings) * 1000:7.1f} ms  "
+            f"connections {stub.connections}/{args.invocations}"
+        )
+        if invoke is invoke_persistent:
+            # Both the loop and the client created at container init must survive.
+            reused = runtime.get_loop() is loop and openrouter._CLIENT is client
+
+    print(f"loop and HTTP pool reused across invocations: {reused}")
+
+    runtime.shutdown()
+    asyncio.run_coroutine_threadsafe(stub.stop(), stub_loop).result()
+    stub_loop.call_soon_threadsafe(stub_loop.stop)
+    if not reused:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
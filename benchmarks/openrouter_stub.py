@@ -0,0 +1,211 @@
+"""Local stand-in for the OpenRouter API so benchmarks run without network access."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+from http import HTTPStatus
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+Latency = float | Callable[[str], float]
+
+
+class OpenRouterStub:
+    """
+    Minimal HTTP/1.1 server speaking the subset of the OpenRouter API we use.
+
+    Args:
+        latency: Seconds before a completion is returned, or a callable taking
+            the model id and returning seconds (for latency distributions).
+        connect_delay: Extra delay charged once per new connection, standing in
+            for the TCP + TLS handshake a real endpoint costs.
+        reply: Completion text returned for every request.
+        token_delay: Seconds between SSE chunks when the request asks for
+            ``stream: true``; the first chunk arrives after ``latency``.
+        reasoning: Optional reasoning text streamed before the content.
+        errors: Optional callable taking the model id and returning an HTTP
+            status to fail the request with (or None to answer normally).
+        retry_after: Retry-After seconds sent with 429/503 failures.
+    """
+
+    def __init__(
+        self,
+        latency: Latency = 0.0,
+        connect_delay: float = 0.0,
+        reply: str = "Stub answer.\n\nFINAL RANKING:\n1. Response A\n2. Response B",
+        token_delay: float = 0.0,
+        reasoning: str = "",
+        errors: Callable[[str], int | None] | None = None,
+        retry_after: float | None = None,
+    ) -> None:
+        self.latency = latency
+        self.connect_delay = connect_delay
+        self.reply = reply
+        self.token_delay = token_delay
+        self.reasoning = reasoning
+        self.errors = errors
+        self.retry_after = retry_after
+        self.connections = 0
+        self.requests = 0
+        self._server: asyncio.AbstractServer | None = None
+        self._handlers: Set[asyncio.Task] = set()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}/api/v1"
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start listening and return the base URL to use as OPENROUTER_BASE_URL."""
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for task in list(self._handlers):
+                task.cancel()
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    def reset_counters(self) -> None:
+        self.connections = 0
+        self.requests = 0
+
+    def _latency_for(self, model: str) -> float:
+        return self.latency(model) if callable(self.latency) else self.latency
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        task.add_done_callback(self._handlers.discard)
+        self.connections += 1
+        if self.connect_delay:
+            await asyncio.sleep(self.connect_delay)
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                self.requests += 1
+                await self._dispatch(method, path, body, writer)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_request(
+        reader: asyncio.StreamReader,
+    ) -> Tuple[str, str, Dict[str, str], bytes] | None:
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+        method, path, _ = request_line.decode("latin-1").split(" ", 2)
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, value = line.decode("latin-1").split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+        body = await reader.readexactly(int(headers.get("content-length", "0")))
+        return method.upper(), path, headers, body
+
+    async def _dispatch(self, method: str, path: str, body: bytes, writer: asyncio.StreamWriter) -> None:
+        if method == "GET" and path.endswith("/models"):
+            await self._send_json(writer, 200, {"data": [{"id": "stub/model-a"}, {"id": "stub/model-b"}]})
+            return
+        if method == "POST" and path.endswith("/chat/completions"):
+            payload = json.loads(body or b"{}")
+            await self._completion(payload, writer)
+            return
+        await self._send_json(writer, 404, {"error": "not found"})
+
+    async def _completion(self, payload: Dict[str, Any], writer: asyncio.StreamWriter) -> None:
+        model = payload.get("model", "")
+        status = self.errors(model) if self.errors else None
+        if status:
+            await asyncio.sleep(self._latency_for(model))
+            headers = {}
+            if status in (429, 503) and self.retry_after is not None:
+                headers["Retry-After"] = str(self.retry_after)
+            await self._send_json(writer, status, {"error": {"code": status, "message": "stub failure"}}, headers)
+            return
+        if payload.get("stream"):
+            await self._stream_completion(model, writer)
+            return
+        # A buffered reply only arrives once the whole completion is generated
+        tokens = len(self._deltas())
+        await asyncio.sleep(self._latency_for(model) + self.token_delay * max(tokens - 1, 0))
+        await self._send_json(
+            writer,
+            200,
+            {
+                "id": "gen-stub",
+                "model": model,
+                "choices": [{"message": {"role": "assistant", "content": self.reply}}],
+            },
+        )
+
+    def _deltas(self) -> List[Dict[str, str]]:
+        deltas = [{"reasoning": token} for token in re.findall(r"\S+\s*", self.reasoning)]
+        return deltas + [{"content": token} for token in re.findall(r"\S+\s*", self.reply)]
+
+    async def _stream_completion(self, model: str, writer: asyncio.StreamWriter) -> None:
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream\r\n"
+            b"Transfer-Encoding: chunked\r\n"
+            b"\r\n"
+        )
+        # OpenRouter sends keep-alive comments while the model is thinking
+        await self._write_chunk(writer, ": OPENROUTER PROCESSING\n\n")
+        await asyncio.sleep(self._latency_for(model))
+
+        deltas = self._deltas()
+        for index, delta in enumerate(deltas):
+            if index and self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            chunk = {"id": "gen-stub", "model": model, "choices": [{"index": 0, "delta": delta}]}
+            await self._write_chunk(writer, f"data: {json.dumps(chunk)}\n\n")
+
+        final = {
+            "id": "gen-stub",
+            "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            "usage": {"completion_tokens": len(deltas)},
+        }
+        await self._write_chunk(writer, f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n")
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    @staticmethod
+    async def _write_chunk(writer: asyncio.StreamWriter, text: str) -> None:
+        data = text.encode()
+        writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        await writer.drain()
+
+    @staticmethod
+    async def _send_json(
+        writer: asyncio.StreamWriter,
+        status: int,
+        body: Dict[str, Any],
+        headers: Dict[str, str] | None = None,
+    ) -> None:
+        data = json.dumps(body).encode()
+        extra = "".join(f"{name}: {value}\r\n" for name, value in (headers or {}).items())
+        writer.write(
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"{extra}"
+            "\r\n".encode()
+            + data
+        )
+        await writer.drain()
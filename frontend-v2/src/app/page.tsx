@@ -210,6 +210,15 @@ export default function Home() {
               });
               break;
 
+            case 'stage1_result':
+              setCurrentConversation((prev: any) => {
+                const messages = [...prev.messages];
+                const lastMsg = messages[messages.length - 1];
+                lastMsg.stage1 = [...(lastMsg.stage1 || []), event.data];
+                return { ...prev, messages };
+              });
+              break;
+
             case 'stage1_complete':
               setCurrentConversation((prev: any) => {
                 const messages = [...prev.messages];
@@ -229,6 +238,15 @@ export default function Home() {
               });
               break;
 
+            case 'stage2_result':
+              setCurrentConversation((prev: any) => {
+                const messages = [...prev.messages];
+                const lastMsg = messages[messages.length - 1];
+                lastMsg.stage2 = [...(lastMsg.stage2 || []), event.data];
+                return { ...prev, messages };
+              });
+              break;
+
             case 'stage2_complete':
               setCurrentConversation((prev: any) => {
                 const messages = [...prev.messages];
@@ -249,6 +267,18 @@ export default function Home() {
               });
               break;
 
+            case 'stage3_delta':
+              setCurrentConversation((prev: any) => {
+                const messages = [...prev.messages];
+                const lastMsg = messages[messages.length - 1];
+                lastMsg.stage3 = {
+                  model: event.model,
+                  response: (lastMsg.stage3?.response || '') + event.delta,
+                };
+                return { ...prev, messages };
+              });
+              break;
+
             case 'stage3_complete':
               setCurrentConversation((prev: any) => {
                 const messages = [...prev.messages];
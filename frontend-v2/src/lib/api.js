@@ -12,6 +12,37 @@ export const setAuthToken = (token) => {
 
 const authHeaders = () => (authToken ? { Authorization: `Bearer ${authToken}` } : {});
 
+/**
+ * Read a Server-Sent Events response, calling onEvent(type, event) as each event arrives.
+ */
+async function readEventStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    const emit = (raw) => {
+        const data = raw
+            .split('\n')
+            .filter((line) => line.startsWith('data:'))
+            .map((line) => line.slice(5).trimStart())
+            .join('\n');
+        if (!data) return;
+        const event = JSON.parse(data);
+        onEvent(event.type, event);
+    };
+
+    for (;;) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split('\n\n');
+        buffer = events.pop();
+        events.forEach(emit);
+    }
+    buffer += decoder.decode();
+    if (buffer.trim()) emit(buffer);
+}
+
 export const api = {
     /**
      * List available models and defaults from backend config.
@@ -148,35 +179,7 @@ export const api = {
             throw new Error('Failed to send message');
         }
 
-        // In a real browser environment, we'd use body.getReader()
-        // but we'll assume standard fetch behavior here.
-        // NOTE: In Next.js SSR, this might behave differently, but for Client Components it's fine.
-
-        // However, the original implementation assumed a simple response.json() wait if it wasn't streaming,
-        // but specifically for streaming it likely needs standard SSE or reader handling.
-        // The original code seemingly just awaited response.json() then emitted events?
-        // Wait, looking at the original code:
-        // const result = await response.json();
-        // onEvent(...)
-        // It seems the "streaming" endpoint in the original code might just return a JSON with all stages?
-        // OR the original code I read was a simplified version.
-        // "Emit staged events to keep UI logic consistent without SSE" -> It seems it FAKES streaming by just emitting all events after the request finishes.
-        // I will preserve that logic for now.
-
-        const result = await response.json();
-
-        // Emit staged events to keep UI logic consistent without SSE
-        onEvent('stage1_start', { type: 'stage1_start' });
-        onEvent('stage1_complete', { type: 'stage1_complete', data: result.stage1 });
-        onEvent('stage2_start', { type: 'stage2_start' });
-        onEvent('stage2_complete', {
-            type: 'stage2_complete',
-            data: result.stage2,
-            metadata: result.metadata,
-        });
-        onEvent('stage3_start', { type: 'stage3_start' });
-        onEvent('stage3_complete', { type: 'stage3_complete', data: result.stage3 });
-        onEvent('complete', { type: 'complete' });
+        await readEventStream(response, onEvent);
     },
     /**
      * Get saved council models.
@@ -12,6 +12,37 @@ export const setAuthToken = (token) => {
 
 const authHeaders = () => (authToken ? { Authorization: `Bearer ${authToken}` } : {});
 
+/**
+ * Read a Server-Sent Events response, calling onEvent(type, event) as each event arrives.
+ */
+async function readEventStream(response, onEvent) {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  const emit = (raw) => {
+    const data = raw
+      .split('\n')
+      .filter((line) => line.startsWith('data:'))
+      .map((line) => line.slice(5).trimStart())
+      .join('\n');
+    if (!data) return;
+    const event = JSON.parse(data);
+    onEvent(event.type, event);
+  };
+
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const events = buffer.split('\n\n');
+    buffer = events.pop();
+    events.forEach(emit);
+  }
+  buffer += decoder.decode();
+  if (buffer.trim()) emit(buffer);
+}
+
 export const api = {
   /**
    * List available models and defaults from backend config.
@@ -148,20 +179,7 @@ export const api = {
       throw new Error('Failed to send message');
     }
 
-    const result = await response.json();
-
-    // Emit staged events to keep UI logic consistent without SSE
-    onEvent('stage1_start', { type: 'stage1_start' });
-    onEvent('stage1_complete', { type: 'stage1_complete', data: result.stage1 });
-    onEvent('stage2_start', { type: 'stage2_start' });
-    onEvent('stage2_complete', {
-      type: 'stage2_complete',
-      data: result.stage2,
-      metadata: result.metadata,
-    });
-    onEvent('stage3_start', { type: 'stage3_start' });
-    onEvent('stage3_complete', { type: 'stage3_complete', data: result.stage3 });
-    onEvent('complete', { type: 'complete' });
+    await readEventStream(response, onEvent);
   },
 
   /**
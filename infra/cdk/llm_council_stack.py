@@ -20,6 +20,10 @@ from aws_cdk import (
 from constructs import Construct
 
 
+# Lambda Web Adapter layer (published by AWS in every region) for the streaming function
+WEB_ADAPTER_LAYER_VERSION = 25
+
+
 class LlmCouncilStack(Stack):
     """CDK stack for the Lambda + HTTP API + DynamoDB deployment."""
 
@@ -34,11 +38,43 @@ class LlmCouncilStack(Stack):
                 name="id", type=dynamodb.AttributeType.STRING
             ),
             billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+            time_to_live_attribute="expires_at",
+            removal_policy=RemovalPolicy.RETAIN,
+        )
+        # Newest-first listing of a user's conversations. Settings and cache items
+        # have no user_id, so the index stays sparse. Only the summary attributes
+        # are projected, so listings never read message bodies.
+        table.add_global_secondary_index(
+            index_name="user_id-created_at-index",
+            partition_key=dynamodb.Attribute(
+                name="user_id", type=dynamodb.AttributeType.STRING
+            ),
+            sort_key=dynamodb.Attribute(
+                name="created_at", type=dynamodb.AttributeType.STRING
+            ),
+            projection_type=dynamodb.ProjectionType.INCLUDE,
+            non_key_attributes=["title", "type", "message_count", "updated_at", "preview"],
+        )
+
+        # One item per conversation message, read newest-first a page at a time
+        messages_table = dynamodb.Table(
+            self,
+            "MessagesTable",
+            table_name="LLMCouncilMessages",
+            partition_key=dynamodb.Attribute(
+                name="conversation_id", type=dynamodb.AttributeType.STRING
+            ),
+            sort_key=dynamodb.Attribute(
+                name="seq", type=dynamodb.AttributeType.NUMBER
+            ),
+            billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
             removal_policy=RemovalPolicy.RETAIN,
         )
 
         env_vars: Dict[str, str] = {
             "CONVERSATIONS_TABLE": table.table_name,
+            "MESSAGES_TABLE": messages_table.table_name,
+            "CONVERSATIONS_USER_INDEX": "user_id-created_at-index",
         }
 
         openrouter_param = self.node.try_get_context("openrouterApiKeyParam")
@@ -93,43 +129,74 @@ class LlmCouncilStack(Stack):
                 )
                 return True
 
+        code = _lambda.Code.from_asset(
+            "../..",
+            bundling=cdk.BundlingOptions(
+                image=_lambda.Runtime.PYTHON_3_12.bundling_image,
+                command=[
+                    "bash",
+                    "-c",
+                    "pip install -r backend/requirements.txt -t /asset-output "
+                    "&& cp -r backend /asset-output/backend",
+                ],
+                local=LocalBundler(),  # Use local bundling when Docker unavailable
+            ),
+            exclude=[
+                "infra/cdk/*",
+                "frontend/node_modules/*",
+                "frontend-v2/node_modules/*",
+                "frontend-v2/.next/*",
+                "data/*",
+                ".git/*",
+                "cdk.out/*",
+                ".venv/*",
+            ],
+        )
+
         lambda_fn = _lambda.Function(
             self,
             "Handler",
             function_name="LLMCouncilApi",
             runtime=_lambda.Runtime.PYTHON_3_12,
             handler="backend.main.lambda_handler",
-            code=_lambda.Code.from_asset(
-                "../..",
-                bundling=cdk.BundlingOptions(
-                    image=_lambda.Runtime.PYTHON_3_12.bundling_image,
-                    command=[
-                        "bash",
-                        "-c",
-                        "pip install -r backend/requirements.txt -t /asset-output "
-                        "&& cp -r backend /asset-output/backend",
-                    ],
-                    local=LocalBundler(),  # Use local bundling when Docker unavailable
-                ),
-                exclude=[
-                    "infra/cdk/*",
-                    "frontend/node_modules/*",
-                    "frontend-v2/node_modules/*",
-                    "frontend-v2/.next/*",
-                    "data/*",
-                    ".git/*",
-                    "cdk.out/*",
-                    ".venv/*",
-                ],
-            ),
+            code=code,
             timeout=Duration.seconds(300),
             memory_size=512,
             environment=env_vars,
         )
 
-        # Add Function URL for long-running requests (bypasses API Gateway 30s timeout)
-        fn_url = lambda_fn.add_function_url(
+        # Python handlers cannot stream their response, so the Function URL is
+        # served by a second function that runs backend.devserver behind the
+        # Lambda Web Adapter; SSE chunks reach the client as they are produced
+        web_adapter = _lambda.LayerVersion.from_layer_version_arn(
+            self,
+            "WebAdapterLayer",
+            f"arn:aws:lambda:{self.region}:753240598075:layer:LambdaAdapterLayerX86:{WEB_ADAPTER_LAYER_VERSION}",
+        )
+        stream_fn = _lambda.Function(
+            self,
+            "StreamHandler",
+            function_name="LLMCouncilStreamApi",
+            runtime=_lambda.Runtime.PYTHON_3_12,
+            handler="backend/run.sh",
+            code=code,
+            layers=[web_adapter],
+            timeout=Duration.seconds(300),
+            memory_size=512,
+            environment={
+                **env_vars,
+                "AWS_LAMBDA_EXEC_WRAPPER": "/opt/bootstrap",
+                "AWS_LWA_INVOKE_MODE": "response_stream",
+                "AWS_LWA_READINESS_CHECK_PATH": "/",
+                "PORT": "8080",
+            },
+        )
+
+        # Function URL for long-running requests (bypasses API Gateway 30s timeout)
+        # and streamed responses
+        fn_url = stream_fn.add_function_url(
             auth_type=_lambda.FunctionUrlAuthType.NONE,  # Auth handled in code via JWT
+            invoke_mode=_lambda.InvokeMode.RESPONSE_STREAM,
             cors=_lambda.FunctionUrlCorsOptions(
                 allowed_origins=[
                     "https://www.multiagent.karankan19.com",
@@ -145,6 +212,7 @@ class LlmCouncilStack(Stack):
                 allowed_headers=[
                     "Content-Type",
                     "Authorization",
+                    "Cache-Control",
                     "X-Amz-Date",
                     "X-Amz-Security-Token",
                     "X-Api-Key",
@@ -154,18 +222,20 @@ class LlmCouncilStack(Stack):
             ),
         )
 
-        table.grant_read_write_data(lambda_fn)
-        if openrouter_param:
-            lambda_fn.add_to_role_policy(
-                iam.PolicyStatement(
-                    actions=["ssm:GetParameter"],
-                    resources=[
-                        f"arn:aws:ssm:{self.region}:{self.account}:parameter{openrouter_param}"
-                        if openrouter_param.startswith("/")
-                        else f"arn:aws:ssm:{self.region}:{self.account}:parameter/{openrouter_param}"
-                    ],
+        for fn in (lambda_fn, stream_fn):
+            table.grant_read_write_data(fn)
+            messages_table.grant_read_write_data(fn)
+            if openrouter_param:
+                fn.add_to_role_policy(
+                    iam.PolicyStatement(
+                        actions=["ssm:GetParameter"],
+                        resources=[
+                            f"arn:aws:ssm:{self.region}:{self.account}:parameter{openrouter_param}"
+                            if openrouter_param.startswith("/")
+                            else f"arn:aws:ssm:{self.region}:{self.account}:parameter/{openrouter_param}"
+                        ],
+                    )
                 )
-            )
         authorizer: Optional[apigwv2.IHttpRouteAuthorizer] = None
 
         if cognito_user_pool_id and cognito_user_pool_client_id:
@@ -190,6 +260,7 @@ class LlmCouncilStack(Stack):
                 allow_headers=[
                     "Authorization",
                     "Content-Type",
+                    "Cache-Control",
                     "X-Amz-Date",
                     "X-Amz-Security-Token",
                     "X-Api-Key",
@@ -213,6 +284,7 @@ class LlmCouncilStack(Stack):
                 expose_headers=[
                     "Authorization",
                     "Content-Type",
+                    "X-Next-Cursor",
                     "X-Amz-Date",
                     "X-Amz-Security-Token",
                     "X-Api-Key",
@@ -246,3 +318,4 @@ class LlmCouncilStack(Stack):
         cdk.CfnOutput(self, "HttpApiUrl", value=http_api.api_endpoint)
         cdk.CfnOutput(self, "FunctionUrl", value=fn_url.url)
         cdk.CfnOutput(self, "ConversationsTableName", value=table.table_name)
+        cdk.CfnOutput(self, "MessagesTableName", value=messages_table.table_name)